@@ -0,0 +1,51 @@
+"""Peak memory and time of rendering a large poster as a whole image and in bands.
+
+Each run is a separate process, so peak RSS is not shared between runs.
+Run with `python -m benchmarks.banded_render`.
+"""
+
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from dcmntr.core import *
+from dcmntr.basic_layout import *
+from dcmntr.banded import render_into_file_banded
+from dcmntr.render import render_into_image
+
+WIDTH, HEIGHT = 6000, 9000
+
+
+def poster() -> Node:
+    cell = padding(4, 4, 4, 4)(outline(fill="lightblue")(box(100, 100)))
+    return v_stack(*(h_stack(*(cell for _ in range(50))) for _ in range(80)))
+
+
+def run(mode: str) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        filename = str(Path(directory) / "poster.png")
+        start = time.perf_counter()
+        if mode == "banded":
+            render_into_file_banded(filename, WIDTH, HEIGHT, poster())
+        else:
+            render_into_image(filename, WIDTH, HEIGHT, poster())
+        elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{mode:>7} {elapsed:>8.2f} {peak_mb:>12.1f}")
+
+
+def main() -> None:
+    print(f"{WIDTH}x{HEIGHT} PNG")
+    print(f"{'mode':>7} {'time, s':>8} {'peak RSS, MB':>12}")
+    for mode in ("whole", "banded"):
+        subprocess.run([sys.executable, "-m", "benchmarks.banded_render", mode], check=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 2:
+        run(sys.argv[1])
+    else:
+        main()
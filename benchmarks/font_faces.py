@@ -0,0 +1,87 @@
+"""Memory kept by Fonts after loading many font sizes: a FreeType face per file open,
+faces sharing file bytes and the bounded font cache.
+
+Run with `python -m benchmarks.font_faces`. Memory is the growth of RSS, Linux only.
+"""
+
+import gc
+import subprocess
+import sys
+import time
+import warnings
+from typing import Callable
+
+from PIL import ImageFont
+
+from dcmntr.lru import LRUCache
+from dcmntr.text import Font, Fonts
+
+STYLES = [(False, False), (True, False), (False, True), (True, True)]
+SIZES = range(8, 136)
+NAMES = ("arial", "mono")
+
+
+def rss() -> int:
+    with open("/proc/self/statm") as fp:
+        return int(fp.read().split()[1]) * 4096
+
+
+def measure(name: str, load: Callable[[], object]) -> None:
+    gc.collect()
+    before = rss()
+    start = time.perf_counter()
+    kept = load()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    print(f"{name:>20}: {elapsed:.2f}s, {(rss() - before) / 2**20:.1f} MB")
+    del kept
+
+
+def load_all(fonts: Fonts) -> Fonts:
+    for name in NAMES:
+        for style in STYLES:
+            for size in SIZES:
+                font = fonts.load(name, size, *style)
+                # Glyphs of a typical text are loaded by FreeType
+                font.advances.width("The quick brown fox 0123456789")
+    return fonts
+
+
+def run(scenario: str) -> None:
+    # PIL warns on every call when RAQM is requested but not installed
+    warnings.simplefilter("ignore")
+    index = Fonts().index
+    paths = [index.resolve(name, *style) for name in NAMES for style in STYLES]
+
+    def file_per_face() -> list[Font]:
+        fonts = Fonts()
+        kept = []
+        for path in paths:
+            for size in SIZES:
+                pil_font = ImageFont.truetype(path, size, layout_engine=ImageFont.Layout.RAQM)
+                font = Font(fonts, pil_font, "", size, False, False, path=path)
+                font.advances.width("The quick brown fox 0123456789")
+                kept.append(font)
+        return kept
+
+    scenarios: dict[str, Callable[[], object]] = {
+        "file per face": file_per_face,
+        "shared, unbounded": lambda: load_all(Fonts(cache=LRUCache(maxsize=10**6))),
+        "shared, 256 fonts": lambda: load_all(Fonts()),
+        "shared, 32 fonts": lambda: load_all(Fonts(cache=LRUCache(maxsize=32))),
+    }
+    if scenario:
+        measure(scenario, scenarios[scenario])
+        return
+    print(f"{len(paths) * len(SIZES)} fonts")
+    # Every scenario in a fresh process, freed memory is not always returned to the system
+    for name in scenarios:
+        subprocess.run([sys.executable, "-m", "benchmarks.font_faces", name], check=True)
+
+
+def main() -> None:
+    run(sys.argv[1] if len(sys.argv) > 1 else "")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Splitting texts into runs of fallback fonts: trial rendering of every character
+and the linear scan over coverage of fonts.
+
+Run with `python -m benchmarks.font_fallback`.
+"""
+
+import random
+import time
+import warnings
+
+from dcmntr.text import Font, Fonts
+
+WORDS = "Město Černá Hora invoice Ğüneş total Łódź item price Ďábel".split()
+
+
+def glyph(font: Font, char: str) -> tuple[object, ...]:
+    mask = font.pil_font.getmask(char)
+    return mask.size, tuple(mask)
+
+
+def trial_runs(chain: list[Font], text: str) -> list[tuple[Font, str]]:
+    # A font lacks a character if it draws it as its missing glyph
+    missing = [glyph(font, "\uffff") for font in chain]
+    runs: list[tuple[Font, str]] = []
+    for char in text:
+        # Spaces stay with the preceding font
+        font = runs[-1][0] if runs and char.isspace() else chain[0]
+        if not char.isspace():
+            for candidate, notdef in zip(chain, missing):
+                if glyph(candidate, char) != notdef:
+                    font = candidate
+                    break
+        if runs and runs[-1][0] is font:
+            runs[-1] = (font, runs[-1][1] + char)
+        else:
+            runs.append((font, char))
+    return runs
+
+
+def main() -> None:
+    # PIL warns on every call when RAQM is requested but not installed
+    warnings.simplefilter("ignore")
+    rng = random.Random(1)
+    texts = [" ".join(rng.choices(WORDS, k=rng.randint(1, 4))) + f" {i}" for i in range(2000)]
+    fonts = Fonts(fallbacks=("mono",))
+    font = fonts.load("arial", 14)
+    chain = [font, *font.fallbacks()]
+
+    start = time.perf_counter()
+    expected = [trial_runs(chain, text) for text in texts]
+    print(f"trial rendering:   {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    runs = [font.runs(text) for text in texts]
+    print(f"coverage (cold):   {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    runs = [font.runs(text) for text in texts]
+    print(f"coverage (cached): {time.perf_counter() - start:.3f}s")
+    assert [list(r) for r in runs] == expected
+
+
+if __name__ == "__main__":
+    main()
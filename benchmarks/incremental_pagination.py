@@ -0,0 +1,58 @@
+"""Re-pagination time after editing one section of a long document, with and without cache.
+
+Run with `python -m benchmarks.incremental_pagination`.
+"""
+
+import time
+
+from dcmntr.core import *
+from dcmntr.basic_layout import *
+from dcmntr.layout_query import LayoutQuery
+from dcmntr.paging import PaginationCache, layout_multipage_document, page_break
+
+
+def numbered_page(content: Node, page_content_lookup_cache: LayoutQuery | None = None) -> Node:
+    return padding(top=20, bottom=20)(content)
+
+
+def document(heights: list[int]) -> Node:
+    children: list[Node] = []
+    for idx, height in enumerate(heights):
+        if idx and idx % 10 == 0:
+            children.append(page_break)  # Chapters
+        children.append(padding(top=8)(outline()(v_stack(*(box(100, height) for _ in range(20))))))
+    return v_stack(*children)
+
+
+def paginate(heights: list[int], cache: PaginationCache | None) -> int:
+    pages = layout_multipage_document(
+        Size(200, 1000), numbered_page, document(heights), pagination_cache=cache
+    )
+    return sum(1 for _ in pages)
+
+
+def main() -> None:
+    heights = [30] * 2000
+    # Layouts of all the pages are kept
+    cache = PaginationCache(max_layouts=len(heights))
+    paginate(heights, cache)
+    heights[1005] = 31  # Page breaks move until the end of the chapter
+
+    start = time.perf_counter()
+    pages = paginate(heights, None)
+    full = time.perf_counter() - start
+
+    start = time.perf_counter()
+    paginate(heights, cache)
+    incremental = time.perf_counter() - start
+
+    print(f"pages: {pages}")
+    print(f"full:        {full:.2f}s")
+    print(
+        f"incremental: {incremental:.2f}s "
+        f"({cache.laid_out_pages} laid out, {cache.reused_pages} reused)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Per-node overhead of the layout machinery on a tree of trivial nodes.
+
+Run with `python -m benchmarks.layout_overhead`.
+"""
+
+import itertools
+import time
+
+from dcmntr.core import *
+from dcmntr.basic_layout import *
+
+
+def main() -> None:
+    cell = padding(1, 1, 1, 1)(outline()(box(20, 5)(layers(box(1, 1), box(2, 2)))))
+    doc = v_stack(*itertools.repeat(h_stack(cell, cell, cell, cell), 2_000))
+    constraints = Size(1000, INFINITY).to_constraints_max()
+
+    nodes = sum(1 for _ in walk_layout(LayoutCtx().page_ctx().layout_node(doc, constraints)))
+    best = INFINITY
+    for _ in range(5):
+        start = time.perf_counter()
+        LayoutCtx().page_ctx().layout_node(doc, constraints)
+        best = min(best, time.perf_counter() - start)
+    print(f"nodes: {nodes}, best of 5: {best:.3f} s, per node: {best / nodes * 1e9:.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Memory used by nodes and layouts of the kitchen sink document.
+
+Run with `python -m benchmarks.memory`.
+"""
+
+import gc
+import tracemalloc
+from typing import Callable
+
+from dcmntr.core import *
+from dcmntr.paging import layout_multipage_document
+from tests.kitchen_sink.test_kitchen_sink import kitchen_sink, page_structure
+
+
+def count_nodes(node: Node) -> int:
+    return 1 + sum(count_nodes(child) for child in node.children)
+
+
+def traced[T](f: Callable[[], T]) -> tuple[T, int]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = f()
+        gc.collect()
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    kitchen_sink()  # warm up fonts and module level caches
+
+    doc, doc_bytes = traced(kitchen_sink)
+    nodes = count_nodes(doc)
+
+    page_size = Size(210 * 5, 297 * 5)
+    pages, pages_bytes = traced(
+        lambda: list(layout_multipage_document(page_size, page_structure, doc))
+    )
+    layouts = sum(1 for _, page in pages for _ in walk_layout(page))
+
+    print(f"nodes: {nodes}, {doc_bytes / nodes:.0f} bytes per node")
+    print(f"layouts: {layouts}, {pages_bytes / layouts:.0f} bytes per laid out node")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Layout cost of nested alignment wrappers: `center(right(bottom(...)))`.
+
+Run with `python -m benchmarks.nested_alignment`.
+"""
+
+import time
+from dataclasses import dataclass
+
+from dcmntr.core import *
+from dcmntr.core import NodeLayoutCtx
+from dcmntr.basic_layout import *
+
+
+@dataclass(frozen=True)
+class CountingBox(LeafNode):
+    width: float
+    height: float
+    calls: list[int]
+
+    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout:
+        self.calls.append(1)
+        return NodeLayout(Size(self.width, self.height), ())
+
+
+def nested(depth: int, leaf: Node) -> Node:
+    wrappers = [center, right, bottom, h_center, v_center]
+    node = leaf
+    for i in range(depth):
+        node = wrappers[i % len(wrappers)](node)
+    return node
+
+
+def main() -> None:
+    constraints = Size(1000, 1000).to_constraints_max()
+    print(f"{'depth':>6} {'leaf layouts':>13} {'time, us':>10}")
+    for depth in (1, 2, 4, 8, 16, 32, 64):
+        calls: list[int] = []
+        doc = nested(depth, CountingBox(10, 10, calls))
+        repeat = 200
+        start = time.perf_counter()
+        for _ in range(repeat):
+            LayoutCtx().container_ctx().layout_node(doc, constraints)
+        elapsed = (time.perf_counter() - start) / repeat
+        print(f"{depth:>6} {len(calls) // repeat:>13} {elapsed * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Pagination of a text-heavy report: word by word `flow` of texts and `paragraph` of spans.
+
+Run with `python -m benchmarks.paragraph_layout`.
+"""
+
+import random
+import time
+import warnings
+
+from dcmntr.core import *
+from dcmntr.basic_layout import *
+from dcmntr.layout_query import LayoutQuery
+from dcmntr.paging import layout_multipage_document
+from dcmntr.text import *
+
+WORDS = "the quick brown fox jumps over lazy dog Total Page Amount invoice item price".split()
+
+
+def bare_page(content: Node, page_content_lookup_cache: LayoutQuery | None = None) -> Node:
+    return padding(20, 20, 20, 20)(content)
+
+
+def main() -> None:
+    # PIL warns on every call when RAQM is requested but not installed
+    warnings.simplefilter("ignore")
+    fonts = Fonts()
+    font = fonts.load("arial", 14)
+    bold = font.same_but(bold=True)
+    rng = random.Random(1)
+    texts = [rng.choices(WORDS, k=rng.randint(20, 120)) for _ in range(500)]
+
+    def flow_paragraph(words: list[str]) -> Node:
+        return flow(
+            *(simple_text(w + " ", bold if i % 10 == 0 else font) for i, w in enumerate(words))
+        )
+
+    def spans_paragraph(words: list[str]) -> Node:
+        return paragraph(
+            tuple(
+                span(" ".join(words[i : i + 10]) + " ", bold if i % 20 == 0 else font)
+                for i in range(0, len(words), 10)
+            )
+        )
+
+    for name, make in (("flow", flow_paragraph), ("paragraph", spans_paragraph)):
+        doc = v_stack(*(padding(bottom=8)(make(words)) for words in texts))
+        start = time.perf_counter()
+        pages = sum(1 for _ in layout_multipage_document(Size(600, 800), bare_page, doc))
+        print(f"{name:>10}: {pages} pages in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
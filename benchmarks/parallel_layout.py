@@ -0,0 +1,41 @@
+"""Layout time of a wide dashboard of heavy cells, sequential and with a thread pool.
+
+Gains are expected only on free-threaded Python. Run with `python -m benchmarks.parallel_layout`.
+"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dcmntr.core import *
+from dcmntr.basic_layout import *
+
+
+def cell(row: int, col: int) -> Node:
+    return outline()(
+        v_stack(*(flow(*(box(3 + (i + row + col) % 7, 4) for i in range(60))) for _ in range(8)))
+    )
+
+
+def dashboard() -> Node:
+    return v_divide([INFINITY] * 8)(
+        *(h_divide([INFINITY] * 8)(*(cell(row, col) for col in range(8))) for row in range(8))
+    )
+
+
+def main() -> None:
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"GIL enabled: {gil}")
+    constraints = Size(2000, 4000).to_constraints_max()
+    for threads in (0, 2, 4, 8):
+        executor = ThreadPoolExecutor(threads) if threads else None
+        start = time.perf_counter()
+        for _ in range(3):
+            LayoutCtx(executor=executor).container_ctx().layout_node(dashboard(), constraints)
+        print(f"threads={threads}: {(time.perf_counter() - start) / 3:.3f}s")
+        if executor is not None:
+            executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""Rasterization time of kitchen sink pages with a process pool of different sizes.
+
+Run with `python -m benchmarks.parallel_render`.
+"""
+
+import os
+import time
+
+from dcmntr.core import *
+from dcmntr.paging import layout_multipage_document, render_multipage_document
+from tests.kitchen_sink.test_kitchen_sink import kitchen_sink, page_structure
+
+
+def main() -> None:
+    page_size = Size(210 * 5, 297 * 5)
+    pages = list(layout_multipage_document(page_size, page_structure, kitchen_sink())) * 10
+    print(f"{'workers':>8} {'pages':>6} {'time, s':>8}")
+    for workers in sorted({0, 2, os.cpu_count() or 1}):
+        start = time.perf_counter()
+        count = sum(1 for _ in render_multipage_document(pages, workers=workers))
+        print(f"{workers:>8} {count:>6} {time.perf_counter() - start:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
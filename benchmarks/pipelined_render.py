@@ -0,0 +1,39 @@
+"""Layout, rasterization and PNG encoding of kitchen sink pages, sequential and pipelined.
+
+Run with `python -m benchmarks.pipelined_render`.
+"""
+
+import io
+import time
+
+from PIL import Image
+
+from dcmntr.core import *
+from dcmntr.basic_layout import v_stack
+from dcmntr.paging import layout_multipage_document, render_multipage_document, render_pipelined
+from tests.kitchen_sink.test_kitchen_sink import kitchen_sink, page_structure
+
+
+def encode(img: Image.Image) -> int:
+    output = io.BytesIO()
+    img.save(output, format="PNG")
+    return len(output.getvalue())
+
+
+def main() -> None:
+    page_size = Size(210 * 5, 297 * 5)
+    content = v_stack(*(kitchen_sink() for _ in range(5)))
+
+    start = time.perf_counter()
+    pages = layout_multipage_document(page_size, page_structure, content)
+    count = sum(1 for img in render_multipage_document(pages) if encode(img))
+    print(f"sequential: {count} pages {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    pages = layout_multipage_document(page_size, page_structure, content)
+    count = sum(1 for _ in render_pipelined(pages, encode))
+    print(f"pipelined:  {count} pages {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Time of rendering a 256x256 tile of a kitchen sink page compared to the whole page.
+
+Run with `python -m benchmarks.region_render`.
+"""
+
+import time
+
+from dcmntr.core import *
+from dcmntr.display_list import compile_display_list
+from dcmntr.paging import layout_multipage_document
+from dcmntr.render import rasterize_page, render_region
+from tests.kitchen_sink.test_kitchen_sink import kitchen_sink, page_structure
+
+REPEAT = 20
+
+
+def main() -> None:
+    page_size = Size(210 * 5, 297 * 5)
+    _, layout = next(iter(layout_multipage_document(page_size, page_structure, kitchen_sink())))
+
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        rasterize_page(page_size, compile_display_list(layout))
+    print(f"page: {(time.perf_counter() - start) / REPEAT * 1000:.1f}ms")
+
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        render_region(layout, Region(256, 512, 256, 256))
+    print(f"tile: {(time.perf_counter() - start) / REPEAT * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""Pagination time of a long `v_stack` depending on the number of children.
+
+Run with `python -m benchmarks.stack_pagination`.
+"""
+
+import itertools
+import time
+
+from dcmntr.core import *
+from dcmntr.basic_layout import *
+from dcmntr.layout_query import LayoutQuery
+from dcmntr.paging import layout_multipage_document
+
+
+def bare_page(content: Node, page_content_lookup_cache: LayoutQuery | None = None) -> Node:
+    return content
+
+
+def main() -> None:
+    page_size = Size(200, 1000)  # 25 rows per page
+    row = padding(top=2, bottom=2)(outline()(box(100, 36)))
+    print(f"{'children':>9} {'pages':>6} {'time, s':>8} {'per child, us':>14}")
+    for count in (1_000, 10_000, 100_000):
+        doc = v_stack(*itertools.repeat(row, count))
+        start = time.perf_counter()
+        pages = sum(1 for _ in layout_multipage_document(page_size, bare_page, doc))
+        elapsed = time.perf_counter() - start
+        print(f"{count:>9} {pages:>6} {elapsed:>8.2f} {elapsed / count * 1e6:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Peak memory of rendering documents of different length into a multi-page file.
+
+Each run is a separate process, so peak RSS is not shared between runs.
+Run with `python -m benchmarks.streaming_writers`.
+"""
+
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from dcmntr.core import *
+from dcmntr.basic_layout import *
+from dcmntr.layout_query import LayoutQuery
+from dcmntr.paging import layout_multipage_document, render_multipage_document
+from dcmntr.writers import PageWriter, RasterPdfWriter, TiffWriter, write_pages
+
+PAGE_SIZE = Size(210 * 5, 297 * 5)
+
+
+def bare_page(content: Node, page_content_lookup_cache: LayoutQuery | None = None) -> Node:
+    return padding(40, 40, 40, 40)(content)
+
+
+def run(output_format: str, pages: int) -> None:
+    row = padding(top=4)(outline(fill="lightblue")(box(900, 100)))
+    doc = v_stack(*(row for _ in range(pages * 12)))
+    with tempfile.TemporaryFile() as fp:
+        writer: PageWriter = TiffWriter(fp) if output_format == "tiff" else RasterPdfWriter(fp)
+        start = time.perf_counter()
+        written = write_pages(
+            render_multipage_document(layout_multipage_document(PAGE_SIZE, bare_page, doc)),
+            writer,
+        )
+        elapsed = time.perf_counter() - start
+        size = fp.tell()
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{output_format:>5} {written:>6} {elapsed:>8.2f} {size / 2**20:>9.1f} {peak_mb:>12.1f}")
+
+
+def main() -> None:
+    print(f"{'file':>5} {'pages':>6} {'time, s':>8} {'size, MB':>9} {'peak RSS, MB':>12}")
+    for output_format in ("tiff", "pdf"):
+        for pages in (10, 100, 300):
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.streaming_writers", output_format, str(pages)],
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        run(sys.argv[1], int(sys.argv[2]))
+    else:
+        main()
@@ -0,0 +1,46 @@
+"""Time of writing 100 kitchen sink pages as SVG and as rasterized PNG.
+
+Layout is done once, only output is measured. Run with `python -m benchmarks.svg_render`.
+"""
+
+import io
+import time
+
+from dcmntr.core import *
+from dcmntr.basic_layout import v_stack
+from dcmntr.display_list import compile_display_list
+from dcmntr.paging import layout_multipage_document
+from dcmntr.render import rasterize_page
+from dcmntr.svg import write_svg
+from tests.kitchen_sink.test_kitchen_sink import kitchen_sink, page_structure
+
+
+def main() -> None:
+    page_size = Size(210 * 5, 297 * 5)
+    content = v_stack(*(kitchen_sink() for _ in range(34)))
+    pages = [
+        (size, compile_display_list(layout))
+        for size, layout in layout_multipage_document(page_size, page_structure, content)
+    ][:100]
+
+    start = time.perf_counter()
+    svg_bytes = 0
+    for size, display_list in pages:
+        output = io.StringIO()
+        write_svg(size, display_list, output)
+        svg_bytes += len(output.getvalue())
+    elapsed = time.perf_counter() - start
+    print(f"svg: {len(pages)} pages {elapsed:.2f}s {svg_bytes / 2**20:.2f} MB")
+
+    start = time.perf_counter()
+    png_bytes = 0
+    for size, display_list in pages:
+        png = io.BytesIO()
+        rasterize_page(size, display_list).save(png, format="PNG")
+        png_bytes += len(png.getvalue())
+    elapsed = time.perf_counter() - start
+    print(f"png: {len(pages)} pages {elapsed:.2f}s {png_bytes / 2**20:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Measuring many distinct short texts with PIL and with glyph advance tables.
+
+Run with `python -m benchmarks.text_measure`.
+"""
+
+import random
+import time
+import warnings
+
+from dcmntr.text import Fonts, SimpleText
+
+WORDS = "the quick brown fox jumps over lazy dog Total Page Amount invoice item price".split()
+
+
+def main() -> None:
+    # PIL warns on every call when RAQM is requested but not installed
+    warnings.simplefilter("ignore")
+    rng = random.Random(1)
+    texts = [" ".join(rng.choices(WORDS, k=rng.randint(1, 4))) + f" {i}" for i in range(20000)]
+    font = Fonts().load("arial", 14)
+
+    start = time.perf_counter()
+    expected = [SimpleText.multiline_text_size(text, font.pil_font, 2)[0] for text in texts]
+    print(f"PIL getbbox:      {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    widths = font.advances.widths(texts)
+    print(f"advances (cold):  {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    widths = font.advances.widths(texts)
+    print(f"advances (warm):  {time.perf_counter() - start:.2f}s")
+    assert widths == expected
+
+
+if __name__ == "__main__":
+    main()
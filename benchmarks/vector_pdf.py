@@ -0,0 +1,38 @@
+"""Time and size of kitchen sink pages written as raster and as vector PDF.
+
+Run with `python -m benchmarks.vector_pdf`.
+"""
+
+import io
+import time
+
+from dcmntr.core import *
+from dcmntr.basic_layout import v_stack
+from dcmntr.paging import layout_multipage_document, render_multipage_document
+from dcmntr.pdf import write_pdf
+from dcmntr.writers import RasterPdfWriter, write_pages
+from tests.kitchen_sink.test_kitchen_sink import kitchen_sink, page_structure
+
+
+def main() -> None:
+    page_size = Size(210 * 5, 297 * 5)
+    content = v_stack(*(kitchen_sink() for _ in range(5)))
+    dpi = 72 * 5
+
+    start = time.perf_counter()
+    output = io.BytesIO()
+    pages = layout_multipage_document(page_size, page_structure, content)
+    count = write_pages(render_multipage_document(pages), RasterPdfWriter(output, dpi=dpi))
+    elapsed = time.perf_counter() - start
+    print(f"raster: {count} pages {elapsed:.2f}s {len(output.getvalue()) / 2**20:.2f} MB")
+
+    start = time.perf_counter()
+    output = io.BytesIO()
+    pages = layout_multipage_document(page_size, page_structure, content)
+    count = write_pdf(pages, output, dpi=dpi)
+    elapsed = time.perf_counter() - start
+    print(f"vector: {count} pages {elapsed:.2f}s {len(output.getvalue()) / 2**20:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
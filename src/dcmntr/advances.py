@@ -0,0 +1,178 @@
+"""Text measurement from per-character advances, without shaping every text.
+
+Advances and ink extents of characters and kerning of character pairs are measured with
+PIL once per font and reused. Every pair is checked against PIL when it is first seen,
+pairs that do not add up (e.g. ligatures) and scripts that need shaping are measured by PIL.
+"""
+
+from __future__ import annotations
+
+import threading
+import unicodedata
+from math import floor
+from typing import Iterable
+
+from PIL.ImageFont import FreeTypeFont
+
+__all__ = [
+    "GlyphAdvances",
+]
+
+# Blocks of scripts with complex shaping, right-to-left scripts are found by bidi class.
+# Punctuation, currency and letterlike symbols in between are measured from the tables.
+_COMPLEX_SCRIPTS = (
+    (0x0590, 0x08FF),  # Hebrew, Arabic, Syriac, Thaana, NKo
+    (0x0900, 0x0DFF),  # Indic
+    (0x0E00, 0x0FFF),  # Thai, Lao, Tibetan
+    (0x1000, 0x109F),  # Myanmar
+    (0x1100, 0x11FF),  # Hangul Jamo
+    (0x1780, 0x18AF),  # Khmer, Mongolian
+    (0x1A00, 0x1CFF),  # Tai Tham, Balinese, Sundanese, Batak, Lepcha, Vedic
+    (0xA800, 0xABFF),  # Syloti Nagri to Meetei Mayek
+    (0xFB1D, 0xFDFF),  # Hebrew and Arabic presentation forms
+    (0xFE70, 0xFEFF),  # Arabic presentation forms
+)
+# Emoji sequences and historic scripts
+_COMPLEX_PLANES_START = 0x10000
+_RTL_CLASSES = frozenset(("R", "AL", "AN"))
+
+
+def _needs_shaping(char: str) -> bool:
+    codepoint = ord(char)
+    return (
+        codepoint >= _COMPLEX_PLANES_START
+        or any(start <= codepoint <= end for start, end in _COMPLEX_SCRIPTS)
+        or unicodedata.bidirectional(char) in _RTL_CLASSES
+        or unicodedata.combining(char) != 0
+        or not char.isprintable()
+    )
+
+
+class GlyphAdvances:
+    """Measures text with the font like FreeTypeFont.getbbox() does. Thread-safe."""
+
+    def __init__(self, pil_font: FreeTypeFont, lock: threading.Lock) -> None:
+        self.pil_font = pil_font
+        self.lock = lock
+        ascent, descent = pil_font.getmetrics()
+        self.ascent = ascent
+        self.line_height = ascent + descent
+        # Character to (advance, ink left, ink right) relative to the pen position
+        self.chars: dict[str, tuple[float, int, int]] = {}
+        # Kerning of character pairs, None for pairs that are shaped differently
+        self.pairs: dict[str, float | None] = {}
+
+    def width(self, text: str) -> float:
+        """Width of the ink bounding box of a single line of text."""
+        if not text:
+            return 0
+        chars = self.chars
+        pairs = self.pairs
+        pen = 0.0
+        left = right = 0.0
+        previous = ""
+        for char in text:
+            glyph = chars.get(char)
+            if glyph is None:
+                glyph = self._measure_char(char)
+                if glyph is None:
+                    return self._shaped_width(text)
+            if previous:
+                pair = previous + char
+                kerning = pairs[pair] if pair in pairs else self._measure_pair(pair)
+                if kerning is None:
+                    return self._shaped_width(text)
+                pen += kerning
+                # Glyphs are drawn at whole pixels
+                x = floor(pen + 0.5)
+                left = min(left, x + glyph[1])
+                right = max(right, x + glyph[2])
+            else:
+                left, right = glyph[1], glyph[2]
+            pen += glyph[0]
+            previous = char
+        return right - left
+
+    def length(self, text: str) -> float:
+        """Advance of the pen after a single line of text, like FreeTypeFont.getlength()."""
+        chars = self.chars
+        pairs = self.pairs
+        pen = 0.0
+        previous = ""
+        for char in text:
+            glyph = chars.get(char)
+            if glyph is None:
+                glyph = self._measure_char(char)
+                if glyph is None:
+                    return self._shaped_length(text)
+            if previous:
+                pair = previous + char
+                kerning = pairs[pair] if pair in pairs else self._measure_pair(pair)
+                if kerning is None:
+                    return self._shaped_length(text)
+                pen += kerning
+            pen += glyph[0]
+            previous = char
+        return pen
+
+    def offsets(self, text: str) -> list[float] | None:
+        """Pen positions before every character of a single line, as length() adds them up.
+
+        None for texts that are shaped by PIL instead.
+        """
+        chars = self.chars
+        pairs = self.pairs
+        offsets = []
+        pen = 0.0
+        previous = ""
+        for char in text:
+            glyph = chars.get(char)
+            if glyph is None:
+                glyph = self._measure_char(char)
+                if glyph is None:
+                    return None
+            if previous:
+                pair = previous + char
+                kerning = pairs[pair] if pair in pairs else self._measure_pair(pair)
+                if kerning is None:
+                    return None
+                pen += kerning
+            offsets.append(pen)
+            pen += glyph[0]
+            previous = char
+        return offsets
+
+    def widths(self, texts: Iterable[str]) -> list[float]:
+        """Widths of many single line texts at once."""
+        width = self.width
+        return [width(text) for text in texts]
+
+    def _shaped_width(self, text: str) -> float:
+        with self.lock:
+            bbox = self.pil_font.getbbox(text)
+        return bbox[2] - bbox[0]
+
+    def _shaped_length(self, text: str) -> float:
+        with self.lock:
+            return self.pil_font.getlength(text)
+
+    def _measure_char(self, char: str) -> tuple[float, int, int] | None:
+        if _needs_shaping(char):
+            return None
+        with self.lock:
+            advance = self.pil_font.getlength(char)
+            bbox = self.pil_font.getbbox(char)
+        glyph = (advance, int(bbox[0]), int(bbox[2]))
+        self.chars[char] = glyph
+        return glyph
+
+    def _measure_pair(self, pair: str) -> float | None:
+        first, second = self.chars[pair[0]], self.chars[pair[1]]
+        with self.lock:
+            kerning = self.pil_font.getlength(pair) - first[0] - second[0]
+            bbox = self.pil_font.getbbox(pair)
+        x = floor(first[0] + kerning + 0.5)
+        expected = max(first[2], x + second[2]) - min(first[1], x + second[1])
+        result = kerning if bbox[2] - bbox[0] == expected else None
+        self.pairs[pair] = result
+        return result
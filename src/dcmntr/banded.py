@@ -0,0 +1,237 @@
+"""Rendering of very large pages in horizontal bands.
+
+Only nodes that intersect a band are drawn into it, and each band is written to the encoder
+before the next one is drawn, so memory depends on the band height and not on the page area.
+"""
+
+from __future__ import annotations
+
+import abc
+import struct
+import zlib
+from math import ceil
+from pathlib import Path
+from types import TracebackType
+from typing import BinaryIO, Generator
+
+from PIL import Image
+
+from dcmntr.basic_layout import Color
+from dcmntr.core import *
+from dcmntr.render import render_region
+
+__all__ = [
+    "render_bands",
+    "BandWriter",
+    "PngBandWriter",
+    "TiffBandWriter",
+    "render_banded",
+    "render_into_file_banded",
+]
+
+
+def render_bands(
+    layout: Layout,
+    page_size: Size,
+    band_height: int = 512,
+    background_color: Color = "white",
+) -> Generator[Image.Image, None, None]:
+    """Images of horizontal bands of the page from top to bottom, the last one may be shorter."""
+    width, height = ceil(page_size.width), ceil(page_size.height)
+    for top in range(0, height, band_height):
+        region = Region(0, top, width, min(band_height, height - top))
+        yield render_region(layout, region, background_color)
+
+
+class BandWriter(abc.ABC):
+    """Image file written band by band. Mode is RGB or RGBA."""
+
+    def __init__(self, fp: BinaryIO, width: int, height: int, mode: str = "RGB") -> None:
+        if mode not in ("RGB", "RGBA"):
+            raise ValueError(f"Unsupported mode {mode}")
+        if width <= 0 or height <= 0:
+            raise ValueError(f"Image of size {width}x{height} is empty")
+        self.fp = fp
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.rows = 0
+
+    def write(self, band: Image.Image) -> None:
+        if band.width != self.width or self.rows + band.height > self.height:
+            raise ValueError(f"Band of size {band.size} does not fit the image")
+        if band.mode != self.mode:
+            band = band.convert(self.mode)
+        self.write_rows(band)
+        self.rows += band.height
+
+    @abc.abstractmethod
+    def write_rows(self, band: Image.Image) -> None:
+        """Encodes the rows of the band, already checked and converted to the mode."""
+
+    def close(self) -> None:
+        if self.rows != self.height:
+            raise ValueError(f"Image has {self.rows} rows written out of {self.height}")
+
+    def __enter__(self) -> BandWriter:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            self.close()
+
+
+class PngBandWriter(BandWriter):
+    """PNG with rows compressed as they come. File does not need to be seekable.
+
+    Rows are not filtered, so files are larger than ones saved by PIL.
+    """
+
+    def __init__(
+        self,
+        fp: BinaryIO,
+        width: int,
+        height: int,
+        mode: str = "RGB",
+        compress_level: int = 6,
+    ) -> None:
+        super().__init__(fp, width, height, mode)
+        self._compressor = zlib.compressobj(compress_level)
+        color_type = 2 if mode == "RGB" else 6
+        fp.write(b"\x89PNG\r\n\x1a\n")
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0))
+
+    def write_rows(self, band: Image.Image) -> None:
+        data = band.tobytes()
+        stride = len(data) // band.height
+        # Every row starts with the filter type, 0 is none
+        rows = b"".join(
+            b"\0" + data[offset : offset + stride] for offset in range(0, len(data), stride)
+        )
+        compressed = self._compressor.compress(rows)
+        if compressed:
+            self._chunk(b"IDAT", compressed)
+
+    def close(self) -> None:
+        super().close()
+        self._chunk(b"IDAT", self._compressor.flush())
+        self._chunk(b"IEND", b"")
+        self.fp.flush()
+
+    def _chunk(self, chunk_type: bytes, data: bytes) -> None:
+        self.fp.write(struct.pack(">I", len(data)))
+        self.fp.write(chunk_type + data)
+        self.fp.write(struct.pack(">I", zlib.crc32(chunk_type + data)))
+
+
+class TiffBandWriter(BandWriter):
+    """TIFF with a deflate compressed strip per band. File must be seekable.
+
+    All the bands but the last one must have the same height.
+    """
+
+    def __init__(self, fp: BinaryIO, width: int, height: int, mode: str = "RGB") -> None:
+        super().__init__(fp, width, height, mode)
+        self._start = fp.tell()
+        # Offset of the directory is patched on close
+        fp.write(b"II*\0\0\0\0\0")
+        self._position = 8
+        self._strips: list[tuple[int, int]] = []
+        self._rows_per_strip: int | None = None
+
+    def write_rows(self, band: Image.Image) -> None:
+        if self._rows_per_strip is None:
+            self._rows_per_strip = band.height
+        elif self.rows % self._rows_per_strip or band.height > self._rows_per_strip:
+            raise ValueError("All the bands but the last one must have the same height")
+        data = zlib.compress(band.tobytes())
+        self._strips.append((self._position, len(data)))
+        self._write(data)
+
+    def close(self) -> None:
+        super().close()
+        samples = len(self.mode)
+        strips = len(self._strips)
+        # Values that do not fit into directory entries are written before it
+        bits_offset = self._position
+        self._write(struct.pack(f"<{samples}H", *(8,) * samples))
+        offsets_offset = self._position
+        self._write(struct.pack(f"<{strips}I", *(offset for offset, _ in self._strips)))
+        counts_offset = self._position
+        self._write(struct.pack(f"<{strips}I", *(count for _, count in self._strips)))
+        self._write(b"\0" * (self._position % 2))
+
+        short, long = 3, 4
+        entries = [
+            (256, long, 1, self.width),
+            (257, long, 1, self.height),
+            (258, short, samples, bits_offset),
+            (259, short, 1, 8),  # Deflate
+            (262, short, 1, 2),  # RGB
+            (273, long, strips, offsets_offset if strips > 1 else self._strips[0][0]),
+            (277, short, 1, samples),
+            (278, long, 1, self._rows_per_strip or self.height),
+            (279, long, strips, counts_offset if strips > 1 else self._strips[0][1]),
+            (284, short, 1, 1),  # Contiguous samples
+        ]
+        if samples == 4:
+            entries.append((338, short, 1, 2))  # Unassociated alpha
+        directory = self._position
+        self._write(struct.pack("<H", len(entries)))
+        for tag, value_type, count, value in entries:
+            if value_type == short and count == 1:
+                self._write(struct.pack("<HHIHH", tag, value_type, count, value, 0))
+            else:
+                self._write(struct.pack("<HHII", tag, value_type, count, value))
+        self._write(b"\0\0\0\0")
+
+        self.fp.seek(self._start + 4)
+        self.fp.write(struct.pack("<I", directory))
+        self.fp.seek(self._start + self._position)
+        self.fp.flush()
+
+    def _write(self, data: bytes) -> None:
+        self.fp.write(data)
+        self._position += len(data)
+
+
+def render_banded(
+    layout: Layout,
+    page_size: Size,
+    writer: BandWriter,
+    band_height: int = 512,
+    background_color: Color = "white",
+) -> None:
+    """Renders the page band by band into the writer and closes it."""
+    with writer:
+        for band in render_bands(layout, page_size, band_height, background_color):
+            writer.write(band)
+
+
+def render_into_file_banded(
+    filename: str | Path,
+    width: int,
+    height: int,
+    document: Node,
+    band_height: int = 512,
+    background_color: Color = "white",
+) -> None:
+    """Like render_into_image, but for pages too large to keep in memory. PNG or TIFF."""
+    layout = (
+        LayoutCtx().container_ctx().layout_node(document, Size(width, height).to_constraints_max())
+    )
+    suffix = Path(filename).suffix.lower()
+    with open(filename, "wb") as fp:
+        writer: BandWriter
+        if suffix == ".png":
+            writer = PngBandWriter(fp, width, height)
+        elif suffix in (".tif", ".tiff"):
+            writer = TiffBandWriter(fp, width, height)
+        else:
+            raise ValueError(f"Unsupported file type {suffix}")
+        render_banded(layout, Size(width, height), writer, band_height, background_color)
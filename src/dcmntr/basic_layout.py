@@ -1,12 +1,15 @@
+from __future__ import annotations
+
 from dcmntr.core import *
 from dataclasses import dataclass
+from typing import Any, Iterable
 
 from dcmntr.core import (
-    LayoutAxisOverflowException,
+    LayoutOverflow,
     NodeLayout,
     NodeLayoutCtx,
-    LayoutCrossAxisOverflowException,
 )
+from dcmntr.display_list import DrawOp, Line, Rect
 
 __all__ = [
     "Color",
@@ -31,48 +34,77 @@ __all__ = [
 type Color = str | tuple[int, int, int] | tuple[int, int, int, int]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Layers(Node):
 
-    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout:
-        layouts = tuple(ctx.layout_node(node, constraints) for node in self.children)
-        leftovers = [l.layout.leftover for l in layouts if l.layout.leftover is not None]
+    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout | LayoutOverflow:
+        layouts = []
+        for layout in ctx.try_layout_children(
+            [(node, constraints, 0, 0) for node in self.children]
+        ):
+            if isinstance(layout, LayoutOverflow):
+                return layout
+            layouts.append(layout)
         leftover = None
-        if leftovers:
-            leftover = self(*leftovers)
+        if any(l.layout.leftover is not None for l in layouts):
+            # Finished layers are kept as placeholders, so leftover children stay aligned
+            leftover = self(
+                *(FINISHED if l.layout.leftover is None else l.layout.leftover for l in layouts)
+            )
 
-        return NodeLayout(Size.that_fit_layouts(layouts), layouts, leftover=leftover)
+        return NodeLayout(Size.that_fit_layouts(layouts), tuple(layouts), leftover=leftover)
+
+    def split_position(self) -> Any:
+        positions = tuple(child.split_position() for child in self.children)
+        if all(position is None for position in positions):
+            return None
+        return positions
+
+    def resume(self, position: Any) -> Node:
+        if position is None or position == ():
+            return self
+        return self(
+            *(
+                FINISHED if p is True else child.resume(p)
+                for child, p in zip(self.children, position, strict=True)
+            )
+        )
 
 
 layers = Layers()
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Stack(Node):
     direction: Size
+    # Leftover of a stack is a view into the same children: it starts from children[start],
+    # which is replaced by `head` (leftover of that child) if it was split.
+    start: int = 0
+    head: Node | None = None
 
-    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout:
+    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout | LayoutOverflow:
         x: float = 0
         y: float = 0
-        max_size: Size = Size(0, 0)
+        max_size: Size = ZERO_SIZE
         layouts: list[Layout] = []
         leftover: Node | None = None
         if self.direction.width:
             # Horizontal container can not split, only move to the next page
             ctx.can_split = False
         constraints_left = constraints
-        for idx, node in enumerate(self.children):
-            try:
-                layout = ctx.layout_node(
-                    node,
-                    constraints_left,
-                    x=x,
-                    y=y,
-                )
-            except LayoutAxisOverflowException:
-                if not ctx.can_split:
-                    raise
-                leftover = self(*self.children[idx:])
+        children = self.children
+        for idx in range(self.start, len(children)):
+            node = self.head if idx == self.start and self.head is not None else children[idx]
+            layout = ctx.try_layout_node(
+                node,
+                constraints_left,
+                x=x,
+                y=y,
+            )
+            if isinstance(layout, LayoutOverflow):
+                if layout.cross_axis or not ctx.can_split:
+                    return layout
+                leftover = self.resume_from(idx, node if node is not children[idx] else None)
                 break
             layouts.append(layout)
 
@@ -83,7 +115,7 @@ class Stack(Node):
             constraints_left = constraints_left.shrink_by(step.width, step.height)
 
             if layout.layout.leftover is not None:
-                leftover = self(layout.layout.leftover, *self.children[idx + 1 :])
+                leftover = self.resume_from(idx, layout.layout.leftover)
                 break
 
         if self.direction.height:
@@ -96,25 +128,42 @@ class Stack(Node):
 
         return NodeLayout(size, tuple(layouts), leftover=leftover)
 
+    def split_position(self) -> Any:
+        if self.start == 0 and self.head is None:
+            return None
+        return (self.start, None if self.head is None else self.head.split_position())
+
+    def resume(self, position: Any) -> Node:
+        if position is None or position == ():
+            return self
+        start, head_position = position
+        head = None if head_position is None else self.children[start].resume(head_position)
+        return self.resume_from(start, head)
+
+    def resume_from(self, idx: int, head: Node | None) -> Stack:
+        """The same stack that starts from idx-th child (or its leftover) without copying children."""
+        clone = self.clone_without_children(start=idx, head=head, children=self.children)
+        assert isinstance(clone, Stack)
+        return clone
+
 
 v_stack = Stack(direction=Size(0, 1))
 h_stack = Stack(direction=Size(1, 0))
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Box(Node):
     """Supports infinite width and/or height. In this case it will fill maximum space in width or height."""
 
     width: float = INFINITY
     height: float = INFINITY
 
-    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout:
+    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout | LayoutOverflow:
         assert len(self.children) <= 1
 
-        size = Size(
-            self.width if self.width != INFINITY else constraints.max_width,
-            self.height if self.height != INFINITY else constraints.max_height,
-        )
+        size = self.measure(ctx, constraints)
+        if not self.children:
+            return NodeLayout(size, ())
         child_constraints = Constraints(
             constraints.min_width,
             size.width,
@@ -122,15 +171,23 @@ class Box(Node):
             size.height,
         )
 
-        child_layouts = tuple(ctx.layout_node(node, child_constraints) for node in self.children)
-        return NodeLayout(size, tuple(child_layouts))
+        layout = ctx.try_layout_node(self.children[0], child_constraints)
+        if isinstance(layout, LayoutOverflow):
+            return layout
+        return NodeLayout(size, (layout,))
+
+    def measure(self, ctx: NodeLayoutCtx, constraints: Constraints) -> Size:
+        return Size(
+            self.width if self.width != INFINITY else constraints.max_width,
+            self.height if self.height != INFINITY else constraints.max_height,
+        )
 
 
 box: type[Box] = Box
 expand = box(width=INFINITY, height=INFINITY)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Outline(Node):
     fill: Color | None = None
     border_width: int | None = 1
@@ -140,118 +197,98 @@ class Outline(Node):
     border_right: bool = True
     border_bottom: bool = True
     border_left: bool = True
-
-    def draw_image(self, x: float, y: float, layout: Layout, draw_ctx: ImageDrawCtx) -> None:
-        if layout.layout.size.width > 0 and layout.layout.size.height > 0:
-            draw_ctx.draw.rectangle(
-                [
-                    (x, y),
-                    (
-                        x + layout.layout.size.width - 1,
-                        y + layout.layout.size.height - 1,
-                    ),
-                ],
-                fill=self.fill,
-                width=0,
-            )
-
-            for should_draw, coords in (
-                (
-                    self.border_top,
-                    [
-                        (x, y),
-                        (
-                            x + layout.layout.size.width - 1,
-                            y,
-                        ),
-                    ],
-                ),
-                (
-                    self.border_right,
-                    [
-                        (x + layout.layout.size.width - 1, y),
-                        (
-                            x + layout.layout.size.width - 1,
-                            y + layout.layout.size.height - 1,
-                        ),
-                    ],
-                ),
-                (
-                    self.border_left,
-                    [
-                        (x, y),
-                        (
-                            x,
-                            y + layout.layout.size.height - 1,
-                        ),
-                    ],
-                ),
-                (
-                    self.border_bottom,
-                    [
-                        (x, y + layout.layout.size.height - 1),
-                        (
-                            x + layout.layout.size.width - 1,
-                            y + layout.layout.size.height - 1,
-                        ),
-                    ],
-                ),
-            ):
-                if should_draw:
-                    draw_ctx.draw.line(
-                        coords,
-                        fill=self.border_color,
-                        width=self.border_width or 0,
-                    )
-
-    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout:
+    # Leftover of a split outline, see continuation()
+    continued: bool = False
+
+    def draw_ops(self, x: float, y: float, layout: Layout) -> Iterable[DrawOp]:
+        width, height = layout.layout.size.width, layout.layout.size.height
+        if width <= 0 or height <= 0:
+            return ()
+        right, bottom = x + width - 1, y + height - 1
+        ops: list[DrawOp] = []
+        if self.fill is not None:
+            ops.append(Rect(x, y, right, bottom, self.fill))
+        line_width = self.border_width or 0
+        # Border color None still draws with the default ink, as PIL does
+        if self.border_top:
+            ops.append(Line(x, y, right, y, self.border_color, line_width))
+        if self.border_right:
+            ops.append(Line(right, y, right, bottom, self.border_color, line_width))
+        if self.border_left:
+            ops.append(Line(x, y, x, bottom, self.border_color, line_width))
+        if self.border_bottom:
+            ops.append(Line(x, bottom, right, bottom, self.border_color, line_width))
+        return ops
+
+    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout | LayoutOverflow:
         assert len(self.children) <= 1
-        layouts = tuple(ctx.layout_node(node, constraints) for node in self.children)
+        if not self.children:
+            return NodeLayout(constraints.min_size(), ())
+        layout = ctx.try_layout_node(self.children[0], constraints)
+        if isinstance(layout, LayoutOverflow):
+            return layout
 
         leftover: Node | None = None
         node_override: Node | None = None
-        if len(layouts) == 1 and layouts[0].layout.leftover is not None:
-            node_override = self.clone_without_children(border_bottom=False)(layouts[0].get_node())
-            leftover = self.clone_without_children(border_top=False)(layouts[0].layout.leftover)
+        if layout.layout.leftover is not None:
+            node_override = self.clone_without_children(border_bottom=False)(layout.get_node())
+            leftover = self.continuation()(layout.layout.leftover)
 
         return NodeLayout(
-            layouts[0].layout.size if layouts else constraints.min_size(),
-            layouts,
+            layout.layout.size,
+            (layout,),
             node_override=node_override,
             leftover=leftover,
         )
 
+    def measure(self, ctx: NodeLayoutCtx, constraints: Constraints) -> Size:
+        assert len(self.children) <= 1
+        if not self.children:
+            return constraints.min_size()
+        return ctx.measure_node(self.children[0], constraints)
+
+    def continuation(self) -> Outline:
+        """Outline for the next pages, already continued outline is reused as is."""
+        if self.continued:
+            return self
+        clone = self.clone_without_children(border_top=False, continued=True)
+        assert isinstance(clone, Outline)
+        return clone
+
+    def is_continuation(self) -> bool:
+        return self.continued
+
 
 outline: type[Outline] = Outline
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PositionOffset(Node):
 
-    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout:
+    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout | LayoutOverflow:
         assert len(self.children) == 1
-        layout = ctx.layout_node(self.children[0], constraints)
+        layout = ctx.try_layout_node(self.children[0], constraints)
+        if isinstance(layout, LayoutOverflow):
+            return layout
         leftover: Node | None = None
         if layout.layout.leftover is not None:
             if self.can_split() and ctx.can_split:
                 leftover = self(layout.layout.leftover)
             else:
-                raise LayoutAxisOverflowException(
+                return LayoutOverflow(
                     node=self,
                     size=layout.layout.size,
                     constraints=constraints,
                 )
 
         x, y, size = self.get_offset(constraints.max_size(), layout.layout.size)
-        # TODO double layout :(
-        child_constraints = Constraints(
-            constraints.min_width,
-            size.width,
-            constraints.min_height,
-            size.height,
-        )
-        layout = ctx.layout_node(self.children[0], child_constraints, x=x, y=y)
-        return NodeLayout(size, (layout,), leftover=leftover)
+        # Child size already fits into (constraints.min, size), so moving it is enough
+        return NodeLayout(size, (layout.translate(x, y),), leftover=leftover)
+
+    def measure(self, ctx: NodeLayoutCtx, constraints: Constraints) -> Size:
+        assert len(self.children) == 1
+        child_size = ctx.measure_node(self.children[0], constraints)
+        return self.get_offset(constraints.max_size(), child_size)[2]
 
     def get_offset(self, max_size: Size, child_size: Size) -> tuple[float, float, Size]:
         raise NotImplementedError("get_offset must be implemented by a subclass")
@@ -260,7 +297,7 @@ class PositionOffset(Node):
         return False
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Right(PositionOffset):
     def get_offset(self, max_size: Size, child_size: Size) -> tuple[float, float, Size]:
         return max_size.width - child_size.width, 0, Size(max_size.width, child_size.height)
@@ -272,7 +309,7 @@ class Right(PositionOffset):
 right = Right()
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class HCenter(PositionOffset):
     def get_offset(self, max_size: Size, child_size: Size) -> tuple[float, float, Size]:
         return (max_size.width - child_size.width) / 2, 0, Size(max_size.width, child_size.height)
@@ -284,6 +321,7 @@ class HCenter(PositionOffset):
 h_center = HCenter()
 
 
+@dataclass(frozen=True, slots=True)
 class Center(PositionOffset):
     def get_offset(self, max_size: Size, child_size: Size) -> tuple[float, float, Size]:
         return (
@@ -296,6 +334,7 @@ class Center(PositionOffset):
 center = Center()
 
 
+@dataclass(frozen=True, slots=True)
 class Bottom(PositionOffset):
     def get_offset(self, max_size: Size, child_size: Size) -> tuple[float, float, Size]:
         return 0, max_size.height - child_size.height, Size(child_size.width, max_size.height)
@@ -304,6 +343,7 @@ class Bottom(PositionOffset):
 bottom = Bottom()
 
 
+@dataclass(frozen=True, slots=True)
 class VCenter(PositionOffset):
     def get_offset(self, max_size: Size, child_size: Size) -> tuple[float, float, Size]:
         return 0, (max_size.height - child_size.height) / 2, Size(child_size.width, max_size.height)
@@ -312,37 +352,42 @@ class VCenter(PositionOffset):
 v_center = VCenter()
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Padding(Node):
     left: float = 0
     top: float = 0
     right: float = 0
     bottom: float = 0
+    # Leftover of a split padding, see continuation()
+    continued: bool = False
 
-    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout:
+    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout | LayoutOverflow:
         if len(self.children) == 0:
             return NodeLayout(Size(self.left + self.right, self.top + self.bottom), ())
         assert len(self.children) == 1
         if constraints.max_width < self.left + self.right:
-            raise LayoutCrossAxisOverflowException(
+            return LayoutOverflow(
                 node=self,
                 constraints=constraints,
                 size=Size(self.left + self.right, 0),
+                cross_axis=True,
             )
         if constraints.max_height < self.top + self.bottom:
-            raise LayoutAxisOverflowException(
+            return LayoutOverflow(
                 node=self,
                 constraints=constraints,
                 size=Size(self.left + self.right, self.top + self.bottom),
             )
         new_constraints = constraints.shrink_by(self.left + self.right, self.top + self.bottom)
 
-        layout = ctx.layout_node(
+        layout = ctx.try_layout_node(
             self.children[0],
             new_constraints,
             x=self.left,
             y=self.top,
         )
+        if isinstance(layout, LayoutOverflow):
+            return layout
 
         leftover = None
         if layout.layout.leftover is not None:
@@ -350,7 +395,7 @@ class Padding(Node):
                 layout.layout.size.width + self.left + self.right,
                 constraints.max_height,
             )
-            leftover = self.clone_without_children(top=0)(layout.layout.leftover)
+            leftover = self.continuation()(layout.layout.leftover)
         else:
             size = Size(
                 layout.layout.size.width + self.left + self.right,
@@ -363,15 +408,35 @@ class Padding(Node):
             leftover=leftover,
         )
 
+    def continuation(self) -> Padding:
+        """Padding for the next pages, already continued padding is reused as is."""
+        if self.continued:
+            return self
+        clone = self.clone_without_children(top=0, continued=True)
+        assert isinstance(clone, Padding)
+        return clone
+
+    def is_continuation(self) -> bool:
+        return self.continued
+
+    def measure(self, ctx: NodeLayoutCtx, constraints: Constraints) -> Size:
+        if len(self.children) == 0:
+            return Size(self.left + self.right, self.top + self.bottom)
+        assert len(self.children) == 1
+        new_constraints = constraints.shrink_by(self.left + self.right, self.top + self.bottom)
+        return ctx.measure_node(self.children[0], new_constraints).add(
+            self.left + self.right, self.top + self.bottom
+        )
+
 
 padding = Padding
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Flow(Node):
     """Simple flow, node by node with node-wrapping to the next 'line'."""
 
-    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout:
+    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout | LayoutOverflow:
 
         max_row_width = 0.0
 
@@ -388,21 +453,23 @@ class Flow(Node):
             row_width = 0.0
             while children:
                 node = children[-1]
-                try:
-                    child_layout = ctx.layout_node(
-                        node,
-                        row_constraints,
-                        x=row_width,
-                        y=row_y,
-                    )
-                except LayoutAxisOverflowException as e:
-                    # Can not split yet, just raise full
-                    raise LayoutAxisOverflowException(
-                        node=self,
-                        constraints=e.constraints,
-                        size=e.size,
-                    )
-                except LayoutCrossAxisOverflowException:
+                child_layout = ctx.try_layout_node(
+                    node,
+                    row_constraints,
+                    x=row_width,
+                    y=row_y,
+                )
+                if isinstance(child_layout, LayoutOverflow):
+                    if not child_layout.cross_axis:
+                        # Can not split yet, overflow as a whole
+                        return LayoutOverflow(
+                            node=self,
+                            constraints=child_layout.constraints,
+                            size=child_layout.size,
+                        )
+                    if not row_width:
+                        # Does not fit even into an empty row, wrapping would not help
+                        return child_layout
                     break
 
                 children_layouts.append(child_layout)
@@ -424,20 +491,20 @@ class Flow(Node):
 flow = Flow()
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class MinSize(Node):
     width: float
     height: float
 
-    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout:
+    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout | LayoutOverflow:
         assert len(self.children) == 1
-        return super().layout(ctx, constraints.set_min_size(Size(self.width, self.height)))
+        return Node.layout(self, ctx, constraints.set_min_size(Size(self.width, self.height)))
 
 
 ensure_size: type[MinSize] = MinSize
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class HDivide(Node):
     divisions: list[float]
     direction = Size(1, 0)
@@ -446,7 +513,7 @@ class HDivide(Node):
     def __post_init__(self) -> None:
         assert self.divisions
 
-    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout:
+    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout | LayoutOverflow:
         assert len(self.children) == len(
             self.divisions
         ), f"Number of children {len(self.children)} does not match divisions: {self.divisions}"
@@ -465,7 +532,7 @@ class HDivide(Node):
             else 0
         )
 
-        layouts = []
+        cells = []
         axis_position = 0.0
         for division, node in zip(self.divisions, self.children):
             axis_size = division if division != INFINITY else infinite_column_width
@@ -474,10 +541,14 @@ class HDivide(Node):
                 axis_size if self.direction.width else constraints.max_width,
                 axis_size if self.direction.height else constraints.max_height,
             )
+            cells.append((node, size.to_constraints_max(), pos.width, pos.height))
+            axis_position += axis_size
 
-            layout = ctx.layout_node(node, size.to_constraints_max(), x=pos.width, y=pos.height)
+        layouts = []
+        for layout in ctx.try_layout_children(cells):
+            if isinstance(layout, LayoutOverflow):
+                return layout
             layouts.append(layout)
-            axis_position += axis_size
         return NodeLayout(
             Size(
                 axis_position if self.direction.width else constraints.max_width,
@@ -487,7 +558,7 @@ class HDivide(Node):
         )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class VDivide(HDivide):
     direction = Size(0, 1)
     can_split = False  # TODO implement split for VDivide
@@ -1,22 +1,33 @@
 from __future__ import annotations
 
+from concurrent.futures import Executor
 from dataclasses import dataclass, field, replace
 from functools import wraps
 import math
-from typing import Any, Generator, Callable, Iterable
+import threading
+from typing import TYPE_CHECKING, Any, Generator, Callable, Iterable, Sequence
 from weakref import WeakKeyDictionary
 
 from PIL import Image
 from PIL.ImageDraw import ImageDraw
 
+from dcmntr.lru import LRUCache
+
+if TYPE_CHECKING:
+    from dcmntr.display_list import DrawOp
+
 __all__ = [
     "INFINITY",
+    "ZERO_SIZE",
     "Constraints",
     "Size",
+    "Region",
     "Layout",
     "NodeLayout",
     "Node",
     "LeafNode",
+    "Finished",
+    "FINISHED",
     "Tag",
     "tag_with_value",
     "with_tag",
@@ -24,7 +35,10 @@ __all__ = [
     "materialize_deferred",
     "walk_layout",
     "LayoutCtx",
+    "LayoutCache",
+    "CachedLayout",
     "NodeLayoutCtx",
+    "LayoutOverflow",
     "LayoutAxisOverflowException",
     "LayoutCrossAxisOverflowException",
     "ImageDrawCtx",
@@ -34,7 +48,7 @@ __all__ = [
 INFINITY = math.inf
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Constraints:
 
     # min and max are inclusive
@@ -96,6 +110,8 @@ class Constraints:
         return self.max_width == INFINITY or self.max_height == INFINITY
 
     def min_size(self) -> Size:
+        if not self.min_width and not self.min_height:
+            return ZERO_SIZE
         return Size(self.min_width, self.min_height)
 
     def max_size(self) -> Size:
@@ -108,7 +124,7 @@ class Constraints:
         return Size(size.width, self.max_height)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Size:
     width: float
     height: float
@@ -142,7 +158,31 @@ class Size:
         return Size(width, height)
 
 
-@dataclass(frozen=True)
+ZERO_SIZE = Size(0, 0)
+
+
+@dataclass(frozen=True, slots=True)
+class Region:
+    """Rectangle of a page, e.g. to render only a part of it."""
+
+    x: float
+    y: float
+    width: float
+    height: float
+
+    def size(self) -> Size:
+        return Size(self.width, self.height)
+
+    def intersects(self, x: float, y: float, size: Size) -> bool:
+        return (
+            x < self.x + self.width
+            and self.x < x + size.width
+            and y < self.y + self.height
+            and self.y < y + size.height
+        )
+
+
+@dataclass(frozen=True, slots=True)
 class NodeLayout:
     size: Size
     children: tuple[Layout, ...]
@@ -163,8 +203,14 @@ class NodeLayout:
             children=tuple(l.strip_leftover() for l in self.children),
         )
 
+    def translate(self, dx: float, dy: float) -> NodeLayout:
+        """Same layout with all children moved by dx, dy."""
+        if not dx and not dy:
+            return self
+        return replace(self, children=tuple(l.translate(dx, dy) for l in self.children))
+
 
-@dataclass(frozen=True, init=False)
+@dataclass(frozen=True, slots=True)
 class Node:
     children: tuple[Node, ...] = field(
         default=(),
@@ -172,37 +218,102 @@ class Node:
         repr=False,
     )
 
+    # Layout depends only on the node, constraints and can_split, so it can be memoized
+    cacheable = True
+
     def clone_without_children(self, **values: Any) -> Node:
         children = values.pop("children", ())
         clone = replace(self, **values)
         object.__setattr__(clone, "children", children)
         return clone
 
-    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout:
-        # Default implementation for single children or empty node
+    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout | LayoutOverflow:
+        # Default implementation for single children or empty node.
+        # Overflow can be either returned (cheaper) or raised as Layout*OverflowException.
         assert len(self.children) <= 1
-        layouts = tuple(ctx.layout_node(node, constraints) for node in self.children)
-        return NodeLayout(layouts[0].layout.size if layouts else constraints.min_size(), layouts)
+        if not self.children:
+            return NodeLayout(constraints.min_size(), ())
+        layout = ctx.try_layout_node(self.children[0], constraints)
+        if isinstance(layout, LayoutOverflow):
+            return layout
+        return NodeLayout(layout.layout.size, (layout,))
+
+    def measure(self, ctx: NodeLayoutCtx, constraints: Constraints) -> Size:
+        """Size that layout() would return. Override when it can be computed cheaper."""
+        return self.layout(ctx, constraints).size
+
+    def draw_ops(self, x: float, y: float, layout: Layout) -> Iterable[DrawOp] | None:
+        """Draw operations of this node (without children) in absolute coordinates.
+
+        None means that node draws itself in draw_image().
+        """
+        return None
 
     def draw_image(self, x: float, y: float, layout: Layout, draw_ctx: ImageDrawCtx) -> None:
         # Called before children draw_* functions
-        pass
+        for op in self.draw_ops(x, y, layout) or ():
+            op.draw_pil(draw_ctx)
+
+    def continuation(self) -> Node:
+        """Node that wraps the leftover of a split child, e.g. without the top border."""
+        return self
+
+    def split_position(self) -> Any:
+        """Where this leftover starts within the original (unsplit) node.
+
+        None means nothing was consumed yet, True means everything was consumed.
+        () means the node was continued (e.g. its top border is already laid out), but
+        nothing inside it was consumed. Nodes that can split describe their progress with
+        nested tuples of ints.
+        """
+        if len(self.children) == 1:
+            position = self.children[0].split_position()
+            if position is None and self.is_continuation():
+                return ()
+            return position
+        return None
+
+    def is_continuation(self) -> bool:
+        """Whether the node is continuation() of a node that lays out differently."""
+        return False
+
+    def resume(self, position: Any) -> Node:
+        """Inverse of split_position(): leftover of this node that starts at the position."""
+        if position is None or (position == () and len(self.children) != 1):
+            return self
+        if len(self.children) == 1:
+            return self.continuation()(self.children[0].resume(position))
+        if position is True:
+            return FINISHED
+        raise ValueError(f"{type(self).__name__} can not resume from {position!r}")
 
     def __call__(self, *children: Node) -> Node:
         # Replaces children of Node in a functional way
         return self.clone_without_children(children=children)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class LeafNode(Node):
 
     def __call__(self, *children: Node) -> Node:
         if children:
             raise ValueError(f"Can not add children nodes to the leaf node {self}")
-        return super().__call__(*children)
+        # Explicit base class, zero-argument super() does not work with slotted dataclasses
+        return Node.__call__(self, *children)
+
+
+@dataclass(frozen=True, slots=True)
+class Finished(LeafNode):
+    """Leftover of a fully consumed node, e.g. of a page break. Takes no space."""
 
+    def split_position(self) -> Any:
+        return True
 
-@dataclass(frozen=True)
+
+FINISHED = Finished()
+
+
+@dataclass(frozen=True, slots=True)
 class DeferredNode(LeafNode):
     materialize: Callable[[Any], Node]
 
@@ -222,7 +333,7 @@ def materialize_deferred(context: Any, node: Node) -> Node:
     return node(*(materialize_deferred(context, child) for child in node.children))
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Layout:
     node: Node
     layout: NodeLayout
@@ -235,12 +346,48 @@ class Layout:
     def strip_leftover(self) -> Layout:
         return replace(self, layout=self.layout.strip_leftover())
 
+    def translate(self, dx: float, dy: float) -> Layout:
+        """Moves already laid out node (with all its children) by dx, dy."""
+        if not dx and not dy:
+            return self
+        return Layout(
+            node=self.node,
+            layout=self.layout.translate(dx, dy),
+            x=self.x + dx,
+            y=self.y + dy,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class CachedLayout:
+    node: Node  # Keeps node alive, so its id() is not reused
+    layout: NodeLayout
+    x: float
+    y: float
+
+
+class LayoutCache(LRUCache[tuple[int, Constraints, bool], CachedLayout]):
+    """Layouts keyed by node identity, constraints and split mode.
+
+    Reuse the same node object for repeated subtrees to benefit from it.
+    """
+
+
+# Marks threads that lay out children submitted by NodeLayoutCtx.try_layout_children()
+_parallel_layout = threading.local()
+
 
 @dataclass
 class LayoutCtx:
 
     debug: bool = False
     page_index: int = 0
+    # Opt-in memoization of layouts of the same node objects under the same constraints.
+    # Can be shared between pages and documents.
+    layout_cache: LayoutCache | None = None
+    # Opt-in parallel layout of independent children (see NodeLayoutCtx.try_layout_children()).
+    # Pays off with a thread pool on free-threaded Python, or with heavy non-Python nodes.
+    executor: Executor | None = None
 
     def page_ctx(self) -> NodeLayoutCtx:
         return NodeLayoutCtx(
@@ -255,15 +402,21 @@ class LayoutCtx:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class NodeLayoutCtx:
+    """Per node layout frame. Created for every laid out node, so keep it small.
+
+    It is not shared with other nodes, so a node can change it (e.g. can_split) for its children
+    even if layout runs in several threads.
+    """
+
     ctx: LayoutCtx
     can_split: bool
     x: float = 0
     y: float = 0
 
-    # Debug only
     node: Node | None = None
+    # Debug only, parent chain is kept only when LayoutCtx.debug is on
     parent: NodeLayoutCtx | None = None
 
     def get_current_path_readable(self) -> str:
@@ -279,13 +432,54 @@ class NodeLayoutCtx:
         x: float = 0,
         y: float = 0,
     ) -> Layout:
+        """Lays out the node, raises Layout*OverflowException if it does not fit."""
+        layout = self.try_layout_node(node, constraints, x, y)
+        if isinstance(layout, LayoutOverflow):
+            raise layout.to_exception()
+        return layout
+
+    def try_layout_node(
+        self,
+        node: Node,
+        constraints: Constraints,
+        x: float = 0,
+        y: float = 0,
+    ) -> Layout | LayoutOverflow:
+        """Same as layout_node(), but returns overflow instead of raising it."""
 
         node_ctx = self.clone_for_child(node, x, y)
         if self.ctx.debug:
             print(
                 f"{node_ctx.get_current_path_readable()} <{node_ctx.x},{node_ctx.y}> {constraints} "
             )
-        layout = node.layout(node_ctx, constraints)
+
+        cache = self.ctx.layout_cache if node.cacheable else None
+        if cache is not None:
+            cache_key = (id(node), constraints, self.can_split)
+            cached = cache.get(cache_key)
+            if cached is not None and cached.node is node:
+                if self.ctx.debug:
+                    print(
+                        f"{node_ctx.get_current_path_readable()} (cached) --> {cached.layout.size}"
+                    )
+                return Layout(
+                    node=node,
+                    x=node_ctx.x,
+                    y=node_ctx.y,
+                    layout=cached.layout.translate(node_ctx.x - cached.x, node_ctx.y - cached.y),
+                )
+
+        try:
+            layout = node.layout(node_ctx, constraints)
+        except LayoutAxisOverflowException as e:
+            return LayoutOverflow(e.node, e.size, e.constraints)
+        except LayoutCrossAxisOverflowException as e:
+            return LayoutOverflow(e.node, e.size, e.constraints, cross_axis=True)
+
+        if isinstance(layout, LayoutOverflow):
+            if self.ctx.debug:
+                print(f"{node_ctx.get_current_path_readable()} overflow {layout}")
+            return layout
 
         if self.ctx.debug:
             print(
@@ -303,17 +497,12 @@ class NodeLayoutCtx:
 
         if constraints.is_size_too_big(layout.size):
             overflow_right, overflow_down = constraints.is_overflows(layout.size)
-            if overflow_down and not overflow_right:
-                raise LayoutAxisOverflowException(
-                    node=node,
-                    size=layout.size,
-                    constraints=constraints,
-                )
-            elif overflow_right:
-                raise LayoutCrossAxisOverflowException(
+            if overflow_right or overflow_down:
+                return LayoutOverflow(
                     node=node,
                     size=layout.size,
                     constraints=constraints,
+                    cross_axis=overflow_right,
                 )
 
         if layout.leftover is None:
@@ -326,6 +515,9 @@ class NodeLayoutCtx:
                 f"{node_ctx.get_current_path_readable()} asked to not split, splits anyway"
             )
 
+        if cache is not None:
+            cache.put(cache_key, CachedLayout(node, layout, node_ctx.x, node_ctx.y))
+
         l = Layout(
             node=node,
             x=node_ctx.x,
@@ -334,13 +526,50 @@ class NodeLayoutCtx:
         )
         return l
 
+    def try_layout_children(
+        self, children: Sequence[tuple[Node, Constraints, float, float]]
+    ) -> list[Layout | LayoutOverflow]:
+        """try_layout_node() for independent (node, constraints, x, y), in parallel if possible.
+
+        Children are submitted to LayoutCtx.executor, except when it is called from a child
+        that is already laid out by the executor, to not wait for the pool from inside of it.
+        """
+        executor = self.ctx.executor
+        if executor is None or len(children) < 2 or getattr(_parallel_layout, "active", False):
+            return [self.try_layout_node(node, c, x, y) for node, c, x, y in children]
+        futures = [
+            executor.submit(self._try_layout_in_executor, node, c, x, y)
+            for node, c, x, y in children
+        ]
+        return [future.result() for future in futures]
+
+    def _try_layout_in_executor(
+        self, node: Node, constraints: Constraints, x: float, y: float
+    ) -> Layout | LayoutOverflow:
+        _parallel_layout.active = True
+        try:
+            return self.try_layout_node(node, constraints, x, y)
+        finally:
+            _parallel_layout.active = False
+
+    def measure_node(self, node: Node, constraints: Constraints) -> Size:
+        """Intrinsic size of the node, without overflow checks and without a layout."""
+        node_ctx = self.clone_for_child(node, 0, 0)
+        size = node.measure(node_ctx, constraints)
+        if self.ctx.debug:
+            print(f"{node_ctx.get_current_path_readable()} (measure) {constraints} --> {size}")
+        if constraints.is_size_too_small(size):
+            size = size.max(constraints.min_size())
+        return size
+
     def clone_for_child(self, node: Node, x: float, y: float) -> NodeLayoutCtx:
-        return replace(
-            self,
-            parent=self,
-            node=node,
-            x=self.x + x,
-            y=self.y + y,
+        return NodeLayoutCtx(
+            self.ctx,
+            self.can_split,
+            self.x + x,
+            self.y + y,
+            node,
+            self if self.ctx.debug else None,
         )
 
     def get_current_path(self) -> list[NodeLayoutCtx]:
@@ -353,7 +582,7 @@ class NodeLayoutCtx:
         return chain
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Tag(Node):
     key: str
     value: Any
@@ -373,6 +602,25 @@ def with_tag(key: str) -> Callable[[Callable[[Any], Node]], Callable[[Any], Node
     return decorator
 
 
+@dataclass(frozen=True, slots=True)
+class LayoutOverflow:
+    """Node does not fit into constraints: along the main (down) or the cross (right) axis.
+
+    Returned by NodeLayoutCtx.try_layout_node() and Node.layout(),
+    NodeLayoutCtx.layout_node() raises it as an exception instead.
+    """
+
+    node: Node
+    size: Size
+    constraints: Constraints
+    cross_axis: bool = False
+
+    def to_exception(self) -> LayoutAxisOverflowException | LayoutCrossAxisOverflowException:
+        if self.cross_axis:
+            return LayoutCrossAxisOverflowException(self.node, self.size, self.constraints)
+        return LayoutAxisOverflowException(self.node, self.size, self.constraints)
+
+
 @dataclass
 class LayoutAxisOverflowException(Exception):
     node: Node
@@ -393,7 +641,7 @@ class LayoutCrossAxisOverflowException(Exception):
         return repr(self)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ImageDrawCtx:
     image: Image.Image
     draw: ImageDraw
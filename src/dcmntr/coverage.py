@@ -0,0 +1,67 @@
+"""Code points that fonts have glyphs for, to pick a font of a fallback chain per character."""
+
+from __future__ import annotations
+
+import unicodedata
+from bisect import bisect_right
+from typing import Iterable, Sequence
+
+__all__ = [
+    "Coverage",
+    "split_by_coverage",
+]
+
+
+class Coverage:
+    """Sorted ranges of code points, built once per font file from its cmap."""
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, codepoints: Iterable[int]) -> None:
+        self.starts: list[int] = []
+        # Exclusive
+        self.ends: list[int] = []
+        for codepoint in sorted(codepoints):
+            if self.ends and self.ends[-1] == codepoint:
+                self.ends[-1] += 1
+            else:
+                self.starts.append(codepoint)
+                self.ends.append(codepoint + 1)
+
+    def __contains__(self, codepoint: int) -> bool:
+        idx = bisect_right(self.starts, codepoint) - 1
+        return idx >= 0 and codepoint < self.ends[idx]
+
+    def __len__(self) -> int:
+        return sum(end - start for start, end in zip(self.starts, self.ends))
+
+    def covers(self, text: str) -> bool:
+        return all(ord(char) in self or _inherits_font(char) for char in text)
+
+
+def _inherits_font(char: str) -> bool:
+    # Whitespace and combining marks are drawn with the font of the preceding character
+    return char.isspace() or unicodedata.combining(char) != 0
+
+
+def split_by_coverage(text: str, coverages: Sequence[Coverage]) -> list[tuple[int, str]]:
+    """Runs of text as (index of the first coverage with the characters, text).
+
+    Characters that no coverage has stay with the first one, so they are drawn as missing.
+    """
+    runs: list[tuple[int, str]] = []
+    current = 0
+    start = 0
+    for idx, char in enumerate(text):
+        codepoint = ord(char)
+        if codepoint in coverages[current] and (current == 0 or codepoint not in coverages[0]):
+            continue
+        if _inherits_font(char):
+            continue
+        font = next((i for i, coverage in enumerate(coverages) if codepoint in coverage), 0)
+        if font != current:
+            if idx > start:
+                runs.append((current, text[start:idx]))
+            current, start = font, idx
+    runs.append((current, text[start:]))
+    return runs
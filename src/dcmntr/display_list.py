@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from math import ceil
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
+
+from PIL import Image, ImageDraw
+
+from dcmntr.core import *
+
+if TYPE_CHECKING:
+    from dcmntr.basic_layout import Color
+    from dcmntr.pdf import PdfCanvas
+    from dcmntr.svg import SvgCanvas
+    from dcmntr.text import Font
+
+__all__ = [
+    "DrawOp",
+    "Rect",
+    "Line",
+    "TextRun",
+    "Blit",
+    "NodeDraw",
+    "DisplayList",
+    "compile_display_list",
+]
+
+
+@dataclass(frozen=True, slots=True)
+class DrawOp:
+    """Single draw operation with absolute coordinates."""
+
+    def draw_pil(self, draw_ctx: ImageDrawCtx) -> None:
+        raise NotImplementedError
+
+    def draw_pdf(self, canvas: PdfCanvas) -> None:
+        raise NotImplementedError
+
+    def draw_svg(self, canvas: SvgCanvas) -> None:
+        raise NotImplementedError
+
+    def translate(self, dx: float, dy: float) -> DrawOp:
+        raise NotImplementedError
+
+
+@dataclass(frozen=True, slots=True)
+class Rect(DrawOp):
+    # Inclusive corners, like in PIL
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+    fill: Color
+
+    def draw_pil(self, draw_ctx: ImageDrawCtx) -> None:
+        draw_ctx.draw.rectangle([(self.x0, self.y0), (self.x1, self.y1)], fill=self.fill, width=0)
+
+    def draw_pdf(self, canvas: PdfCanvas) -> None:
+        canvas.rect(self.x0, self.y0, self.x1, self.y1, self.fill)
+
+    def draw_svg(self, canvas: SvgCanvas) -> None:
+        canvas.rect(self.x0, self.y0, self.x1, self.y1, self.fill)
+
+    def translate(self, dx: float, dy: float) -> DrawOp:
+        return Rect(self.x0 + dx, self.y0 + dy, self.x1 + dx, self.y1 + dy, self.fill)
+
+
+@dataclass(frozen=True, slots=True)
+class Line(DrawOp):
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+    color: Color | None
+    width: int
+
+    def draw_pil(self, draw_ctx: ImageDrawCtx) -> None:
+        draw_ctx.draw.line(
+            [(self.x0, self.y0), (self.x1, self.y1)], fill=self.color, width=self.width
+        )
+
+    def draw_pdf(self, canvas: PdfCanvas) -> None:
+        canvas.line(self.x0, self.y0, self.x1, self.y1, self.color, self.width)
+
+    def draw_svg(self, canvas: SvgCanvas) -> None:
+        canvas.line(self.x0, self.y0, self.x1, self.y1, self.color, self.width)
+
+    def translate(self, dx: float, dy: float) -> DrawOp:
+        return Line(self.x0 + dx, self.y0 + dy, self.x1 + dx, self.y1 + dy, self.color, self.width)
+
+
+@dataclass(frozen=True, slots=True)
+class TextRun(DrawOp):
+    x: float
+    y: float
+    text: str
+    font: Font
+    color: Color
+    spacing: float
+    antialiasing: bool
+    features: tuple[str, ...] | None = None
+
+    def draw_pil(self, draw_ctx: ImageDrawCtx) -> None:
+        self.font.cache.mask_cache.draw(
+            draw_ctx,
+            self.x,
+            self.y,
+            self.text,
+            self.font,
+            self.color,
+            self.spacing,
+            self.antialiasing,
+            self.features,
+        )
+
+    def draw_pdf(self, canvas: PdfCanvas) -> None:
+        canvas.text(
+            self.x,
+            self.y,
+            self.text,
+            self.font,
+            self.color,
+            self.spacing,
+            self.antialiasing,
+            self.features,
+        )
+
+    def draw_svg(self, canvas: SvgCanvas) -> None:
+        canvas.text(self.x, self.y, self.text, self.font, self.color, self.spacing, self.features)
+
+    def translate(self, dx: float, dy: float) -> DrawOp:
+        return replace(self, x=self.x + dx, y=self.y + dy)
+
+
+@dataclass(frozen=True, slots=True)
+class Blit(DrawOp):
+    x: int
+    y: int
+    image: Image.Image
+    # Loads the same image again, so blit is pickled as a reference instead of pixels
+    reload: Callable[[], Image.Image] | None = field(default=None, compare=False, repr=False)
+    # File the image was loaded from, for outputs that can link to it
+    source: str | Path | None = field(default=None, compare=False, repr=False)
+
+    def draw_pil(self, draw_ctx: ImageDrawCtx) -> None:
+        draw_ctx.image.paste(self.image, (self.x, self.y))
+
+    def draw_pdf(self, canvas: PdfCanvas) -> None:
+        canvas.image(self.x, self.y, self.image)
+
+    def draw_svg(self, canvas: SvgCanvas) -> None:
+        canvas.image(self.x, self.y, self.image, self.source)
+
+    def translate(self, dx: float, dy: float) -> DrawOp:
+        return replace(self, x=int(self.x + dx), y=int(self.y + dy))
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        if self.reload is None:
+            return Blit, (self.x, self.y, self.image, None, self.source)
+        return _reloaded_blit, (self.x, self.y, self.reload, self.source)
+
+
+def _reloaded_blit(
+    x: int, y: int, reload: Callable[[], Image.Image], source: str | Path | None
+) -> Blit:
+    return Blit(x, y, reload(), reload, source)
+
+
+@dataclass(frozen=True, slots=True)
+class NodeDraw(DrawOp):
+    """Fallback for nodes that only implement Node.draw_image()."""
+
+    x: float
+    y: float
+    layout: Layout
+
+    def draw_pil(self, draw_ctx: ImageDrawCtx) -> None:
+        self.layout.get_node().draw_image(self.x, self.y, self.layout, draw_ctx)
+
+    def draw_pdf(self, canvas: PdfCanvas) -> None:
+        image = self.rasterize()
+        if image is not None:
+            canvas.image(self.x, self.y, image)
+
+    def draw_svg(self, canvas: SvgCanvas) -> None:
+        image = self.rasterize()
+        if image is not None:
+            canvas.image(self.x, self.y, image)
+
+    def translate(self, dx: float, dy: float) -> DrawOp:
+        return NodeDraw(self.x + dx, self.y + dy, self.layout.translate(dx, dy))
+
+    def rasterize(self) -> Image.Image | None:
+        """Transparent image of the node, for outputs other than PIL."""
+        size = self.layout.layout.size
+        width, height = ceil(size.width), ceil(size.height)
+        if width <= 0 or height <= 0:
+            return None
+        image = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        draw_ctx = ImageDrawCtx(image=image, draw=ImageDraw.Draw(image))
+        self.layout.get_node().draw_image(0, 0, self.layout, draw_ctx)
+        return image
+
+
+@dataclass(frozen=True, slots=True)
+class DisplayList:
+    """Draw operations of a page in painting order.
+
+    Can be pickled (e.g. to rasterize in another process) unless it has NodeDraw operations
+    of unpicklable nodes.
+    """
+
+    ops: tuple[DrawOp, ...]
+
+    def draw_pil(self, image: Image.Image) -> None:
+        draw_ctx = ImageDrawCtx(image=image, draw=ImageDraw.Draw(image))
+        for op in self.ops:
+            op.draw_pil(draw_ctx)
+
+    def translate(self, dx: float, dy: float) -> DisplayList:
+        if not dx and not dy:
+            return self
+        return DisplayList(tuple(op.translate(dx, dy) for op in self.ops))
+
+
+# Node types that draw nothing, so they are skipped without a call
+_silent_types: dict[type, bool] = {}
+
+
+def _is_silent(node_type: type[Node]) -> bool:
+    silent = _silent_types.get(node_type)
+    if silent is None:
+        silent = node_type.draw_ops is Node.draw_ops and node_type.draw_image is Node.draw_image
+        _silent_types[node_type] = silent
+    return silent
+
+
+def compile_display_list(layout: Layout, clip: Region | None = None) -> DisplayList:
+    """Flattens the layout tree into draw operations, parents before children.
+
+    With clip, subtrees with layout bounds outside of it are skipped. Nodes are expected
+    to draw within their bounds, as the ones of dcmntr do.
+    """
+    ops: list[DrawOp] = []
+    stack = [layout]
+    while stack:
+        current = stack.pop()
+        if clip is not None and not clip.intersects(current.x, current.y, current.layout.size):
+            continue
+        node = current.get_node()
+        if not _is_silent(type(node)):
+            node_ops = node.draw_ops(current.x, current.y, current)
+            if node_ops is None:
+                ops.append(NodeDraw(current.x, current.y, current))
+            else:
+                ops.extend(node_ops)
+        stack.extend(reversed(current.layout.children))
+    return DisplayList(tuple(ops))
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from dataclasses import fields
+from typing import Any
+
+from dcmntr.basic_layout import Layers, Stack
+from dcmntr.core import Node
+
+__all__ = [
+    "Fingerprints",
+]
+
+# Fingerprint of a fully consumed node (see Node.split_position())
+_FINISHED = hash("dcmntr.finished")
+
+
+class Fingerprints:
+    """Structural hashes of content trees, memoized by node identity.
+
+    Equal fingerprints mean equal content (modulo hash collisions), even for different trees.
+    Besides whole nodes, it can fingerprint the part of a node before and after a split
+    position, which is what incremental pagination compares between runs.
+    """
+
+    def __init__(self) -> None:
+        # Nodes are kept alive, so ids stay unique while fingerprints are memoized
+        self._nodes: dict[int, tuple[Node, int]] = {}
+        self._own: dict[int, tuple[Node, int]] = {}
+        self._prefixes: dict[int, list[int]] = {}
+        self._suffixes: dict[int, list[int]] = {}
+        self._field_names: dict[type, tuple[str, ...]] = {}
+
+    def node(self, node: Node) -> int:
+        entry = self._nodes.get(id(node))
+        if entry is not None:
+            return entry[1]
+        fingerprint = hash((self.own(node), tuple(self.node(child) for child in node.children)))
+        self._nodes[id(node)] = (node, fingerprint)
+        return fingerprint
+
+    def own(self, node: Node) -> int:
+        """Fingerprint of the node itself, without its children."""
+        entry = self._own.get(id(node))
+        if entry is not None:
+            return entry[1]
+        names = self._field_names.get(type(node))
+        if names is None:
+            names = tuple(f.name for f in fields(node) if f.compare and f.name != "children")
+            self._field_names[type(node)] = names
+        values = tuple(self._value(getattr(node, name)) for name in names)
+        fingerprint = hash((type(node).__qualname__, values))
+        self._own[id(node)] = (node, fingerprint)
+        return fingerprint
+
+    def prefix(self, node: Node, position: Any) -> int:
+        """Fingerprint of everything that was laid out to reach the position.
+
+        Raises ValueError or TypeError if the position does not fit the node.
+        """
+        if position is None or position is True or self._not_started(node, position):
+            return self.node(node)
+        if isinstance(node, Stack):
+            start, head_position = position
+            if start >= len(node.children):
+                raise ValueError(f"Position {position!r} is out of the stack")
+            return hash(
+                (
+                    self.own(node),
+                    self._prefix_array(node)[start],
+                    self.prefix(node.children[start], head_position),
+                )
+            )
+        if isinstance(node, Layers):
+            return hash(
+                (
+                    self.own(node),
+                    tuple(self.prefix(c, p) for c, p in zip(node.children, position, strict=True)),
+                )
+            )
+        if len(node.children) == 1:
+            return hash((self.own(node), self.prefix(node.children[0], position)))
+        return self.node(node)
+
+    def remainder(self, node: Node, position: Any) -> int:
+        """Fingerprint of what is left to lay out after the position."""
+        if position is None or self._not_started(node, position):
+            return self.node(node)
+        if position is True:
+            return _FINISHED
+        if isinstance(node, Stack):
+            start, head_position = position
+            if start >= len(node.children):
+                raise ValueError(f"Position {position!r} is out of the stack")
+            return hash(
+                (
+                    self.own(node),
+                    self.remainder(node.children[start], head_position),
+                    self._suffix_array(node)[start + 1],
+                )
+            )
+        if isinstance(node, Layers):
+            return hash(
+                (
+                    self.own(node),
+                    tuple(
+                        self.remainder(c, p) for c, p in zip(node.children, position, strict=True)
+                    ),
+                )
+            )
+        if len(node.children) == 1:
+            return hash((self.own(node), self.remainder(node.children[0], position)))
+        return hash((self.node(node), position))
+
+    def _not_started(self, node: Node, position: Any) -> bool:
+        # Only continued wrappers differ from the original when nothing inside was consumed
+        return position == () and (isinstance(node, (Stack, Layers)) or len(node.children) != 1)
+
+    def _prefix_array(self, node: Node) -> list[int]:
+        # prefixes[i] is fingerprint of children[:i]
+        prefixes = self._prefixes.get(id(node))
+        if prefixes is None:
+            prefixes = [0]
+            for child in node.children:
+                prefixes.append(hash((prefixes[-1], self.node(child))))
+            self._prefixes[id(node)] = prefixes
+        return prefixes
+
+    def _suffix_array(self, node: Node) -> list[int]:
+        # suffixes[i] is fingerprint of children[i:]
+        suffixes = self._suffixes.get(id(node))
+        if suffixes is None:
+            suffixes = [0]
+            for child in reversed(node.children):
+                suffixes.append(hash((self.node(child), suffixes[-1])))
+            suffixes.reverse()
+            self._suffixes[id(node)] = suffixes
+        return suffixes
+
+    def _value(self, value: Any) -> Any:
+        if isinstance(value, Node):
+            return self.node(value)
+        if isinstance(value, (tuple, list)):
+            return tuple(self._value(v) for v in value)
+        try:
+            return hash(value)
+        except TypeError:
+            # Unhashable values (e.g. callables bound to mutable state) are compared by identity
+            return id(value)
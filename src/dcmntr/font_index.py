@@ -0,0 +1,123 @@
+"""Font files of fontconfig patterns, resolved with fc-match once per pattern.
+
+Resolved paths are kept in memory for the whole process and can be saved to a cache file,
+so short-lived processes do not run fc-match at all. The cache file is ignored when
+fontconfig configuration or caches change (by modification times).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+__all__ = [
+    "FontIndex",
+    "font_pattern",
+    "default_font_index",
+]
+
+# Configuration, font and cache directories of fontconfig, changed when fonts are installed
+_FONTCONFIG_PATHS = (
+    "/etc/fonts",
+    "/etc/fonts/conf.d",
+    "/etc/fonts/fonts.conf",
+    "/usr/share/fonts",
+    "/usr/local/share/fonts",
+    "/var/cache/fontconfig",
+    "~/.config/fontconfig",
+    "~/.fonts.conf",
+    "~/.fonts",
+    "~/.local/share/fonts",
+    "~/.cache/fontconfig",
+)
+
+
+def font_pattern(name: str, bold: bool, italic: bool) -> str:
+    style = []
+    if bold:
+        style.append("Bold")
+    if italic:
+        style.append("Italic")
+    return name + (":" + ":".join(style) if style else "")
+
+
+@dataclass
+class FontIndex:
+    """Pattern to font file mapping. Thread-safe."""
+
+    cache_file: str | Path | None = None
+    paths: dict[str, str] = field(default_factory=dict)
+    _loaded: bool = field(default=False, init=False, repr=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+
+    def resolve(self, name: str, bold: bool = False, italic: bool = False) -> str:
+        pattern = font_pattern(name, bold, italic)
+        path = self.paths.get(pattern)
+        if path is not None:
+            return path
+
+        with self._lock:
+            if not self._loaded:
+                self._loaded = True
+                self._load()
+                path = self.paths.get(pattern)
+                if path is not None:
+                    return path
+
+            path = self.match(pattern)
+            self.paths[pattern] = path
+            self._save()
+            return path
+
+    def match(self, pattern: str) -> str:
+        # FIXME handle not found?
+        return subprocess.check_output(["fc-match", "-f", "%{file}", pattern], text=True).strip()
+
+    def fontconfig_state(self) -> list[Any]:
+        """Changes when fontconfig may resolve patterns differently."""
+        state: list[Any] = [os.environ.get("FONTCONFIG_FILE"), os.environ.get("FONTCONFIG_PATH")]
+        for path in _FONTCONFIG_PATHS:
+            try:
+                state.append([path, os.stat(os.path.expanduser(path)).st_mtime_ns])
+            except OSError:
+                pass
+        return state
+
+    def _load(self) -> None:
+        if self.cache_file is None:
+            return
+        try:
+            with open(self.cache_file, encoding="utf-8") as fp:
+                data = json.load(fp)
+        except (OSError, ValueError):
+            return
+        if data.get("fontconfig") != self.fontconfig_state():
+            return
+        for pattern, path in data.get("paths", {}).items():
+            # Font files could be removed without fontconfig noticing
+            if os.path.exists(path):
+                self.paths.setdefault(pattern, path)
+
+    def _save(self) -> None:
+        if self.cache_file is None:
+            return
+        data = {"fontconfig": self.fontconfig_state(), "paths": self.paths}
+        # Written to a temporary file first, so other processes never read a partial file
+        temporary = f"{self.cache_file}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, "w", encoding="utf-8") as fp:
+                json.dump(data, fp)
+            os.replace(temporary, self.cache_file)
+        except OSError:
+            pass
+
+
+# Shared by all Fonts of the process
+default_font_index = FontIndex(cache_file=os.environ.get("DCMNTR_FONT_INDEX") or None)
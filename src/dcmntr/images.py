@@ -1,41 +1,45 @@
 from dataclasses import dataclass, field
+from functools import lru_cache, partial
 from pathlib import Path
+from typing import Any, Iterable
 
 from PIL import Image
 
 from dcmntr.core import *
+from dcmntr.display_list import Blit, DrawOp
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SimpleImage(LeafNode):
     # FIXME better way of scaling the image
 
     filename: str | Path
     expand: bool = True
     preserve_aspect_ratio: bool = True
-    image: Image.Image = field(init=False)
+    image: Image.Image = field(init=False, compare=False, repr=False)
 
     def __post_init__(self) -> None:
         object.__setattr__(self, "image", self.load_image())
 
-    def draw_image(self, x: float, y: float, layout: Layout, draw_ctx: ImageDrawCtx) -> None:
+    def draw_ops(self, x: float, y: float, layout: Layout) -> Iterable[DrawOp]:
         scaled_img = layout.layout.cached
-        draw_ctx.image.paste(scaled_img, (int(x), int(y)))
+        reload = partial(_load_scaled_image, self.filename, scaled_img.width, scaled_img.height)
+        return (Blit(int(x), int(y), scaled_img, reload, self.filename),)
 
     def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout:
+        size = self.measure(ctx, constraints)
+        img = self.image.resize((int(size.width), int(size.height)))
+        return NodeLayout(size, (), cached=img)
+
+    def measure(self, ctx: NodeLayoutCtx, constraints: Constraints) -> Size:
         img_size = self.original_image_size()
         if img_size.width <= 0 or img_size.height <= 0:
             raise ValueError("Size must be positive")
         if self.expand:
             if self.preserve_aspect_ratio:
-                size = self.expand_size_preserve_aspect_ratio(img_size, constraints)
-            else:
-                size = constraints.max_size()
-        else:
-            size = self.ensure_min_size_preserve_aspect_ratio(img_size, constraints)
-
-        img = self.image.resize((int(size.width), int(size.height)))
-        return NodeLayout(size, (), cached=img)
+                return self.expand_size_preserve_aspect_ratio(img_size, constraints)
+            return constraints.max_size()
+        return self.ensure_min_size_preserve_aspect_ratio(img_size, constraints)
 
     def expand_size_preserve_aspect_ratio(self, size: Size, constraints: Constraints) -> Size:
         if size.width <= 0 or size.height <= 0:
@@ -69,5 +73,15 @@ class SimpleImage(LeafNode):
     def load_image(self) -> Image.Image:
         return Image.open(self.filename)
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Image is loaded from the file again instead of pickling pixels
+        return SimpleImage, (self.filename, self.expand, self.preserve_aspect_ratio)
+
+
+@lru_cache(maxsize=64)
+def _load_scaled_image(filename: str | Path, width: int, height: int) -> Image.Image:
+    # Images are reused by pages rasterized in the same process
+    return Image.open(filename).resize((width, height))
+
 
 img_from_file = SimpleImage
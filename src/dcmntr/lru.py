@@ -0,0 +1,82 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+__all__ = [
+    "LRUCache",
+]
+
+
+@dataclass
+class LRUCache[K, V]:
+    """Bounded mapping that evicts the least recently used entries first. Thread-safe.
+
+    Besides the number of entries, total weight of values (see weigh()) can be bounded
+    with max_weight, e.g. to limit memory of cached images.
+    """
+
+    maxsize: int = 1024
+    max_weight: int | None = None
+    hits: int = field(default=0, init=False)
+    misses: int = field(default=0, init=False)
+    evictions: int = field(default=0, init=False)
+    weight: int = field(default=0, init=False)
+    _entries: OrderedDict[K, V] = field(default_factory=OrderedDict, init=False, repr=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        if self.maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key: K) -> V | None:
+        """Value without marking it as recently used or counting a hit or a miss."""
+        with self._lock:
+            return self._entries.get(key)
+
+    def weigh(self, value: V) -> int:
+        return 0
+
+    def put(self, key: K, value: V) -> None:
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous is not None:
+                self.weight -= self.weigh(previous)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self.weight += self.weigh(value)
+            while len(self._entries) > self.maxsize or (
+                self.max_weight is not None and self.weight > self.max_weight and self._entries
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self.weight -= self.weigh(evicted)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.weight = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
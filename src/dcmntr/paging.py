@@ -1,16 +1,23 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import json
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from functools import partial
 from math import ceil
-from typing import Callable, Generator, Protocol, Iterable
+from typing import Any, Callable, Generator, Protocol, Iterable
 
 from PIL import Image
 
 from dcmntr.basic_layout import Color
 from dcmntr.core import *
-from dcmntr.core import NodeLayoutCtx, Node, Constraints, NodeLayout, Size, LayoutCtx
+from dcmntr.core import NodeLayoutCtx, Node, Constraints, NodeLayout, Size, LayoutCtx, LayoutCache
+from dcmntr.fingerprint import Fingerprints
 from dcmntr.layout_query import LayoutQuery
-from dcmntr.render import draw_document_pil
+from dcmntr.lru import LRUCache
+from dcmntr.display_list import compile_display_list
+from dcmntr.render import draw_document_pil, rasterize_page
 
 
 class PageStructureCallable(Protocol):
@@ -23,36 +30,351 @@ def layout_multipage_document(
     page_structure_f: PageStructureCallable,
     content: Node,
     debug: bool = False,
+    layout_cache: LayoutCache | None = None,
+    pagination_cache: PaginationCache | None = None,
+    page_breaks: PageBreakIndex | None = None,
+    first_page: int = 0,
+    page_index_offset: int = 0,
 ) -> Iterable[tuple[Size, Layout]]:
+    """Lays out content page by page.
+
+    With pagination_cache, content of the previous run with the same cache is reused
+    where it did not change (see PaginationCache).
+    Page breaks are recorded into page_breaks, and the known ones are used to start directly
+    from first_page. Pages before first_page that are not in the index are laid out without
+    page structure and not returned.
+    page_index_offset is added to page indexes seen by the layout and page structure,
+    e.g. when content is a part of a bigger document (see dcmntr.sharding).
+    """
     content_x, content_y, content_size = measure_content_size(page_size, page_structure_f)
 
-    page_index = 0
-    page_content: Node | None = content
-    while page_content is not None:
-        ctx = LayoutCtx(page_index=page_index, debug=debug)
-        content_layout = ctx.page_ctx().layout_node(
+    def layout_content(page_content: Node, page_index: int) -> Layout:
+        ctx = LayoutCtx(
+            page_index=page_index_offset + page_index, debug=debug, layout_cache=layout_cache
+        )
+        return ctx.page_ctx().layout_node(
             page_content, constraints=content_size.to_constraints_max(), x=content_x, y=content_y
         )
 
+    def layout_page(content_layout: Layout, page_index: int) -> Layout:
+        ctx = LayoutCtx(
+            page_index=page_index_offset + page_index, debug=debug, layout_cache=layout_cache
+        )
         page = page_structure_f(
             PreLaidOutNode(content_layout.strip_leftover()),
-            LayoutQuery(content_layout, page_index),
+            LayoutQuery(content_layout, page_index_offset + page_index),
+        )
+        return ctx.page_ctx().layout_node(page, constraints=page_size.to_constraints_max())
+
+    if page_breaks is not None and page_breaks.page_size != page_size:
+        raise ValueError(f"Page break index is built for {page_breaks.page_size}, not {page_size}")
+
+    if pagination_cache is not None:
+        if first_page or page_index_offset:
+            raise ValueError("first_page and page_index_offset are not supported with cache")
+        pages = pagination_cache.paginate(
+            page_size, page_structure_f, content, layout_content, layout_page
         )
-        page_layout = ctx.page_ctx().layout_node(page, constraints=page_size.to_constraints_max())
-        yield page_size, page_layout
-        page_content = content_layout.layout.leftover
+        for page_index, page in enumerate(pages):
+            if page_breaks is not None:
+                record = pagination_cache.pages[-1]
+                page_breaks.record(page_index, record.start, last=record.end is True)
+            yield page
+
+        return
+
+    page_index = 0
+    page_content: Node | None = content
+    if first_page and page_breaks is not None and page_breaks.starts:
+        page_index = min(first_page, len(page_breaks) - 1)
+        page_content = page_breaks.page_content(content, page_index)
+    while page_content is not None:
+        content_layout = layout_content(page_content, page_index)
+        leftover = content_layout.layout.leftover
+        if page_breaks is not None:
+            page_breaks.record(page_index, page_content.split_position(), last=leftover is None)
+        if page_index >= first_page:
+            yield page_size, layout_page(content_layout, page_index)
+        page_content = leftover
         page_index += 1
 
 
+def layout_document_page(
+    page_size: Size,
+    page_structure_f: PageStructureCallable,
+    content: Node,
+    page_index: int,
+    page_breaks: PageBreakIndex | None = None,
+    **kwargs: Any,
+) -> Layout | None:
+    """Layout of a single page, or None if the document is shorter."""
+    pages = layout_multipage_document(
+        page_size,
+        page_structure_f,
+        content,
+        page_breaks=page_breaks,
+        first_page=page_index,
+        **kwargs,
+    )
+    for _, layout in pages:
+        return layout
+    return None
+
+
+@dataclass
+class PageBreakIndex:
+    """Where each page starts in the content tree, as positions of Node.split_position().
+
+    It is valid only for the same content, page size and page structure. Positions are
+    nested tuples of ints, True and None, so the index can be persisted as JSON.
+    """
+
+    page_size: Size
+    starts: list[Any] = field(default_factory=list)
+    # All the pages are known
+    complete: bool = False
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def record(self, page_index: int, start: Any, last: bool = False) -> None:
+        if page_index > len(self.starts):
+            raise ValueError(f"Page {page_index} is recorded before page {len(self.starts)}")
+        if page_index == len(self.starts):
+            self.starts.append(start)
+        if last:
+            del self.starts[page_index + 1 :]
+            self.complete = True
+
+    def page_content(self, content: Node, page_index: int) -> Node:
+        """Content that is left to lay out on the page and after it."""
+        return content.resume(self.starts[page_index])
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "page_size": [self.page_size.width, self.page_size.height],
+                "starts": self.starts,
+                "complete": self.complete,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, data: str) -> PageBreakIndex:
+        values = json.loads(data)
+        return cls(
+            page_size=Size(*values["page_size"]),
+            starts=[_position_from_json(start) for start in values["starts"]],
+            complete=values["complete"],
+        )
+
+
+def _position_from_json(value: Any) -> Any:
+    # JSON turns tuples into lists
+    if isinstance(value, list):
+        return tuple(_position_from_json(v) for v in value)
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class PageRecord:
+    # Split positions of the content (see Node.split_position()) where the page starts and ends
+    start: Any
+    end: Any
+    # Fingerprints of the content from the start of the page and up to the end of the page
+    start_remainder: int
+    end_prefix: int
+    page_index: int
+
+
+class PaginationCache:
+    """Pages of the previous run of layout_multipage_document, for incremental re-pagination.
+
+    Content of a page is reused when some page of the previous run started at the same
+    position, and either all the content up to its end or all the content from its start is
+    unchanged. So after an edit only pages from the edit until page breaks converge with the
+    previous run again are laid out. Page structure is laid out again only if the page moved
+    to a different index, it is expected to depend only on the page content and index.
+
+    Page breaks are kept for all the pages, but layouts only for the max_layouts most recently
+    used pages, so memory does not grow with the document. Pages without a kept layout are
+    laid out again: pages are used in order, so documents longer than max_layouts are laid
+    out whole on every run.
+    """
+
+    def __init__(self, max_layouts: int = 256) -> None:
+        self.pages: list[PageRecord] = []
+        # Start position to the content layout and the page layout
+        self.layouts: LRUCache[Any, tuple[Layout, Layout]] = LRUCache(maxsize=max_layouts)
+        self.page_size: Size | None = None
+        self.page_structure_f: PageStructureCallable | None = None
+        # Statistics of the last run
+        self.reused_pages = 0
+        self.laid_out_pages = 0
+
+    def paginate(
+        self,
+        page_size: Size,
+        page_structure_f: PageStructureCallable,
+        content: Node,
+        layout_content: Callable[[Node, int], Layout],
+        layout_page: Callable[[Layout, int], Layout],
+    ) -> Generator[tuple[Size, Layout], None, None]:
+        previous: dict[Any, PageRecord] = {}
+        if page_size == self.page_size and page_structure_f is self.page_structure_f:
+            previous = {record.start: record for record in self.pages}
+        # Stored as it goes, so a partially consumed run still can be reused
+        self.pages = pages = []
+        self.page_size = page_size
+        self.page_structure_f = page_structure_f
+        self.reused_pages = self.laid_out_pages = 0
+
+        fingerprints = Fingerprints()
+        position: Any = None
+        # Leftover of the previous page if it was laid out, to avoid resuming from position
+        page_content: Node | None = content
+        page_index = 0
+        while position is not True:
+            start_remainder = fingerprints.remainder(content, position)
+            record = previous.get(position)
+            layouts = self.layouts.get(position) if record is not None else None
+            if record is not None and layouts is not None:
+                try:
+                    end_prefix: int | None = fingerprints.prefix(content, record.end)
+                except (ValueError, TypeError):
+                    # Position from the previous run does not fit the new content
+                    end_prefix = None
+                if end_prefix is not None and (
+                    end_prefix == record.end_prefix or start_remainder == record.start_remainder
+                ):
+                    content_layout, layout = layouts
+                    if record.page_index != page_index:
+                        layout = layout_page(content_layout, page_index)
+                        self.layouts.put(position, (content_layout, layout))
+                    pages.append(
+                        replace(
+                            record,
+                            start_remainder=start_remainder,
+                            end_prefix=end_prefix,
+                            page_index=page_index,
+                        )
+                    )
+                    self.reused_pages += 1
+                    yield page_size, layout
+                    position = record.end
+                    page_content = None
+                    page_index += 1
+                    continue
+
+            if page_content is None:
+                page_content = content.resume(position)
+            content_layout = layout_content(page_content, page_index)
+            layout = layout_page(content_layout, page_index)
+            leftover = content_layout.layout.leftover
+            end = True if leftover is None else leftover.split_position()
+            pages.append(
+                PageRecord(
+                    start=position,
+                    end=end,
+                    start_remainder=start_remainder,
+                    end_prefix=fingerprints.prefix(content, end),
+                    page_index=page_index,
+                )
+            )
+            self.layouts.put(position, (content_layout, layout))
+            self.laid_out_pages += 1
+            yield page_size, layout
+            position = end
+            page_content = leftover
+            page_index += 1
+
+    def clear(self) -> None:
+        self.pages = []
+        self.layouts.clear()
+        self.page_size = None
+        self.page_structure_f = None
+
+
 def render_multipage_document(
     pages_generator: Iterable[tuple[Size, Layout]],
     background_color: Color = "white",
+    workers: int = 0,
+    max_in_flight: int | None = None,
 ) -> Generator[Image.Image, None, None]:
+    """Rasterizes pages in order.
+
+    With workers, pages are compiled into display lists and rasterized by a process pool.
+    At most max_in_flight pages (2 per worker by default) are queued or kept rasterized
+    but not yielded yet, so memory does not grow with the document.
+    """
+    if not workers:
+        for page_size, page_layout in pages_generator:
+            yield rasterize_page(page_size, compile_display_list(page_layout), background_color)
+        return
+
+    with ProcessPoolExecutor(workers) as pool:
+        yield from submit_in_order(
+            pool,
+            (
+                partial(
+                    rasterize_page,
+                    page_size,
+                    compile_display_list(page_layout),
+                    background_color,
+                )
+                for page_size, page_layout in pages_generator
+            ),
+            2 * workers if max_in_flight is None else max_in_flight,
+        )
 
-    for page_size, page_layout in pages_generator:
-        img = Image.new("RGBA", (ceil(page_size.width), ceil(page_size.height)), background_color)
-        draw_document_pil(page_layout, img)
-        yield img
+
+def render_pipelined[T](
+    pages_generator: Iterable[tuple[Size, Layout]],
+    encode: Callable[[Image.Image], T],
+    background_color: Color = "white",
+    threads: int = 2,
+    max_in_flight: int | None = None,
+) -> Generator[T, None, None]:
+    """Rasterizes and encodes pages in background threads while next pages are laid out.
+
+    Layout is pure Python, while rasterization and encoding (e.g. `img.save(...)`) mostly run
+    in Pillow's C code, so the two overlap. Results of encode are yielded in page order,
+    at most max_in_flight pages (2 per thread by default) are in memory at once.
+    """
+    with ThreadPoolExecutor(threads, thread_name_prefix="dcmntr-render") as pool:
+        yield from submit_in_order(
+            pool,
+            (
+                partial(_rasterize_and_encode, page_size, page_layout, background_color, encode)
+                for page_size, page_layout in pages_generator
+            ),
+            2 * threads if max_in_flight is None else max_in_flight,
+        )
+
+
+def _rasterize_and_encode[T](
+    page_size: Size,
+    page_layout: Layout,
+    background_color: Color,
+    encode: Callable[[Image.Image], T],
+) -> T:
+    return encode(rasterize_page(page_size, compile_display_list(page_layout), background_color))
+
+
+def submit_in_order[T](
+    pool: Executor, tasks: Iterable[Callable[[], T]], max_in_flight: int
+) -> Generator[T, None, None]:
+    """Results of the tasks run by the pool, in order of the tasks.
+
+    The next task is taken only when fewer than max_in_flight results are pending.
+    """
+    in_flight: deque[Future[T]] = deque()
+    for task in tasks:
+        if len(in_flight) >= max_in_flight:
+            yield in_flight.popleft().result()
+        in_flight.append(pool.submit(task))
+    while in_flight:
+        yield in_flight.popleft().result()
 
 
 def measure_content_size(
@@ -62,31 +384,23 @@ def measure_content_size(
     ctx = LayoutCtx()
     page_ctx = ctx.container_ctx()  # Disallow split
 
-    content_x: float | None = None
-    content_y: float | None = None
-    size: Size | None = None
-
-    def save_measurements(x: float, y: float, content_size: Size) -> None:
-        nonlocal content_x, content_y, size
-        content_x = x
-        content_y = y
-        size = content_size
-
-    measure = ContentMeasurement(save_measurements)
+    measure = ContentMeasurement()
+    page_layout = page_ctx.layout_node(page_f(measure), page_constraints)
 
-    page_ctx.layout_node(page_f(measure), page_constraints)
+    # Position is taken from the final layout, as parents may move already laid out children
+    for x, y, layout in walk_layout(page_layout):
+        if layout.node is measure:
+            return x, y, layout.layout.size
 
-    assert (
-        (content_x is not None) and (content_y is not None) and (size is not None)
-    ), "page function does not seems to place argument into the layout"
+    raise AssertionError("page function does not seems to place argument into the layout")
 
-    return content_x, content_y, size
 
-
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PreLaidOutNode(Node):
     layout_to_return: Layout
 
+    cacheable = False
+
     def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout:
         assert not self.children
 
@@ -97,33 +411,28 @@ class PreLaidOutNode(Node):
         return node_layout
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ContentMeasurement(Node):
-
-    report_measurements_f: Callable[[float, float, Size], None]
+    """Placeholder for page content that takes all the space given."""
 
     def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout:
         assert not self.children
-        size = constraints.max_size()
-        x, y = ctx.x, ctx.y
-        self.report_measurements_f(x, y, size)
+        return NodeLayout(constraints.max_size(), children=())
 
-        return NodeLayout(size, children=())
 
-
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class NoBrake(Node):
     """Essentially disables splitting children by page break."""
 
-    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout:
+    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout | LayoutOverflow:
         ctx.can_split = False
-        return super().layout(ctx, constraints)
+        return Node.layout(self, ctx, constraints)
 
 
 no_break = NoBrake()
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PageBreak(LeafNode):
 
     def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout:
@@ -131,10 +440,10 @@ class PageBreak(LeafNode):
             ctx.can_split
         ), "Page break can be done only in page context (parent must be able to split)."
         return NodeLayout(
-            size=Size(0, 0),
+            size=ZERO_SIZE,
             node_override=Node(),  # Do not render
             children=(),
-            leftover=Node(),  # Do not render
+            leftover=FINISHED,
         )
 
 
@@ -145,12 +454,13 @@ def render_multipage(
     page_size: Size,
     document: Node | None,
     background_color: Color = "white",
+    layout_cache: LayoutCache | None = None,
 ) -> Generator[Image.Image, None, None]:
 
     page_constraints = page_size.to_constraints_max()
 
     while document is not None:
-        ctx = LayoutCtx()
+        ctx = LayoutCtx(layout_cache=layout_cache)
         layout = ctx.page_ctx().layout_node(document, page_constraints)
         img = Image.new("RGBA", (ceil(page_size.width), ceil(page_size.height)), background_color)
         draw_document_pil(layout, img)
@@ -174,7 +484,7 @@ def document_to_pages(doc: Node, page_size: Size) -> Generator[Node, None, None]
         page_index += 1
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Page(Node):
     page_size: Size
 
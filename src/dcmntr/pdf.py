@@ -0,0 +1,385 @@
+"""Vector PDF output: shapes and text are written as PDF operators instead of pixels.
+
+Text is written as glyphs of embedded fonts, subset to the glyphs used in the document, and
+placed where layout measured them. Text that needs shaping (e.g. bidi or ligatures) is rasterized.
+Pages are written as they come; fonts are written on close, when all used glyphs are known.
+Images are written once, on their first use, and referenced by every page that uses them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import string
+import zlib
+from math import ceil, floor
+from dataclasses import dataclass, field
+from types import TracebackType
+from typing import BinaryIO, Iterable
+
+from PIL import Image, ImageColor, ImageDraw
+
+from dcmntr.basic_layout import Color
+from dcmntr.core import *
+from dcmntr.display_list import DisplayList, compile_display_list
+from dcmntr.text import Font
+from dcmntr.truetype import TrueTypeFont
+from dcmntr.writers import PdfFile
+
+__all__ = [
+    "PdfCanvas",
+    "VectorPdfWriter",
+    "write_pdf",
+]
+
+
+def _n(value: float) -> bytes:
+    """Compact number for content streams."""
+    return (b"%.3f" % value).rstrip(b"0").rstrip(b".") or b"0"
+
+
+def _color(color: Color | None) -> tuple[float, float, float]:
+    # PIL draws with white when there is no color
+    if color is None:
+        return 1, 1, 1
+    rgb = ImageColor.getrgb(color) if isinstance(color, str) else color
+    return rgb[0] / 255, rgb[1] / 255, rgb[2] / 255
+
+
+@dataclass(slots=True)
+class _EmbeddedFont:
+    number: int
+    font: TrueTypeFont
+    # Glyph id to text for copy-paste, characters missing from the font use glyph 0
+    glyphs: dict[int, str] = field(default_factory=dict)
+
+
+class PdfCanvas:
+    """Content of a single page, in pixel coordinates with the origin at the top left corner."""
+
+    def __init__(self, writer: VectorPdfWriter) -> None:
+        self.writer = writer
+        self.content: list[bytes] = []
+        self.fonts: set[int] = set()
+        self.images: set[int] = set()
+
+    def rect(self, x0: float, y0: float, x1: float, y1: float, fill: Color) -> None:
+        # Corners are inclusive, like in PIL
+        self.content.append(
+            b"%s %s %s rg %s %s %s %s re f"
+            % (*map(_n, _color(fill)), _n(x0), _n(y0), _n(x1 - x0 + 1), _n(y1 - y0 + 1))
+        )
+
+    def line(
+        self, x0: float, y0: float, x1: float, y1: float, color: Color | None, width: int
+    ) -> None:
+        # Lines go through pixel centers, projecting caps cover the end pixels as PIL does
+        self.content.append(
+            b"%s %s %s RG %s w %s %s m %s %s l S"
+            % (
+                *map(_n, _color(color)),
+                _n(max(width, 1)),
+                _n(x0 + 0.5),
+                _n(y0 + 0.5),
+                _n(x1 + 0.5),
+                _n(y1 + 0.5),
+            )
+        )
+
+    def text(
+        self,
+        x: float,
+        y: float,
+        text: str,
+        font: Font,
+        color: Color,
+        spacing: float,
+        antialiasing: bool = True,
+        features: tuple[str, ...] | None = None,
+    ) -> None:
+        lines = text.split("\n")
+        # Glyphs are placed where layout measured them, including kerning
+        offsets = [font.advances.offsets(line) for line in lines]
+        if any(line_offsets is None for line_offsets in offsets):
+            # Bidi, complex scripts and ligatures are drawn as PIL shapes them
+            self._raster_text(x, y, text, font, color, spacing, antialiasing, features)
+            return
+
+        embedded = self.writer.embed_font(font)
+        self.fonts.add(embedded.number)
+        with font.lock:
+            ascent, _ = font.pil_font.getmetrics()
+        line_spacing = font.line_spacing(features) + spacing
+        size = font.pil_font.size
+        # Pixels per font unit
+        scale = size / embedded.font.units_per_em
+        self.content.append(b"%s %s %s rg" % tuple(map(_n, _color(color))))
+        cmap = embedded.font.cmap
+        advances = embedded.font.advances
+        for idx, (line, line_offsets) in enumerate(zip(lines, offsets)):
+            assert line_offsets is not None
+            items = []
+            glyphs: list[bytes] = []
+            pen = 0.0
+            for char, offset in zip(line, line_offsets):
+                glyph = cmap.get(ord(char), 0)
+                if glyph:
+                    embedded.glyphs.setdefault(glyph, char)
+                # Adjustments are in thousandths of the font size, subtracted from the pen
+                adjustment = (pen - offset) * 1000 / size
+                if abs(adjustment) >= 0.001:
+                    items.append(b"<%s>%s" % (b"".join(glyphs), _n(adjustment)))
+                    glyphs = []
+                glyphs.append(b"%04x" % glyph)
+                pen = offset + advances[glyph] * scale
+            items.append(b"<%s>" % b"".join(glyphs))
+            self.content.append(
+                b"BT /F%d %s Tf 1 0 0 -1 %s %s Tm [%s] TJ ET"
+                % (
+                    embedded.number,
+                    _n(size),
+                    _n(x),
+                    _n(y + ascent + idx * line_spacing),
+                    b"".join(items),
+                )
+            )
+
+    def _raster_text(
+        self,
+        x: float,
+        y: float,
+        text: str,
+        font: Font,
+        color: Color,
+        spacing: float,
+        antialiasing: bool,
+        features: tuple[str, ...] | None,
+    ) -> None:
+        left, top = floor(x), floor(y)
+        fraction_x, fraction_y = x - left, y - top
+        with font.lock:
+            bbox = ImageDraw.Draw(Image.new("L", (1, 1))).multiline_textbbox(
+                (fraction_x, fraction_y),
+                text,
+                font=font.pil_font,
+                spacing=spacing,
+                features=list(features) if features else None,
+            )
+        x0, y0 = floor(min(bbox[0], 0)), floor(min(bbox[1], 0))
+        width, height = ceil(bbox[2]) - x0 + 1, ceil(bbox[3]) - y0 + 1
+        image = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        draw_ctx = ImageDrawCtx(image=image, draw=ImageDraw.Draw(image))
+        font.cache.mask_cache.draw(
+            draw_ctx,
+            fraction_x - x0,
+            fraction_y - y0,
+            text,
+            font,
+            color,
+            spacing,
+            antialiasing,
+            features,
+        )
+        self.image(left + x0, top + y0, image)
+
+    def image(self, x: float, y: float, image: Image.Image) -> None:
+        number = self.writer.embed_image(image)
+        self.images.add(number)
+        self.content.append(
+            b"q %d 0 0 -%d %s %s cm /Im%d Do Q"
+            % (image.width, image.height, _n(x), _n(y + image.height), number)
+        )
+
+
+class VectorPdfWriter:
+    """PDF with vector pages. Page size in points is the layout size scaled by dpi."""
+
+    def __init__(
+        self, fp: BinaryIO, dpi: float = 72, background_color: Color | None = None
+    ) -> None:
+        self.dpi = dpi
+        self.background_color = background_color
+        self.pdf = PdfFile(fp)
+        self.pages = self.pdf.reserve()
+        self.catalog = self.pdf.add(b"<< /Type /Catalog /Pages %d 0 R >>" % self.pages)
+        self.kids: list[int] = []
+        self.fonts: dict[tuple[str, int], _EmbeddedFont] = {}
+        # Digest of pixels to the image object
+        self.images: dict[bytes, int] = {}
+
+    def embed_font(self, font: Font) -> _EmbeddedFont:
+        path = font.path
+        if path is None:
+            raise TypeError(f"Only fonts loaded from files can be embedded, got {font!r}")
+        key = (path, font.pil_font.index)
+        embedded = self.fonts.get(key)
+        if embedded is None:
+            embedded = _EmbeddedFont(self.pdf.reserve(), TrueTypeFont.from_file(*key))
+            self.fonts[key] = embedded
+        return embedded
+
+    def embed_image(self, image: Image.Image) -> int:
+        if image.mode not in ("L", "LA", "RGB", "RGBA"):
+            image = image.convert("RGBA")
+        digest = hashlib.blake2b(image.tobytes(), digest_size=16)
+        digest.update(b"%s %d %d" % (image.mode.encode(), image.width, image.height))
+        number = self.images.get(digest.digest())
+        if number is not None:
+            return number
+
+        smask = b""
+        if image.mode in ("LA", "RGBA"):
+            alpha = image.getchannel("A")
+            image = image.convert(image.mode[:-1])
+            if alpha.getextrema() != (255, 255):
+                smask = b" /SMask %d 0 R" % self._image_object(alpha, b"")
+        number = self._image_object(image, smask)
+        self.images[digest.digest()] = number
+        return number
+
+    def _image_object(self, image: Image.Image, extra: bytes) -> int:
+        color_space = b"/DeviceGray" if image.mode == "L" else b"/DeviceRGB"
+        return self.pdf.add(
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace %s"
+            b" /BitsPerComponent 8 /Filter /FlateDecode%s >>"
+            % (image.width, image.height, color_space, extra),
+            stream=zlib.compress(image.tobytes()),
+        )
+
+    def write(self, page_size: Size, page: Layout | DisplayList) -> None:
+        if isinstance(page, Layout):
+            page = compile_display_list(page)
+        canvas = PdfCanvas(self)
+        scale = 72 / self.dpi
+        width, height = page_size.width * scale, page_size.height * scale
+        # Flips y axis, so content is drawn in pixel coordinates
+        canvas.content.append(b"%s 0 0 %s 0 %s cm" % (_n(scale), _n(-scale), _n(height)))
+        if self.background_color is not None:
+            canvas.rect(0, 0, page_size.width - 1, page_size.height - 1, self.background_color)
+        canvas.content.append(b"2 J")
+        for op in page.ops:
+            op.draw_pdf(canvas)
+
+        contents = self.pdf.add(
+            b"<< /Filter /FlateDecode >>", stream=zlib.compress(b"\n".join(canvas.content))
+        )
+        fonts = b"".join(b"/F%d %d 0 R " % (n, n) for n in sorted(canvas.fonts))
+        images = b"".join(b"/Im%d %d 0 R " % (n, n) for n in sorted(canvas.images))
+        self.kids.append(
+            self.pdf.add(
+                b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %s %s]"
+                b" /Resources << /Font << %s>> /XObject << %s>> >> /Contents %d 0 R >>"
+                % (self.pages, _n(width), _n(height), fonts, images, contents)
+            )
+        )
+
+    def close(self) -> None:
+        for embedded in self.fonts.values():
+            self._write_font(embedded)
+        kids = b" ".join(b"%d 0 R" % kid for kid in self.kids)
+        self.pdf.add(
+            b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self.kids)),
+            number=self.pages,
+        )
+        self.pdf.close(self.catalog)
+
+    def __enter__(self) -> VectorPdfWriter:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _write_font(self, embedded: _EmbeddedFont) -> None:
+        font = embedded.font
+        glyphs = sorted({0, *embedded.glyphs})
+        scale = 1000 / font.units_per_em
+
+        # Subset fonts are named with a tag derived from the glyphs they have
+        tag_hash = hashlib.blake2b(repr(glyphs).encode(), digest_size=6).digest()
+        tag = "".join(string.ascii_uppercase[b % 26] for b in tag_hash)
+        name = "".join(c for c in font.postscript_name if c.isalnum() or c in "-_") or "Font"
+        base_font = f"{tag}+{name}".encode()
+
+        if font.has_outlines:
+            data = font.subset(set(glyphs))
+            font_file = self.pdf.add(
+                b"<< /Filter /FlateDecode /Length1 %d >>" % len(data), stream=zlib.compress(data)
+            )
+            font_file_key, cid_subtype = b"/FontFile2", b"/CIDFontType2"
+        else:
+            # CFF outlines can not be subset here, the whole font is embedded
+            font_file = self.pdf.add(
+                b"<< /Subtype /OpenType /Filter /FlateDecode >>", stream=zlib.compress(font.data)
+            )
+            font_file_key, cid_subtype = b"/FontFile3", b"/CIDFontType0"
+
+        flags = 4 | (1 if font.fixed_pitch else 0) | (64 if font.italic_angle else 0)
+        descriptor = self.pdf.add(
+            b"<< /Type /FontDescriptor /FontName /%s /Flags %d /FontBBox [%s]"
+            b" /ItalicAngle %s /Ascent %s /Descent %s /CapHeight %s /StemV 80 %s %d 0 R >>"
+            % (
+                base_font,
+                flags,
+                b" ".join(_n(v * scale) for v in font.bbox),
+                _n(font.italic_angle),
+                _n(font.ascent * scale),
+                _n(font.descent * scale),
+                _n(font.cap_height * scale),
+                font_file_key,
+                font_file,
+            )
+        )
+        widths = b" ".join(b"%d [%s]" % (g, _n(font.advances[g] * scale)) for g in glyphs)
+        cid_font = self.pdf.add(
+            b"<< /Type /Font /Subtype %s /BaseFont /%s"
+            b" /CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >>"
+            b" /FontDescriptor %d 0 R /CIDToGIDMap /Identity /W [%s] >>"
+            % (cid_subtype, base_font, descriptor, widths)
+        )
+        to_unicode = self.pdf.add(
+            b"<< /Filter /FlateDecode >>",
+            stream=zlib.compress(_to_unicode_cmap(embedded.glyphs)),
+        )
+        self.pdf.add(
+            b"<< /Type /Font /Subtype /Type0 /BaseFont /%s /Encoding /Identity-H"
+            b" /DescendantFonts [%d 0 R] /ToUnicode %d 0 R >>" % (base_font, cid_font, to_unicode),
+            number=embedded.number,
+        )
+
+
+def _to_unicode_cmap(glyphs: dict[int, str]) -> bytes:
+    lines = [
+        b"/CIDInit /ProcSet findresource begin 12 dict begin begincmap",
+        b"/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def",
+        b"/CMapName /Adobe-Identity-UCS def /CMapType 2 def",
+        b"1 begincodespacerange <0000> <ffff> endcodespacerange",
+    ]
+    items = sorted(glyphs.items())
+    # At most 100 entries per block
+    for start in range(0, len(items), 100):
+        block = items[start : start + 100]
+        lines.append(b"%d beginbfchar" % len(block))
+        for glyph, text in block:
+            lines.append(b"<%04x> <%s>" % (glyph, text.encode("utf-16-be").hex().encode()))
+        lines.append(b"endbfchar")
+    lines.append(b"endcmap CMapName currentdict /CMap defineresource pop end end")
+    return b"\n".join(lines)
+
+
+def write_pdf(
+    pages: Iterable[tuple[Size, Layout | DisplayList]],
+    fp: BinaryIO,
+    dpi: float = 72,
+    background_color: Color | None = None,
+) -> int:
+    """Writes pages (e.g. from layout_multipage_document) as a vector PDF, returns page count."""
+    count = 0
+    with VectorPdfWriter(fp, dpi=dpi, background_color=background_color) as writer:
+        for page_size, page in pages:
+            writer.write(page_size, page)
+            count += 1
+    return count
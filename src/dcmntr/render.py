@@ -1,9 +1,10 @@
 from math import ceil
 
-from PIL import Image, ImageDraw
+from PIL import Image
 
 from dcmntr.basic_layout import Color
 from dcmntr.core import *
+from dcmntr.display_list import DisplayList, compile_display_list
 
 
 def render_into_image(
@@ -22,10 +23,27 @@ def render_into_image(
     return img
 
 
-def draw_document_pil(layout: Layout, image: Image.Image) -> None:
-    draw_ctx = ImageDrawCtx(
-        image=image,
-        draw=ImageDraw.Draw(image),
-    )
-    for x, y, node_layout in walk_layout(layout):
-        node_layout.get_node().draw_image(x, y, node_layout, draw_ctx)
+def rasterize_page(
+    page_size: Size,
+    display_list: DisplayList,
+    background_color: Color = "white",
+) -> Image.Image:
+    img = Image.new("RGBA", (ceil(page_size.width), ceil(page_size.height)), background_color)
+    display_list.draw_pil(img)
+    return img
+
+
+def render_region(
+    layout: Layout,
+    region: Region,
+    background_color: Color = "white",
+) -> Image.Image:
+    """Image of a region of the page, e.g. a tile. Nodes outside of the region are not drawn."""
+    display_list = compile_display_list(layout, clip=region).translate(-region.x, -region.y)
+    return rasterize_page(region.size(), display_list, background_color)
+
+
+def draw_document_pil(layout: Layout | DisplayList, image: Image.Image) -> None:
+    if isinstance(layout, Layout):
+        layout = compile_display_list(layout)
+    layout.draw_pil(image)
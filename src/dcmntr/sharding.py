@@ -0,0 +1,126 @@
+"""Pagination and rendering of independent parts of a document in separate processes.
+
+Content after a top level page break does not affect pages before it, so a document
+like `v_stack(chapter, page_break, chapter, ...)` can be split into shards. Shards are
+paginated independently, only page indexes depend on the page count of previous shards.
+Functions here can be used to distribute shards to other machines as well.
+"""
+
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Generator
+
+from PIL import Image
+
+from dcmntr.basic_layout import Color, Stack
+from dcmntr.core import *
+from dcmntr.display_list import compile_display_list
+from dcmntr.paging import (
+    PageBreak,
+    PageStructureCallable,
+    layout_multipage_document,
+    measure_content_size,
+    submit_in_order,
+)
+from dcmntr.render import rasterize_page
+
+__all__ = [
+    "split_at_page_breaks",
+    "count_pages",
+    "render_shard",
+    "render_sharded",
+]
+
+
+def split_at_page_breaks(content: Node) -> list[Node]:
+    """Parts of a top level vertical stack between page breaks. Other content is a single part."""
+    if (
+        not isinstance(content, Stack)
+        or not content.direction.height
+        or content.split_position() is not None
+    ):
+        return [content]
+    shards = []
+    chunk: list[Node] = []
+    for child in content.children:
+        if isinstance(child, PageBreak):
+            shards.append(content(*chunk))
+            chunk = []
+        else:
+            chunk.append(child)
+    shards.append(content(*chunk))
+    return shards
+
+
+def count_pages(page_size: Size, page_structure_f: PageStructureCallable, content: Node) -> int:
+    """Number of pages of the content, without laying out page structure."""
+    _, _, content_size = measure_content_size(page_size, page_structure_f)
+    pages = 0
+    page_content: Node | None = content
+    while page_content is not None:
+        layout = (
+            LayoutCtx(page_index=pages)
+            .page_ctx()
+            .layout_node(page_content, content_size.to_constraints_max())
+        )
+        page_content = layout.layout.leftover
+        pages += 1
+    return pages
+
+
+def render_shard[T](
+    page_size: Size,
+    page_structure_f: PageStructureCallable,
+    shard: Node,
+    page_index_offset: int,
+    encode: Callable[[Image.Image], T],
+    background_color: Color = "white",
+) -> list[T]:
+    """Encoded pages of the shard that starts at page_index_offset of the document."""
+    pages = layout_multipage_document(
+        page_size, page_structure_f, shard, page_index_offset=page_index_offset
+    )
+    return [
+        encode(rasterize_page(page_size, compile_display_list(layout), background_color))
+        for page_size, layout in pages
+    ]
+
+
+def render_sharded[T](
+    page_size: Size,
+    page_structure_f: PageStructureCallable,
+    content: Node,
+    encode: Callable[[Image.Image], T],
+    workers: int,
+    background_color: Color = "white",
+    max_in_flight: int | None = None,
+) -> Generator[T, None, None]:
+    """Renders shards of the content in a process pool, yields encoded pages in order.
+
+    Pages are counted in the first pass, then shards are rendered knowing their first page
+    index. Content, page_structure_f and encode must be picklable (e.g. module level functions).
+    At most max_in_flight shards (2 per worker by default) are rendered or kept in memory.
+    """
+    shards = split_at_page_breaks(content)
+    with ProcessPoolExecutor(workers) as pool:
+        counts = pool.map(partial(count_pages, page_size, page_structure_f), shards)
+        offsets = itertools.accumulate(counts, initial=0)
+        rendered_shards = submit_in_order(
+            pool,
+            (
+                partial(
+                    render_shard,
+                    page_size,
+                    page_structure_f,
+                    shard,
+                    offset,
+                    encode,
+                    background_color,
+                )
+                for shard, offset in zip(shards, offsets)
+            ),
+            2 * workers if max_in_flight is None else max_in_flight,
+        )
+        for pages in rendered_shards:
+            yield from pages
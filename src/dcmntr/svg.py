@@ -0,0 +1,187 @@
+"""SVG output, written element by element to a text stream.
+
+Text refers to fonts by family name, so it is drawn by fonts of the viewer. Font files can be
+linked with font_url. Images are linked to their files or embedded as PNG, once per page.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+from pathlib import Path
+from typing import Any, Callable, Iterable, TextIO
+from xml.sax.saxutils import escape, quoteattr
+
+from PIL import Image, ImageColor
+
+from dcmntr.basic_layout import Color
+from dcmntr.core import *
+from dcmntr.display_list import DisplayList, compile_display_list
+from dcmntr.text import Font
+
+__all__ = [
+    "SvgCanvas",
+    "write_svg",
+    "write_svg_pages",
+]
+
+
+def _n(value: float) -> str:
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+def _paint(attribute: str, color: Color | None) -> str:
+    # PIL draws with white when there is no color
+    if color is None:
+        return f'{attribute}="#ffffff"'
+    rgb = ImageColor.getrgb(color) if isinstance(color, str) else color
+    paint = f'{attribute}="#{rgb[0]:02x}{rgb[1]:02x}{rgb[2]:02x}"'
+    if len(rgb) == 4 and rgb[3] != 255:
+        paint += f' {attribute}-opacity="{_n(rgb[3] / 255)}"'
+    return paint
+
+
+class SvgCanvas:
+    """Writes elements of a single page, in pixel coordinates."""
+
+    def __init__(
+        self,
+        fp: TextIO,
+        embed_images: bool = True,
+        font_url: Callable[[Font], str | None] | None = None,
+    ) -> None:
+        self.fp = fp
+        self.embed_images = embed_images
+        self.font_url = font_url
+        self.fonts: set[tuple[str, bool, bool]] = set()
+        # Digest of pixels to the id of the embedded image
+        self.images: dict[bytes, str] = {}
+
+    def rect(self, x0: float, y0: float, x1: float, y1: float, fill: Color) -> None:
+        # Corners are inclusive, like in PIL
+        self.fp.write(
+            f'<rect x="{_n(x0)}" y="{_n(y0)}" width="{_n(x1 - x0 + 1)}" height="{_n(y1 - y0 + 1)}"'
+            f" {_paint('fill', fill)}/>\n"
+        )
+
+    def line(
+        self, x0: float, y0: float, x1: float, y1: float, color: Color | None, width: int
+    ) -> None:
+        # Lines go through pixel centers, square caps cover the end pixels as PIL does
+        self.fp.write(
+            f'<line x1="{_n(x0 + 0.5)}" y1="{_n(y0 + 0.5)}" x2="{_n(x1 + 0.5)}" y2="{_n(y1 + 0.5)}"'
+            f' {_paint("stroke", color)} stroke-width="{max(width, 1)}"'
+            ' stroke-linecap="square"/>\n'
+        )
+
+    def text(
+        self,
+        x: float,
+        y: float,
+        text: str,
+        font: Font,
+        color: Color,
+        spacing: float,
+        features: tuple[str, ...] | None = None,
+    ) -> None:
+        with font.lock:
+            family, _ = font.pil_font.getname()
+            ascent, _ = font.pil_font.getmetrics()
+        line_spacing = font.line_spacing(features) + spacing
+        family = family or font.name
+        self._font_face(family, font)
+        style = f"font-family:{family!r};font-size:{font.pil_font.size}px"
+        if font.bold:
+            style += ";font-weight:bold"
+        if font.italic:
+            style += ";font-style:italic"
+        self.fp.write(f'<g style={quoteattr(style)} {_paint("fill", color)}>')
+        for idx, line in enumerate(text.split("\n")):
+            self.fp.write(
+                f'<text x="{_n(x)}" y="{_n(y + ascent + idx * line_spacing)}"'
+                f' xml:space="preserve">{escape(line)}</text>'
+            )
+        self.fp.write("</g>\n")
+
+    def _font_face(self, family: str, font: Font) -> None:
+        key = (family, font.bold, font.italic)
+        if self.font_url is None or key in self.fonts:
+            return
+        self.fonts.add(key)
+        url = self.font_url(font)
+        if url is not None:
+            self.fp.write(
+                f"<style>@font-face{{font-family:{escape(repr(family))};"
+                f"src:url({escape(repr(url))});"
+                f"font-weight:{'bold' if font.bold else 'normal'};"
+                f"font-style:{'italic' if font.italic else 'normal'}}}</style>\n"
+            )
+
+    def image(
+        self, x: float, y: float, image: Image.Image, source: str | Path | None = None
+    ) -> None:
+        size = f'width="{image.width}" height="{image.height}"'
+        if source is not None and not self.embed_images:
+            self.fp.write(
+                f'<image x="{_n(x)}" y="{_n(y)}" {size} preserveAspectRatio="none"'
+                f" href={quoteattr(str(source))}/>\n"
+            )
+            return
+
+        digest = hashlib.blake2b(image.tobytes(), digest_size=16)
+        digest.update(f"{image.mode} {image.width} {image.height}".encode())
+        image_id = self.images.get(digest.digest())
+        if image_id is None:
+            image_id = f"im{len(self.images)}"
+            self.images[digest.digest()] = image_id
+            png = io.BytesIO()
+            image.save(png, format="PNG")
+            self.fp.write(
+                f'<defs><image id="{image_id}" {size} href="data:image/png;base64,'
+                f'{base64.b64encode(png.getvalue()).decode()}"/></defs>\n'
+            )
+        self.fp.write(f'<use href="#{image_id}" x="{_n(x)}" y="{_n(y)}"/>\n')
+
+
+def write_svg(
+    page_size: Size,
+    page: Layout | DisplayList,
+    fp: TextIO,
+    background_color: Color | None = None,
+    embed_images: bool = True,
+    font_url: Callable[[Font], str | None] | None = None,
+) -> None:
+    """Writes the page as an SVG document.
+
+    Images of files are linked instead of embedded if embed_images is False. font_url gives
+    a URL of the font file for @font-face rules, fonts are referenced by family name otherwise.
+    """
+    if isinstance(page, Layout):
+        page = compile_display_list(page)
+    width, height = _n(page_size.width), _n(page_size.height)
+    fp.write(
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}"'
+        f' viewBox="0 0 {width} {height}" shape-rendering="crispEdges">\n'
+    )
+    canvas = SvgCanvas(fp, embed_images=embed_images, font_url=font_url)
+    if background_color is not None:
+        canvas.rect(0, 0, page_size.width - 1, page_size.height - 1, background_color)
+    for op in page.ops:
+        op.draw_svg(canvas)
+    fp.write("</svg>\n")
+
+
+def write_svg_pages(
+    pages: Iterable[tuple[Size, Layout | DisplayList]],
+    directory: str | Path,
+    filename_format: str = "page_{:04d}.svg",
+    **kwargs: Any,
+) -> int:
+    """Writes pages (e.g. from layout_multipage_document) into files, returns page count."""
+    count = 0
+    for page_size, page in pages:
+        with open(Path(directory) / filename_format.format(count), "w", encoding="utf-8") as fp:
+            write_svg(page_size, page, fp, **kwargs)
+        count += 1
+    return count
@@ -1,31 +1,111 @@
 from __future__ import annotations
 
-import subprocess
-from dataclasses import dataclass, field
-from typing import Any
+import io
+import math
+import re
+import threading
+from dataclasses import dataclass, field, replace
+from typing import Any, Iterable
 
-from PIL import ImageFont, features as PIL_features
+from PIL import Image, ImageDraw, ImageFont, features as PIL_features
 from PIL.ImageFont import FreeTypeFont
 
+from dcmntr.advances import GlyphAdvances
 from dcmntr.basic_layout import Color
-from dcmntr.core import LeafNode, Layout, ImageDrawCtx, NodeLayoutCtx, Constraints, NodeLayout, Size
+from dcmntr.coverage import Coverage, split_by_coverage
+from dcmntr.core import (
+    INFINITY,
+    LeafNode,
+    LayoutOverflow,
+    Node,
+    Layout,
+    NodeLayoutCtx,
+    Constraints,
+    NodeLayout,
+    Size,
+    ImageDrawCtx,
+)
+from dcmntr.display_list import DrawOp, TextRun
+from dcmntr.font_index import FontIndex, default_font_index
+from dcmntr.lru import LRUCache
+from dcmntr.truetype import TrueTypeFont
 
 __all__ = [
     "Fonts",
     "Font",
+    "FontFaces",
+    "default_font_faces",
+    "TextMeasureCache",
+    "FontRunsCache",
+    "TextMaskCache",
     "simple_text",
     "SimpleText",
+    "span",
+    "Span",
+    "paragraph",
+    "Paragraph",
 ]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Font:
-    cache: Fonts
+    cache: Fonts = field(compare=False, repr=False)
     pil_font: FreeTypeFont
     name: str
     size: int
     bold: bool
     italic: bool
+    # Font file, faces are loaded from shared bytes and do not keep it
+    path: str | None = field(default=None, compare=False)
+    # FreeType face is not safe to use from several threads at once
+    lock: threading.Lock = field(default_factory=threading.Lock, compare=False, repr=False)
+    advances: GlyphAdvances = field(init=False, compare=False, repr=False)
+    _fallbacks: tuple[Font, ...] | None = field(default=None, init=False, compare=False, repr=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "advances", GlyphAdvances(self.pil_font, self.lock))
+
+    def line_spacing(self, features: tuple[str, ...] | None = None) -> float:
+        """Distance between lines of multiline text without extra spacing, as in PIL."""
+        with self.lock:
+            return float(
+                self.pil_font.getbbox("A", "L", features=list(features) if features else None)[3]
+            )
+
+    def text_size(self, text: str, spacing: float) -> tuple[float, float]:
+        """Same as SimpleText.multiline_text_size(), but measured characters are reused."""
+        lines = [text] if text.isprintable() else text.splitlines() or [""]
+        if self.cache.fallbacks:
+            width = max(map(self.line_width, lines))
+        else:
+            width = max(self.advances.widths(lines))
+        return width, self.advances.line_height * len(lines) + spacing * (len(lines) - 1)
+
+    def line_width(self, line: str) -> float:
+        """Width of a single line of text drawn with fonts of the fallback chain."""
+        *runs, (last_font, last_text) = self.runs(line)
+        pen = sum(font.advances.length(text) for font, text in runs)
+        return pen + last_font.advances.width(last_text)
+
+    def fallbacks(self) -> tuple[Font, ...]:
+        """Fonts of the same size and style for characters this font does not have."""
+        fallbacks = self._fallbacks
+        if fallbacks is None:
+            fonts = (self.same_but(name=name) for name in self.cache.fallbacks)
+            fallbacks = tuple(font for font in fonts if font.path != self.path)
+            object.__setattr__(self, "_fallbacks", fallbacks)
+        return fallbacks
+
+    def coverage(self) -> Coverage:
+        if self.path is None:
+            raise TypeError(f"Coverage is known only for fonts loaded from files, got {self!r}")
+        return self.cache.faces.coverage(self.path)
+
+    def runs(self, text: str) -> tuple[tuple[Font, str], ...]:
+        """Text split into runs of the first font of the fallback chain that has the characters."""
+        if not self.cache.fallbacks:
+            return ((self, text),)
+        return self.cache.runs_cache.runs(self, text)
 
     def same_but(self, **kwargs: Any) -> Font:
         return self.cache.load(
@@ -38,52 +118,238 @@ class Font:
             }
         )
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        # FreeTypeFont can not be pickled, the same file is loaded once per process instead
+        return _unpickle_font, (self.name, self.size, self.bold, self.italic, self.path)
+
+
+class TextMeasureCache(LRUCache[tuple[Font, str, float], tuple[float, float]]):
+    """Sizes of measured texts keyed by font, text and line spacing."""
+
+    def measure(self, font: Font, text: str, spacing: float) -> tuple[float, float]:
+        key = (font, text, spacing)
+        size = self.get(key)
+        if size is None:
+            size = font.text_size(text, spacing)
+            self.put(key, size)
+        return size
+
+    def measure_many(
+        self, font: Font, texts: Iterable[str], spacing: float
+    ) -> list[tuple[float, float]]:
+        measure = self.measure
+        return [measure(font, text, spacing) for text in texts]
+
+
+class FontRunsCache(LRUCache[tuple[Font, str], tuple[tuple[Font, str], ...]]):
+    """Texts split into runs by fonts of the fallback chain, keyed by font and text."""
+
+    def runs(self, font: Font, text: str) -> tuple[tuple[Font, str], ...]:
+        key = (font, text)
+        runs = self.get(key)
+        if runs is None:
+            chain = (font, *font.fallbacks())
+            coverages = [f.coverage() for f in chain]
+            runs = tuple((chain[idx], run) for idx, run in split_by_coverage(text, coverages))
+            self.put(key, runs)
+        return runs
+
+
+# Mask of a line of text and its offset from the whole pixel of the drawing position
+type TextMask = tuple[Image.Image, tuple[int, int]]
+
+
+class TextMaskCache(
+    LRUCache[tuple[Font, str, str, tuple[str, ...] | None, float, float], TextMask]
+):
+    """Rasterized lines of text, so repeated texts are drawn by blending a cached mask.
+
+    Keyed by font, text, font mode, features and fractional part of the position, which
+    affects rasterization. Weight is the mask size in bytes.
+    """
+
+    def weigh(self, value: TextMask) -> int:
+        width, height = value[0].size
+        return width * height
+
+    def draw(
+        self,
+        draw_ctx: ImageDrawCtx,
+        x: float,
+        y: float,
+        text: str,
+        font: Font,
+        color: Color,
+        spacing: float,
+        antialiasing: bool,
+        features: tuple[str, ...] | None,
+    ) -> None:
+        """Same as ImageDraw.text() with the font, left aligned."""
+        mode = "L" if antialiasing else "1"
+        lines = text.split("\n")
+        line_spacing = 0.0
+        if len(lines) > 1:
+            line_spacing = font.line_spacing(features) + spacing
+        for idx, line in enumerate(lines):
+            line_y = y + idx * line_spacing
+            start = (math.modf(x)[0], math.modf(line_y)[0])
+            key = (font, line, mode, features, *start)
+            cached = self.get(key)
+            if cached is None:
+                cached = self.rasterize(font, line, mode, features, start)
+                self.put(key, cached)
+            mask, offset = cached
+            # Blends the mask with the color exactly as ImageDraw.text() does
+            draw_ctx.draw.bitmap((int(x) - offset[0], int(line_y) - offset[1]), mask, fill=color)
+
+    def rasterize(
+        self,
+        font: Font,
+        line: str,
+        mode: str,
+        features: tuple[str, ...] | None,
+        start: tuple[float, float],
+    ) -> TextMask:
+        """Line of text drawn in full coverage into a mask, with the fractional position."""
+        with font.lock:
+            left, top, right, bottom = font.pil_font.getbbox(
+                line, mode, features=list(features) if features else None
+            )
+            # Margin for rounding of the fractional position
+            offset = (max(0, -int(left)) + 1, max(0, -int(top)) + 1)
+            mask = Image.new("L", (int(right) + offset[0] + 2, int(bottom) + offset[1] + 2))
+            draw = ImageDraw.Draw(mask)
+            draw.fontmode = mode
+            draw.text(
+                (offset[0] + start[0], offset[1] + start[1]),
+                line,
+                fill=255,
+                font=font.pil_font,
+                features=list(features) if features else None,
+            )
+        return mask, offset
+
+
+class FontFaces:
+    """Font files read once per process. Faces of all sizes share bytes of the file.
+
+    Pillow copies fonts given as file objects, so they can not be memory-mapped, but faces
+    derived with font_variant() reuse the bytes of the first face. Thread-safe.
+    """
+
+    def __init__(self) -> None:
+        self.faces: dict[str, FreeTypeFont] = {}
+        self.coverages: dict[str, Coverage] = {}
+        self._lock = threading.Lock()
+
+    def open(self, path: str, size: int) -> FreeTypeFont:
+        face = self.faces.get(path)
+        if face is not None:
+            return face.font_variant(size=size)
+        with self._lock:
+            face = self.faces.get(path)
+            if face is not None:
+                return face.font_variant(size=size)
+            with open(path, "rb") as fp:
+                data = fp.read()
+            face = ImageFont.truetype(
+                io.BytesIO(data),
+                size,
+                layout_engine=ImageFont.Layout.RAQM,
+            )
+            self.faces[path] = face
+            return face
+
+    def coverage(self, path: str) -> Coverage:
+        """Code points of the font file, from its cmap."""
+        coverage = self.coverages.get(path)
+        if coverage is None:
+            face = self.faces.get(path)
+            font = (
+                TrueTypeFont(face.font_bytes) if face is not None else TrueTypeFont.from_file(path)
+            )
+            coverage = Coverage(font.cmap)
+            self.coverages[path] = coverage
+        return coverage
+
+
+# Shared by all Fonts of the process
+default_font_faces = FontFaces()
+
 
 @dataclass
 class Fonts:
-    cache: dict[tuple[str, int, bool, bool], Font] = field(default_factory=dict)
+    """Loaded fonts. Characters that a font does not have are drawn with the first font of
+    the same size and style from fallbacks (font names) that has them.
+    """
+
+    cache: LRUCache[tuple[str, int, bool, bool], Font] = field(
+        default_factory=lambda: LRUCache(maxsize=256)
+    )
+    fallbacks: tuple[str, ...] = ()
+    measure_cache: TextMeasureCache = field(
+        default_factory=lambda: TextMeasureCache(maxsize=4096), compare=False
+    )
+    runs_cache: FontRunsCache = field(
+        default_factory=lambda: FontRunsCache(maxsize=4096), compare=False
+    )
+    mask_cache: TextMaskCache = field(
+        default_factory=lambda: TextMaskCache(maxsize=4096, max_weight=64 * 2**20), compare=False
+    )
+    index: FontIndex = field(default_factory=lambda: default_font_index, compare=False)
+    faces: FontFaces = field(default_factory=lambda: default_font_faces, compare=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
 
-    def load(self, name: str, size: int, bold: bool = False, italic: bool = False) -> Font:
+    def load(
+        self,
+        name: str,
+        size: int,
+        bold: bool = False,
+        italic: bool = False,
+        path: str | None = None,
+    ) -> Font:
+        """Font by name, or from the path if the font file is already known."""
         key = (name, size, bold, italic)
         font = self.cache.get(key)
         if font is not None:
             return font
 
-        pil_font = self.load_from_fonttools(name, size, bold, italic)
+        with self._lock:
+            font = self.cache.peek(key)
+            if font is not None:
+                return font
 
-        font = Font(
-            self,
-            pil_font=pil_font,
-            name=name,
-            size=size,
-            bold=bold,
-            italic=italic,
-        )
+            if path is None:
+                path = self.index.resolve(name, bold, italic)
 
-        self.cache[key] = font
-        return font
-
-    def load_from_fonttools(self, name: str, size: int, bold: bool, italic: bool) -> FreeTypeFont:
-        style = []
-        if bold:
-            style.append("Bold")
-        if italic:
-            style.append("Italic")
-
-        pattern = name + (":" + ":".join(style) if style else "")
-        path = subprocess.check_output(
-            ["fc-match", "-f", "%{file}", pattern],
-            text=True,
-        ).strip()
-        # FIXME handle not found?
-        return ImageFont.truetype(
-            path,
-            size,
-            layout_engine=ImageFont.Layout.RAQM,
-        )
+            font = Font(
+                self,
+                pil_font=self.open_font(path, size),
+                name=name,
+                size=size,
+                bold=bold,
+                italic=italic,
+                path=path,
+            )
 
+            self.cache.put(key, font)
+            return font
 
-@dataclass(frozen=True)
+    def open_font(self, path: str, size: int) -> FreeTypeFont:
+        return self.faces.open(path, size)
+
+
+# Fonts of unpickled Font objects, e.g. in render worker processes
+_process_fonts = Fonts()
+
+
+def _unpickle_font(name: str, size: int, bold: bool, italic: bool, path: str | None) -> Font:
+    return _process_fonts.load(name, size, bold, italic, path=path)
+
+
+@dataclass(frozen=True, slots=True)
 class SimpleText(LeafNode):
     """Simple non-word wrapping text"""
 
@@ -95,20 +361,55 @@ class SimpleText(LeafNode):
 
     LIGA_AND_KERN_SUPPORTED = PIL_features.check("raqm")
 
-    def draw_image(self, x: float, y: float, layout: Layout, draw_ctx: ImageDrawCtx) -> None:
-        draw_ctx.draw.fontmode = "L" if self.antialiasing else "1"
-        draw_ctx.draw.text(
-            (x, y),
-            self.text,
-            fill=self.color,
-            font=self.font.pil_font,
-            spacing=self.spacing,
-            features=["liga", "kern"] if self.LIGA_AND_KERN_SUPPORTED else None,
+    def draw_ops(self, x: float, y: float, layout: Layout) -> Iterable[DrawOp]:
+        features = ("liga", "kern") if self.LIGA_AND_KERN_SUPPORTED else None
+        runs = self.font.runs(self.text)
+        if len(runs) > 1 or runs[0][0] is not self.font:
+            return self.fallback_draw_ops(x, y, features)
+        return (
+            TextRun(
+                x,
+                y,
+                self.text,
+                font=self.font,
+                color=self.color,
+                spacing=self.spacing,
+                antialiasing=self.antialiasing,
+                features=features,
+            ),
         )
 
+    def fallback_draw_ops(
+        self, x: float, y: float, features: tuple[str, ...] | None
+    ) -> list[DrawOp]:
+        # Lines are placed as PIL places them, runs of fallback fonts share the baseline
+        line_spacing = self.font.line_spacing(features) + self.spacing
+        ascent = self.font.advances.ascent
+        ops: list[DrawOp] = []
+        for idx, line in enumerate(self.text.split("\n")):
+            run_x = x
+            for font, text in self.font.runs(line):
+                ops.append(
+                    TextRun(
+                        run_x,
+                        y + idx * line_spacing + ascent - font.advances.ascent,
+                        text,
+                        font=font,
+                        color=self.color,
+                        spacing=self.spacing,
+                        antialiasing=self.antialiasing,
+                        features=features,
+                    )
+                )
+                run_x += font.advances.length(text)
+        return ops
+
     def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout:
-        width, height = self.multiline_text_size(self.text, self.font.pil_font, self.spacing)
-        return NodeLayout(Size(width, height), ())
+        return NodeLayout(self.measure(ctx, constraints), ())
+
+    def measure(self, ctx: NodeLayoutCtx, constraints: Constraints) -> Size:
+        width, height = self.font.cache.measure_cache.measure(self.font, self.text, self.spacing)
+        return Size(width, height)
 
     # FIXME not accurate :(
     @staticmethod
@@ -116,11 +417,16 @@ class SimpleText(LeafNode):
         text: str, font: FreeTypeFont, spacing: float, align: str = "left"
     ) -> tuple[float, float]:
 
-        lines = text.splitlines() or [""]
-
         ascent, descent = font.getmetrics()
         line_height = ascent + descent
 
+        # Line breaks are not printable, so most of the texts are a single line
+        if text.isprintable():
+            bbox = font.getbbox(text)
+            return bbox[2] - bbox[0], line_height
+
+        lines = text.splitlines() or [""]
+
         widths = []
         for line in lines:
             bbox = font.getbbox(line)
@@ -133,3 +439,263 @@ class SimpleText(LeafNode):
 
 
 simple_text = SimpleText
+
+
+@dataclass(frozen=True, slots=True)
+class Span:
+    """Styled part of a paragraph."""
+
+    text: str
+    font: Font
+    color: Color = "black"
+
+
+span = Span
+
+# Line breaks, runs of other whitespace and words
+_TOKENS = re.compile(r"\n|[^\S\n]+|\S+")
+
+# Part of a word or whitespace in a single span: (span index, text, pen length)
+type _Piece = tuple[int, str, float]
+
+
+class _Words:
+    """Words of paragraph spans with their lengths, shared by the paragraph and its leftovers.
+
+    Words can cross spans, lines break only at whitespace and line breaks.
+    """
+
+    __slots__ = ("spans", "pieces", "spaces", "prefix", "hard_breaks")
+
+    def __init__(self, spans: tuple[Span, ...]) -> None:
+        # Spans split into runs of fonts from fallback chains
+        self.spans = tuple(
+            Span(text, font, span.color)
+            for span in spans
+            for font, text in span.font.runs(span.text)
+        )
+        self.pieces: list[list[_Piece]] = []
+        # Whitespace after every word, dropped at the end of a line
+        self.spaces: list[_Piece] = []
+        # Lines always end after these words
+        self.hard_breaks: set[int] = set()
+        word: list[_Piece] = []
+        for idx, span in enumerate(self.spans):
+            length = span.font.advances.length
+            for token in _TOKENS.findall(span.text):
+                if token == "\n":
+                    if word:
+                        self._add(word, (idx, "", 0.0))
+                    elif self.pieces and self.spaces[-1][1]:
+                        # Whitespace before the line break ends the line too
+                        self.spaces[-1] = (idx, "", 0.0)
+                    else:
+                        # Empty line still has the height of its font
+                        self._add([(idx, "", 0.0)], (idx, "", 0.0))
+                    self.hard_breaks.add(len(self.pieces) - 1)
+                    word = []
+                elif token.isspace():
+                    # Whitespace at the start of a line is dropped
+                    if word:
+                        self._add(word, (idx, token, length(token)))
+                        word = []
+                else:
+                    word.append((idx, token, length(token)))
+        if word:
+            self._add(word, (0, "", 0.0))
+
+        # Pen position at the start of every word if all of them were on a single line
+        self.prefix = [0.0]
+        for pieces, space in zip(self.pieces, self.spaces):
+            self.prefix.append(self.prefix[-1] + sum(p[2] for p in pieces) + space[2])
+
+    def _add(self, word: list[_Piece], space: _Piece) -> None:
+        self.pieces.append(word)
+        self.spaces.append(space)
+
+    def __len__(self) -> int:
+        return len(self.pieces)
+
+    def width(self, start: int, end: int) -> float:
+        """Length of the line of words from start up to end (exclusive)."""
+        return self.prefix[end] - self.prefix[start] - self.spaces[end - 1][2]
+
+    def greedy_breaks(self, start: int, max_width: float) -> list[int]:
+        """Ends of lines, every line takes as many words as fit."""
+        ends = []
+        count = len(self)
+        while start < count:
+            end = start + 1
+            while (
+                end < count
+                and end - 1 not in self.hard_breaks
+                and self.width(start, end + 1) <= max_width
+            ):
+                end += 1
+            ends.append(end)
+            start = end
+        return ends
+
+    def optimal_breaks(self, start: int, max_width: float) -> list[int]:
+        """Ends of lines with the least sum of squared free space, except on last lines."""
+        if max_width == INFINITY:
+            return self.greedy_breaks(start, max_width)
+        ends = []
+        count = len(self)
+        while start < count:
+            end = start + 1
+            while end < count and end - 1 not in self.hard_breaks:
+                end += 1
+            ends.extend(self._optimal_segment_breaks(start, end, max_width))
+            start = end
+        return ends
+
+    def _optimal_segment_breaks(self, start: int, end: int, max_width: float) -> list[int]:
+        # Cost of the best breaking of words up to the index and start of its last line
+        costs = [0.0] + [INFINITY] * (end - start)
+        starts = [start] * (end - start + 1)
+        width = self.width
+        for line_end in range(start + 1, end + 1):
+            for line_start in range(line_end - 1, start - 1, -1):
+                line_width = width(line_start, line_end)
+                if line_width > max_width and line_start < line_end - 1:
+                    break
+                free = 0.0 if line_end == end else max_width - line_width
+                cost = costs[line_start - start] + free * free
+                if cost < costs[line_end - start]:
+                    costs[line_end - start] = cost
+                    starts[line_end - start] = line_start
+        ends = []
+        line_end = end
+        while line_end > start:
+            ends.append(line_end)
+            line_end = starts[line_end - start]
+        ends.reverse()
+        return ends
+
+
+@dataclass(frozen=True, slots=True)
+class _Line:
+    y: float
+    width: float
+    height: float
+    # (x, y offset of the span font, span index, text) of every run of a single span
+    runs: tuple[tuple[float, float, int, str], ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Paragraph(LeafNode):
+    """Word wrapping text of styled spans, splits between pages by lines.
+
+    Runs of a span on a line are measured and drawn as a single text. Lines are filled
+    greedily, or with optimal_fit breaks are chosen to make right edges of lines even.
+    """
+
+    spans: tuple[Span, ...]
+    spacing: float = 2
+    optimal_fit: bool = False
+    antialiasing: bool = True
+    # Leftover of a paragraph starts from this word
+    start: int = 0
+    _words: _Words | None = field(default=None, init=False, compare=False, repr=False)
+
+    def words(self) -> _Words:
+        words = self._words
+        if words is None:
+            words = _Words(self.spans)
+            object.__setattr__(self, "_words", words)
+        return words
+
+    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout | LayoutOverflow:
+        words = self.words()
+        if self.optimal_fit:
+            ends = words.optimal_breaks(self.start, constraints.max_width)
+        else:
+            ends = words.greedy_breaks(self.start, constraints.max_width)
+
+        lines: list[_Line] = []
+        width = height = 0.0
+        start = self.start
+        for end in ends:
+            line = self._line(words, start, end, height + self.spacing if lines else 0)
+            if ctx.can_split and line.y + line.height > constraints.max_height:
+                if not lines:
+                    # Not even the first line fits, the paragraph moves to the next page
+                    return LayoutOverflow(self, Size(line.width, line.height), constraints)
+                size = constraints.extend_size_down(Size(width, height))
+                return NodeLayout(size, (), cached=tuple(lines), leftover=self.resume_from(start))
+            lines.append(line)
+            width = max(width, line.width)
+            height = line.y + line.height
+            start = end
+        return NodeLayout(Size(width, height), (), cached=tuple(lines))
+
+    def _line(self, words: _Words, start: int, end: int, y: float) -> _Line:
+        pieces: list[_Piece] = []
+        for idx in range(start, end):
+            pieces.extend(words.pieces[idx])
+            if idx < end - 1:
+                pieces.append(words.spaces[idx])
+
+        runs: list[tuple[float, int, str]] = []
+        x = 0.0
+        for span_idx, text, length in pieces:
+            if runs and runs[-1][1] == span_idx:
+                runs[-1] = (runs[-1][0], span_idx, runs[-1][2] + text)
+            else:
+                runs.append((x, span_idx, text))
+            x += length
+
+        # Spans of different fonts on a line share the baseline
+        fonts = [words.spans[span_idx].font.advances for _, span_idx, _ in runs]
+        ascent = max(font.ascent for font in fonts)
+        height = max(ascent - font.ascent + font.line_height for font in fonts)
+        return _Line(
+            y,
+            words.width(start, end),
+            height,
+            tuple(
+                (run_x, ascent - font.ascent, span_idx, text)
+                for (run_x, span_idx, text), font in zip(runs, fonts)
+                if text
+            ),
+        )
+
+    def draw_ops(self, x: float, y: float, layout: Layout) -> Iterable[DrawOp]:
+        features = ("liga", "kern") if SimpleText.LIGA_AND_KERN_SUPPORTED else None
+        spans = self.words().spans
+        ops: list[DrawOp] = []
+        for line in layout.layout.cached:
+            for run_x, run_y, span_idx, text in line.runs:
+                span = spans[span_idx]
+                ops.append(
+                    TextRun(
+                        x + run_x,
+                        y + line.y + run_y,
+                        text,
+                        font=span.font,
+                        color=span.color,
+                        spacing=self.spacing,
+                        antialiasing=self.antialiasing,
+                        features=features,
+                    )
+                )
+        return ops
+
+    def split_position(self) -> Any:
+        return (self.start,) if self.start else None
+
+    def resume(self, position: Any) -> Node:
+        if position is None or position == ():
+            return self
+        (start,) = position
+        return self.resume_from(start)
+
+    def resume_from(self, start: int) -> Paragraph:
+        """The same paragraph that starts from the word, words are not measured again."""
+        clone = replace(self, start=start)
+        object.__setattr__(clone, "_words", self.words())
+        return clone
+
+
+paragraph = Paragraph
@@ -0,0 +1,278 @@
+"""Minimal TrueType reader and subsetter for embedding fonts into PDF.
+
+Subsetting keeps glyph ids: outlines of unused glyphs are dropped and the rest of the
+font is kept, so text can be written with glyph ids of the original font.
+"""
+
+from __future__ import annotations
+
+import struct
+from functools import cached_property
+from pathlib import Path
+
+__all__ = [
+    "TrueTypeFont",
+]
+
+# Tables that are kept in subsets, others (e.g. kerning, layout, bitmaps) are not used by PDF
+_SUBSET_TABLES = (
+    b"OS/2",
+    b"cmap",
+    b"cvt ",
+    b"fpgm",
+    b"glyf",
+    b"head",
+    b"hhea",
+    b"hmtx",
+    b"loca",
+    b"maxp",
+    b"name",
+    b"post",
+    b"prep",
+)
+
+# Composite glyph flags
+_ARG_1_AND_2_ARE_WORDS = 0x0001
+_WE_HAVE_A_SCALE = 0x0008
+_MORE_COMPONENTS = 0x0020
+_WE_HAVE_AN_X_AND_Y_SCALE = 0x0040
+_WE_HAVE_A_TWO_BY_TWO = 0x0080
+
+
+class TrueTypeFont:
+    """Font file with TrueType outlines (glyf table), or a member of a collection."""
+
+    def __init__(self, data: bytes, index: int = 0) -> None:
+        self.data = data
+        offset = 0
+        if data[:4] == b"ttcf":
+            (offset,) = struct.unpack_from(">I", data, 12 + 4 * index)
+        self.sfnt_version = data[offset : offset + 4]
+        (num_tables,) = struct.unpack_from(">H", data, offset + 4)
+        self.tables: dict[bytes, tuple[int, int]] = {}
+        for record in range(num_tables):
+            tag, _, table_offset, length = struct.unpack_from(
+                ">4sIII", data, offset + 12 + 16 * record
+            )
+            self.tables[tag] = (table_offset, length)
+
+        head = self.table_offset(b"head")
+        (self.units_per_em,) = struct.unpack_from(">H", data, head + 18)
+        self.bbox: tuple[int, int, int, int] = struct.unpack_from(">4h", data, head + 36)
+        (self.index_to_loc_format,) = struct.unpack_from(">h", data, head + 50)
+
+        hhea = self.table_offset(b"hhea")
+        self.ascent, self.descent = struct.unpack_from(">hh", data, hhea + 4)
+        (self.number_of_h_metrics,) = struct.unpack_from(">H", data, hhea + 34)
+        self.num_glyphs: int = struct.unpack_from(">H", data, self.table_offset(b"maxp") + 4)[0]
+
+        self.italic_angle = 0.0
+        self.fixed_pitch = False
+        if b"post" in self.tables:
+            angle, _, _, fixed_pitch = struct.unpack_from(
+                ">iHHI", data, self.table_offset(b"post") + 4
+            )
+            self.italic_angle = angle / 65536
+            self.fixed_pitch = bool(fixed_pitch)
+
+        self.cap_height = self.ascent
+        if b"OS/2" in self.tables:
+            os2 = self.table_offset(b"OS/2")
+            (version,) = struct.unpack_from(">H", data, os2)
+            if version >= 2:
+                (self.cap_height,) = struct.unpack_from(">h", data, os2 + 88)
+
+    @classmethod
+    def from_file(cls, path: str | Path, index: int = 0) -> TrueTypeFont:
+        return cls(Path(path).read_bytes(), index)
+
+    @property
+    def has_outlines(self) -> bool:
+        """False for CFF based OpenType fonts, which can not be subset here."""
+        return b"glyf" in self.tables and b"loca" in self.tables
+
+    def table_offset(self, tag: bytes) -> int:
+        return self.tables[tag][0]
+
+    def table(self, tag: bytes) -> bytes:
+        offset, length = self.tables[tag]
+        return self.data[offset : offset + length]
+
+    @cached_property
+    def postscript_name(self) -> str:
+        if b"name" not in self.tables:
+            return "Font"
+        name = self.table_offset(b"name")
+        _, count, strings = struct.unpack_from(">HHH", self.data, name)
+        for record in range(count):
+            platform, encoding, _, name_id, length, offset = struct.unpack_from(
+                ">6H", self.data, name + 6 + 12 * record
+            )
+            if name_id != 6:
+                continue
+            raw = self.data[name + strings + offset : name + strings + offset + length]
+            if platform == 3 or platform == 0:
+                return raw.decode("utf-16-be", errors="replace")
+            return raw.decode("latin-1")
+        return "Font"
+
+    @cached_property
+    def cmap(self) -> dict[int, int]:
+        """Unicode code point to glyph id."""
+        cmap = self.table_offset(b"cmap")
+        (count,) = struct.unpack_from(">H", self.data, cmap + 2)
+        subtables = {}
+        for record in range(count):
+            platform, encoding, offset = struct.unpack_from(
+                ">HHI", self.data, cmap + 4 + 8 * record
+            )
+            subtables[(platform, encoding)] = cmap + offset
+        for key in ((3, 10), (0, 6), (0, 4), (3, 1), (0, 3), (0, 2), (0, 1), (0, 0)):
+            if key in subtables:
+                return self._parse_cmap_subtable(subtables[key])
+        return {}
+
+    def _parse_cmap_subtable(self, offset: int) -> dict[int, int]:
+        data = self.data
+        (cmap_format,) = struct.unpack_from(">H", data, offset)
+        mapping: dict[int, int] = {}
+        if cmap_format == 4:
+            (seg_count_x2,) = struct.unpack_from(">H", data, offset + 6)
+            seg_count = seg_count_x2 // 2
+            ends = struct.unpack_from(f">{seg_count}H", data, offset + 14)
+            starts_offset = offset + 16 + seg_count_x2
+            starts = struct.unpack_from(f">{seg_count}H", data, starts_offset)
+            deltas = struct.unpack_from(f">{seg_count}h", data, starts_offset + seg_count_x2)
+            range_offsets_offset = starts_offset + 2 * seg_count_x2
+            range_offsets = struct.unpack_from(f">{seg_count}H", data, range_offsets_offset)
+            for segment in range(seg_count):
+                start, end = starts[segment], ends[segment]
+                for code in range(start, end + 1):
+                    if code == 0xFFFF:
+                        break
+                    if range_offsets[segment] == 0:
+                        glyph = (code + deltas[segment]) & 0xFFFF
+                    else:
+                        address = (
+                            range_offsets_offset
+                            + 2 * segment
+                            + range_offsets[segment]
+                            + 2 * (code - start)
+                        )
+                        (glyph,) = struct.unpack_from(">H", data, address)
+                        if glyph:
+                            glyph = (glyph + deltas[segment]) & 0xFFFF
+                    if glyph:
+                        mapping[code] = glyph
+        elif cmap_format == 12:
+            (groups,) = struct.unpack_from(">I", data, offset + 12)
+            for group in range(groups):
+                start, end, glyph = struct.unpack_from(">III", data, offset + 16 + 12 * group)
+                for code in range(start, end + 1):
+                    mapping[code] = glyph + code - start
+        return mapping
+
+    @cached_property
+    def advances(self) -> tuple[int, ...]:
+        """Advance widths of all glyphs in font units."""
+        hmtx = self.table_offset(b"hmtx")
+        metrics = struct.unpack_from(f">{2 * self.number_of_h_metrics}H", self.data, hmtx)
+        advances = metrics[::2]
+        return tuple(advances) + (advances[-1],) * (self.num_glyphs - len(advances))
+
+    def glyph_ids(self, text: str) -> list[int]:
+        cmap = self.cmap
+        return [cmap.get(ord(char), 0) for char in text]
+
+    @cached_property
+    def _loca(self) -> tuple[int, ...]:
+        loca = self.table_offset(b"loca")
+        if self.index_to_loc_format == 0:
+            return tuple(
+                2 * o for o in struct.unpack_from(f">{self.num_glyphs + 1}H", self.data, loca)
+            )
+        return tuple(struct.unpack_from(f">{self.num_glyphs + 1}I", self.data, loca))
+
+    def _glyph_data(self, glyph: int) -> bytes:
+        start, end = self._loca[glyph], self._loca[glyph + 1]
+        glyf = self.table_offset(b"glyf")
+        return self.data[glyf + start : glyf + end]
+
+    def _components(self, glyph_data: bytes) -> list[int]:
+        if len(glyph_data) < 10 or struct.unpack_from(">h", glyph_data)[0] >= 0:
+            return []
+        components = []
+        offset = 10
+        while True:
+            flags, component = struct.unpack_from(">HH", glyph_data, offset)
+            components.append(component)
+            offset += 4
+            offset += 4 if flags & _ARG_1_AND_2_ARE_WORDS else 2
+            if flags & _WE_HAVE_A_SCALE:
+                offset += 2
+            elif flags & _WE_HAVE_AN_X_AND_Y_SCALE:
+                offset += 4
+            elif flags & _WE_HAVE_A_TWO_BY_TWO:
+                offset += 8
+            if not flags & _MORE_COMPONENTS:
+                return components
+
+    def subset(self, glyphs: set[int]) -> bytes:
+        """Font file with outlines of the glyphs (and their components) only."""
+        keep = {0}
+        pending = [g for g in glyphs if 0 <= g < self.num_glyphs]
+        while pending:
+            glyph = pending.pop()
+            if glyph in keep and glyph != 0:
+                continue
+            keep.add(glyph)
+            pending.extend(c for c in self._components(self._glyph_data(glyph)) if c not in keep)
+
+        glyf = bytearray()
+        loca = []
+        for glyph in range(self.num_glyphs):
+            loca.append(len(glyf))
+            if glyph in keep:
+                glyf += self._glyph_data(glyph)
+                glyf += b"\0" * (-len(glyf) % 4)
+        loca.append(len(glyf))
+
+        tables = {tag: self.table(tag) for tag in _SUBSET_TABLES if tag in self.tables}
+        tables[b"glyf"] = bytes(glyf)
+        tables[b"loca"] = struct.pack(f">{len(loca)}I", *loca)
+        head = bytearray(tables[b"head"])
+        struct.pack_into(">I", head, 8, 0)  # checksumAdjustment is set below
+        struct.pack_into(">h", head, 50, 1)  # Long loca offsets
+        tables[b"head"] = bytes(head)
+        font = _build_sfnt(tables)
+
+        head_offset = font.index(tables[b"head"])
+        adjustment = (0xB1B0AFBA - _checksum(font)) & 0xFFFFFFFF
+        return font[: head_offset + 8] + struct.pack(">I", adjustment) + font[head_offset + 12 :]
+
+
+def _checksum(data: bytes) -> int:
+    data += b"\0" * (-len(data) % 4)
+    return int(sum(struct.unpack(f">{len(data) // 4}I", data))) & 0xFFFFFFFF
+
+
+def _build_sfnt(tables: dict[bytes, bytes]) -> bytes:
+    num_tables = len(tables)
+    entry_selector = num_tables.bit_length() - 1
+    search_range = 16 * (1 << entry_selector)
+    header = struct.pack(
+        ">IHHHH",
+        0x00010000,
+        num_tables,
+        search_range,
+        entry_selector,
+        num_tables * 16 - search_range,
+    )
+    records = []
+    body = bytearray()
+    offset = 12 + 16 * num_tables
+    for tag in sorted(tables):
+        data = tables[tag]
+        records.append(struct.pack(">4sIII", tag, _checksum(data), offset + len(body), len(data)))
+        body += data + b"\0" * (-len(data) % 4)
+    return header + b"".join(records) + bytes(body)
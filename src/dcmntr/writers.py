@@ -0,0 +1,176 @@
+"""Multi-page output files written page by page.
+
+Pages are flushed to the file as soon as they are written, so memory does not depend
+on the number of pages. Writers take file-like objects and do not close them.
+"""
+
+from __future__ import annotations
+
+import abc
+import io
+import zlib
+from types import TracebackType
+from typing import BinaryIO, Iterable
+
+from PIL import Image, TiffImagePlugin
+
+__all__ = [
+    "PageWriter",
+    "TiffWriter",
+    "RasterPdfWriter",
+    "PdfFile",
+    "write_pages",
+]
+
+
+class PageWriter(abc.ABC):
+    @abc.abstractmethod
+    def write(self, page: Image.Image) -> None:
+        """Writes the page after the previous ones."""
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> PageWriter:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+def write_pages(pages: Iterable[Image.Image], writer: PageWriter) -> int:
+    """Writes all the pages (e.g. from render_multipage_document) and closes the writer."""
+    count = 0
+    with writer:
+        for page in pages:
+            writer.write(page)
+            count += 1
+    return count
+
+
+class TiffWriter(PageWriter):
+    """Multi-page TIFF. File must be seekable, offsets of the previous page are patched."""
+
+    def __init__(self, fp: BinaryIO, compression: str = "tiff_deflate") -> None:
+        self.compression = compression
+        self._tiff = TiffImagePlugin.AppendingTiffWriter(fp, new=True)
+
+    def write(self, page: Image.Image) -> None:
+        page.save(self._tiff, format="TIFF", compression=self.compression)
+        self._tiff.newFrame()
+
+    def close(self) -> None:
+        self._tiff.close()
+        # AppendingTiffWriter is a BytesIO that is not marked as closed by its close(),
+        # so it would finalize the file again when garbage collected
+        io.BytesIO.close(self._tiff)
+
+
+class PdfFile:
+    """Low level PDF writer: objects are written as they come, xref is written on close.
+
+    Only offsets of objects are kept in memory. The file does not need to be seekable.
+    """
+
+    def __init__(self, fp: BinaryIO) -> None:
+        self.fp = fp
+        self.position = 0
+        self.offsets: dict[int, int] = {}
+        self.last_object = 0
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def reserve(self) -> int:
+        """Number for an object that is written later, e.g. to reference it earlier."""
+        self.last_object += 1
+        return self.last_object
+
+    def add(self, body: bytes, stream: bytes | None = None, number: int | None = None) -> int:
+        """Writes an object (dictionary body for streams) and returns its number."""
+        if number is None:
+            number = self.reserve()
+        self.offsets[number] = self.position
+        self._write(b"%d 0 obj\n" % number)
+        if stream is None:
+            self._write(body)
+        else:
+            self._write(body[:-2] + b" /Length %d >>\nstream\n" % len(stream))
+            self._write(stream)
+            self._write(b"\nendstream")
+        self._write(b"\nendobj\n")
+        return number
+
+    def close(self, root: int) -> None:
+        xref = self.position
+        size = self.last_object + 1
+        lines = [b"xref\n0 %d\n" % size, b"0000000000 65535 f \n"]
+        for number in range(1, size):
+            lines.append(b"%010d 00000 n \n" % self.offsets[number])
+        lines.append(b"trailer\n<< /Size %d /Root %d 0 R >>\n" % (size, root))
+        lines.append(b"startxref\n%d\n%%%%EOF\n" % xref)
+        self._write(b"".join(lines))
+        self.fp.flush()
+
+    def _write(self, data: bytes) -> None:
+        self.fp.write(data)
+        self.position += len(data)
+
+
+class RasterPdfWriter(PageWriter):
+    """PDF with one image per page.
+
+    Page size in points is the image size scaled by dpi. Pages are compressed losslessly,
+    or as JPEG with jpeg_quality.
+    """
+
+    def __init__(self, fp: BinaryIO, dpi: float = 72, jpeg_quality: int | None = None) -> None:
+        self.dpi = dpi
+        self.jpeg_quality = jpeg_quality
+        self.pdf = PdfFile(fp)
+        # Page tree is written on close, when all the pages are known
+        self.pages = self.pdf.reserve()
+        self.catalog = self.pdf.add(b"<< /Type /Catalog /Pages %d 0 R >>" % self.pages)
+        self.kids: list[int] = []
+
+    def write(self, page: Image.Image) -> None:
+        rgb = page.convert("RGB")
+        if self.jpeg_quality is None:
+            data = zlib.compress(rgb.tobytes())
+            image_filter = b"/FlateDecode"
+        else:
+            output = io.BytesIO()
+            rgb.save(output, format="JPEG", quality=self.jpeg_quality)
+            data = output.getvalue()
+            image_filter = b"/DCTDecode"
+
+        width, height = rgb.size
+        image = self.pdf.add(
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB"
+            b" /BitsPerComponent 8 /Filter %s >>" % (width, height, image_filter),
+            stream=data,
+        )
+        points_width = width * 72 / self.dpi
+        points_height = height * 72 / self.dpi
+        contents = self.pdf.add(
+            b"<< >>",
+            stream=b"q %.4f 0 0 %.4f 0 0 cm /Im0 Do Q" % (points_width, points_height),
+        )
+        self.kids.append(
+            self.pdf.add(
+                b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %.4f %.4f]"
+                b" /Resources << /XObject << /Im0 %d 0 R >> >> /Contents %d 0 R >>"
+                % (self.pages, points_width, points_height, image, contents)
+            )
+        )
+
+    def close(self) -> None:
+        kids = b" ".join(b"%d 0 R" % kid for kid in self.kids)
+        self.pdf.add(
+            b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self.kids)),
+            number=self.pages,
+        )
+        self.pdf.close(self.catalog)
@@ -0,0 +1,26 @@
+import pickle
+
+import pytest
+
+from dcmntr.core import *
+from dcmntr.basic_layout import *
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        Size(1, 2),
+        Constraints(0, 1, 0, 2),
+        NodeLayout(Size(1, 2), ()),
+        v_stack(box(1, 2)),
+        outline(fill="red")(padding(1)(center(box(1, 1)))),
+        h_divide([1, INFINITY])(box(), box()),
+    ],
+)
+def test_no_instance_dict(value: object) -> None:
+    assert not hasattr(value, "__dict__")
+    assert pickle.loads(pickle.dumps(value)) == value
+
+
+def test_zero_size_interned() -> None:
+    assert Size(10, 10).to_constraints_max().min_size() is ZERO_SIZE
@@ -0,0 +1,36 @@
+import pickle
+
+from dcmntr.lru import LRUCache
+from dcmntr.text import *
+
+
+def test_sizes_share_font_file_bytes() -> None:
+    fonts = Fonts()
+    small, big = fonts.load("arial", 10), fonts.load("arial", 30)
+    assert small.pil_font.font_bytes is big.pil_font.font_bytes
+    assert small.pil_font.size == 10 and big.pil_font.size == 30
+    assert big.pil_font.getbbox("Hello")[2] > small.pil_font.getbbox("Hello")[2]
+
+    mono = fonts.load("mono", 10)
+    assert mono.path != small.path
+    assert mono.pil_font.font_bytes is not small.pil_font.font_bytes
+
+    # Fonts are pickled by path and loaded from the shared bytes again
+    unpickled = pickle.loads(pickle.dumps(big))
+    assert unpickled.pil_font.font_bytes is big.pil_font.font_bytes
+
+
+def test_font_cache_is_bounded() -> None:
+    fonts = Fonts(cache=LRUCache(maxsize=2))
+    first = fonts.load("arial", 10)
+    for size in (11, 12, 13):
+        fonts.load("arial", size)
+    assert len(fonts.cache) == 2
+    assert fonts.cache.evictions == 2
+    assert fonts.cache.misses == 4
+
+    reloaded = fonts.load("arial", 10)
+    assert reloaded is not first
+    assert reloaded.pil_font.getbbox("Hello") == first.pil_font.getbbox("Hello")
+    assert fonts.load("arial", 10) is reloaded
+    assert fonts.cache.hits == 1
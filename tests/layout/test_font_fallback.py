@@ -0,0 +1,107 @@
+import pytest
+
+from dcmntr.core import *
+from dcmntr.coverage import Coverage, split_by_coverage
+from dcmntr.display_list import TextRun
+from dcmntr.text import *
+from dcmntr.text import Paragraph
+from dcmntr.truetype import TrueTypeFont
+
+# Own faces, so the coverages below do not leak into other tests
+fonts = Fonts(fallbacks=("mono",), faces=FontFaces())
+text_font = fonts.load("arial", 14)
+mono_font = fonts.load("mono", 14)
+
+
+@pytest.fixture
+def fallback_fonts() -> None:
+    """Fonts with known coverage: ASCII and Latin-1 in the text font, Latin Extended-A in mono."""
+    if text_font.path == mono_font.path:
+        pytest.skip("arial and mono resolve to the same font file")
+    assert text_font.path is not None and mono_font.path is not None
+    fonts.faces.coverages[text_font.path] = Coverage(range(32, 0x100))
+    fonts.faces.coverages[mono_font.path] = Coverage(range(32, 0x180))
+
+
+def test_coverage_ranges() -> None:
+    coverage = Coverage([65, 66, 67, 70, 0x10C, 0x10D])
+    assert coverage.starts == [65, 70, 0x10C] and coverage.ends == [68, 71, 0x10E]
+    assert [c in coverage for c in (64, 65, 67, 68, 70, 0x10D, 0x10E)] == [
+        *(False, True, True, False, True, True, False)
+    ]
+    assert coverage.covers("ABC ́") and not coverage.covers("ABD")
+
+    assert text_font.path is not None
+    cmap = TrueTypeFont.from_file(text_font.path).cmap
+    plain_fonts = Fonts(faces=FontFaces())
+    font = plain_fonts.load("arial", 14)
+    assert len(font.coverage()) == len(cmap)
+    # Built once per font file
+    assert font.coverage() is plain_fonts.load("arial", 20).coverage()
+
+
+def test_split_by_coverage() -> None:
+    latin, extended = Coverage(range(32, 127)), Coverage(range(32, 0x250))
+    assert split_by_coverage("Černá Ğ test", [latin, extended]) == [
+        (1, "Č"),
+        (0, "ern"),
+        # Spaces stay with the preceding font
+        (1, "á Ğ "),
+        (0, "test"),
+    ]
+    # Missing everywhere, drawn with the first font
+    assert split_by_coverage("a一", [latin, extended]) == [(0, "a一")]
+
+
+def test_text_is_drawn_with_fallback_fonts(fallback_fonts: None) -> None:
+    assert text_font.runs("Černá") == ((mono_font, "Č"), (text_font, "erná"))
+    assert fonts.runs_cache.misses == 1
+    text_font.runs("Černá")
+    assert fonts.runs_cache.hits == 1
+
+    doc = simple_text("Černá\nčára", text_font)
+    layout = LayoutCtx().container_ctx().layout_node(doc, Size(300, 100).to_constraints_max())
+    ops = [op for op in doc.draw_ops(10, 20, layout) if isinstance(op, TextRun)]
+    assert [(op.font, op.text) for op in ops] == [
+        (mono_font, "Č"),
+        (text_font, "erná"),
+        (mono_font, "č"),
+        (text_font, "ára"),
+    ]
+    assert ops[1].x == 10 + mono_font.pil_font.getlength("Č")
+    # Fallback fonts share the baseline
+    ascent = text_font.pil_font.getmetrics()[0]
+    assert ops[0].y + mono_font.pil_font.getmetrics()[0] == ops[1].y + ascent == 20 + ascent
+    assert ops[2].y == ops[0].y + text_font.line_spacing() + 2
+
+    width, _ = fonts.measure_cache.measure(text_font, "Černá", 2)
+    bbox = text_font.pil_font.getbbox("erná")
+    assert width == mono_font.pil_font.getlength("Č") + bbox[2] - bbox[0]
+
+
+def test_covered_text_is_a_single_run(fallback_fonts: None) -> None:
+    doc = simple_text("Plain text", text_font)
+    layout = LayoutCtx().container_ctx().layout_node(doc, Size(300, 100).to_constraints_max())
+    (op,) = doc.draw_ops(0, 0, layout)
+    assert isinstance(op, TextRun) and op.font is text_font and op.text == "Plain text"
+
+    # Without fallbacks texts are not split at all
+    plain_fonts = Fonts()
+    font = plain_fonts.load("arial", 14)
+    assert font.runs("Černá") == ((font, "Černá"),)
+    assert len(plain_fonts.runs_cache) == 0
+
+
+def test_paragraph_spans_are_split_by_fonts(fallback_fonts: None) -> None:
+    doc = paragraph((span("Město Černá Hora", text_font),))
+    assert isinstance(doc, Paragraph)
+    assert [(s.font, s.text) for s in doc.words().spans] == [
+        (text_font, "M"),
+        (mono_font, "ě"),
+        (text_font, "sto "),
+        (mono_font, "Č"),
+        (text_font, "erná Hora"),
+    ]
+    layout = LayoutCtx().container_ctx().layout_node(doc, Size(300, 100).to_constraints_max())
+    texts = [op.text for op in doc.draw_ops(0, 0, layout) if isinstance(op, TextRun)]
+    assert "".join(texts) == "Město Černá Hora"
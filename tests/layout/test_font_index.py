@@ -0,0 +1,46 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from dcmntr.font_index import FontIndex
+from dcmntr.text import Fonts
+
+
+@dataclass
+class CountingIndex(FontIndex):
+    fontconfig_version: int = 1
+    matched: list[str] = field(default_factory=list)
+
+    def match(self, pattern: str) -> str:
+        self.matched.append(pattern)
+        return super().match(pattern)
+
+    def fontconfig_state(self) -> list[Any]:
+        return [self.fontconfig_version]
+
+
+def test_font_is_resolved_once_for_all_sizes() -> None:
+    index = CountingIndex()
+    fonts = Fonts(index=index)
+    for size in (10, 12, 14):
+        fonts.load("arial", size)
+        fonts.load("arial", size, bold=True)
+    assert index.matched == ["arial", "arial:Bold"]
+    assert fonts.load("arial", 20).path == fonts.load("arial", 10).path
+
+
+def test_font_index_cache_file(tmp_path: Path) -> None:
+    cache_file = tmp_path / "fonts.json"
+    index = CountingIndex(cache_file=cache_file)
+    path = index.resolve("arial", italic=True)
+    assert cache_file.exists()
+
+    # New process reads the file instead of running fc-match
+    cached_index = CountingIndex(cache_file=cache_file)
+    assert cached_index.resolve("arial", italic=True) == path
+    assert cached_index.matched == []
+
+    # File is ignored when fontconfig changes
+    changed_index = CountingIndex(cache_file=cache_file, fontconfig_version=2)
+    assert changed_index.resolve("arial", italic=True) == path
+    assert changed_index.matched == ["arial:Italic"]
@@ -0,0 +1,37 @@
+import random
+
+from dcmntr.text import *
+
+text_font = Fonts().load("arial", 14)
+
+
+def test_widths_match_pil() -> None:
+    rng = random.Random(1)
+    alphabet = [chr(c) for c in range(32, 127)] + list("éüß—’…“”–€™Привет")
+    texts = ["To", "AVATAR", "", " "]
+    texts += ["".join(rng.choices(alphabet, k=rng.randint(1, 20))) for _ in range(300)]
+
+    expected = [bbox[2] - bbox[0] for bbox in map(text_font.pil_font.getbbox, texts)]
+    assert text_font.advances.widths(texts) == expected
+    # Second time everything is measured from the tables
+    assert text_font.advances.widths(texts) == expected
+
+
+def test_complex_text_is_shaped() -> None:
+    for text in ("שלום", "مرحبا", "नमस्ते", "e\u0301", "Привет мир"):
+        bbox = text_font.pil_font.getbbox(text)
+        assert text_font.advances.width(text) == bbox[2] - bbox[0]
+    for text in ("שלום", "مرحبا", "नमस्ते", "e\u0301"):
+        assert text_font.advances.offsets(text) is None
+
+
+def test_prose_punctuation_is_measured_from_tables() -> None:
+    for text in ("it’s", "“quoted”", "a – b — c…", "€5", "Brand™"):
+        assert text_font.advances.offsets(text) is not None
+        assert text_font.advances.length(text) == text_font.pil_font.getlength(text)
+
+
+def test_text_size_matches_multiline_text_size() -> None:
+    for text in ("Label", "two\nlines", "trailing\n", "a\tb"):
+        expected = SimpleText.multiline_text_size(text, text_font.pil_font, 3)
+        assert text_font.text_size(text, 3) == expected
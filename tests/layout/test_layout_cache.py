@@ -0,0 +1,52 @@
+import itertools
+
+from dcmntr.core import *
+from dcmntr.basic_layout import *
+from dcmntr.paging import render_multipage
+
+
+def widget() -> Node:
+    return padding(2, 2, 2, 2)(outline(border_color="blue")(box(40, 20)(center(box(10, 10)))))
+
+
+def layout_positions(layout: Layout) -> list[tuple[str, float, float, Size]]:
+    return [(type(l.get_node()).__name__, x, y, l.layout.size) for x, y, l in walk_layout(layout)]
+
+
+def test_layout_cache_reuses_same_subtree() -> None:
+    item = widget()
+    row = box(150, 30)(h_divide([50, 50, 50])(item, item, item))
+    doc = v_stack(*itertools.repeat(row, 10))
+    constraints = Size(300, 1000).to_constraints_max()
+
+    expected = LayoutCtx().page_ctx().layout_node(doc, constraints)
+
+    cache = LayoutCache(maxsize=64)
+    layout = LayoutCtx(layout_cache=cache).page_ctx().layout_node(doc, constraints)
+
+    assert layout_positions(layout) == layout_positions(expected)
+    # Content of every row box is laid out only once, same for the cells of the first row
+    assert cache.hits >= 9 + 2
+    assert cache.misses <= 1 + 10 + 1 + 6
+
+
+def test_layout_cache_is_bounded() -> None:
+    cache = LayoutCache(maxsize=2)
+    doc = v_stack(*(box(10, i + 1) for i in range(10)))
+    LayoutCtx(layout_cache=cache).page_ctx().layout_node(doc, Size(100, 100).to_constraints_max())
+    assert len(cache) == 2
+    assert cache.evictions > 0
+
+
+def test_layout_cache_paging() -> None:
+    doc = v_stack(*itertools.repeat(widget(), 40))
+    page_size = Size(100, 200)
+
+    cache = LayoutCache()
+    expected = list(render_multipage(page_size, doc))
+    pages = list(render_multipage(page_size, doc, layout_cache=cache))
+
+    assert len(pages) == len(expected)
+    for page, expected_page in zip(pages, expected):
+        assert page.tobytes() == expected_page.tobytes()
+    assert cache.hits > 0
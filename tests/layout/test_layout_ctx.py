@@ -0,0 +1,25 @@
+from dataclasses import dataclass
+
+from dcmntr.core import *
+from dcmntr.basic_layout import *
+from dcmntr.core import NodeLayoutCtx
+
+
+@dataclass(frozen=True)
+class PathProbe(LeafNode):
+    paths: list[str]
+
+    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout:
+        self.paths.append(ctx.get_current_path_readable())
+        return NodeLayout(constraints.min_size(), ())
+
+
+def test_parent_chain_only_in_debug() -> None:
+    paths: list[str] = []
+    doc = padding(1)(v_stack(PathProbe(paths)))
+    constraints = Size(10, 10).to_constraints_max()
+
+    LayoutCtx().page_ctx().layout_node(doc, constraints)
+    LayoutCtx(debug=True, page_index=3).page_ctx().layout_node(doc, constraints)
+
+    assert paths == ["PathProbe", "Page #3 > Padding > Stack > PathProbe"]
@@ -0,0 +1,65 @@
+from dataclasses import dataclass
+
+import pytest
+
+from dcmntr.core import *
+from dcmntr.basic_layout import *
+from dcmntr.core import NodeLayoutCtx
+
+
+@dataclass(frozen=True)
+class RaisingBox(LeafNode):
+    """Custom node that still reports overflow with an exception."""
+
+    height: float
+
+    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout:
+        size = Size(1, self.height)
+        if size.height > constraints.max_height:
+            raise LayoutAxisOverflowException(node=self, size=size, constraints=constraints)
+        return NodeLayout(size, ())
+
+
+def test_try_layout_node_returns_overflow() -> None:
+    ctx = LayoutCtx().container_ctx()
+    constraints = Size(10, 10).to_constraints_max()
+
+    down = ctx.try_layout_node(padding(top=1)(box(5, 20)), constraints)
+    assert isinstance(down, LayoutOverflow) and not down.cross_axis
+    assert down.size == Size(5, 20)
+
+    right = ctx.try_layout_node(v_stack(box(20, 5)), constraints)
+    assert isinstance(right, LayoutOverflow) and right.cross_axis
+
+    assert isinstance(ctx.try_layout_node(box(5, 5), constraints), Layout)
+
+
+def test_divide_returns_overflow_of_cell() -> None:
+    ctx = NodeLayoutCtx(LayoutCtx(), can_split=False)
+    divide = h_divide([5, INFINITY])(box(5, 5), box(5, 20))
+    overflow = divide.layout(ctx, Size(10, 10).to_constraints_max())
+    assert isinstance(overflow, LayoutOverflow) and not overflow.cross_axis
+    assert overflow.size == Size(5, 20)
+
+
+def test_layout_node_raises_overflow() -> None:
+    ctx = LayoutCtx().container_ctx()
+    constraints = Size(10, 10).to_constraints_max()
+
+    with pytest.raises(LayoutAxisOverflowException):
+        ctx.layout_node(center(box(5, 20)), constraints)
+    with pytest.raises(LayoutCrossAxisOverflowException):
+        ctx.layout_node(flow(box(5, 5), box(20, 5)), constraints)
+
+
+def test_stack_splits_on_raised_overflow() -> None:
+    doc = v_stack(RaisingBox(6), RaisingBox(6))
+    layout = LayoutCtx().page_ctx().layout_node(doc, Size(10, 10).to_constraints_max())
+    assert len(layout.layout.children) == 1
+    assert layout.layout.leftover is not None
+
+
+def test_flow_wraps() -> None:
+    doc = flow(*(box(4, 3) for _ in range(5)))
+    layout = LayoutCtx().container_ctx().layout_node(doc, Size(10, 10).to_constraints_max())
+    assert layout.layout.size == Size(8, 9)
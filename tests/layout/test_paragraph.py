@@ -0,0 +1,129 @@
+import random
+
+import pytest
+
+from dcmntr.core import *
+from dcmntr.basic_layout import *
+from dcmntr.display_list import TextRun
+from dcmntr.text import *
+from dcmntr.text import Paragraph
+
+fonts = Fonts()
+text_font = fonts.load("arial", 14)
+bold_font = text_font.same_but(bold=True)
+big_font = text_font.same_but(size=24)
+
+rng = random.Random(1)
+WORDS = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor".split()
+TEXT = " ".join(rng.choices(WORDS, k=300))
+
+
+def lines_of(layout: Layout) -> list[str]:
+    return ["".join(text for _, _, _, text in line.runs) for line in layout.layout.cached]
+
+
+def test_greedy_lines_fit() -> None:
+    doc = paragraph((span(TEXT, text_font),))
+    layout = LayoutCtx().container_ctx().layout_node(doc, Size(200, INFINITY).to_constraints_max())
+
+    lines = lines_of(layout)
+    assert " ".join(lines) == TEXT
+    for line, next_line in zip(lines, lines[1:]):
+        assert text_font.pil_font.getlength(line) <= 200
+        # Next word would not fit
+        assert text_font.pil_font.getlength(line + " " + next_line.split()[0]) > 200
+    assert layout.layout.size.height == len(lines) * 17 + (len(lines) - 1) * 2
+
+
+def test_optimal_fit_is_more_even() -> None:
+    def raggedness(optimal_fit: bool) -> float:
+        doc = paragraph((span(TEXT, text_font),), optimal_fit=optimal_fit)
+        constraints = Size(200, INFINITY).to_constraints_max()
+        lines = lines_of(LayoutCtx().container_ctx().layout_node(doc, constraints))
+        assert " ".join(lines) == TEXT
+        widths = [text_font.pil_font.getlength(line) for line in lines]
+        assert max(widths) <= 200
+        return sum((200 - width) ** 2 for width in widths[:-1])
+
+    assert raggedness(optimal_fit=True) < raggedness(optimal_fit=False)
+
+
+def test_spans_and_line_breaks() -> None:
+    doc = paragraph(
+        (
+            span("Total: ", text_font),
+            span("42", bold_font, color="red"),
+            span(", see\nbelow", text_font),
+            span(" Big", big_font),
+        )
+    )
+    layout = LayoutCtx().container_ctx().layout_node(doc, Size(500, 500).to_constraints_max())
+
+    assert lines_of(layout) == ["Total: 42, see", "below Big"]
+    first, second = layout.layout.cached
+    # Runs of a span are drawn as a single text
+    assert [text for _, _, _, text in first.runs] == ["Total: ", "42", ", see"]
+    # Smaller text is moved down to the baseline of the bigger one
+    assert second.runs[0][1] > second.runs[1][1] == 0
+    assert second.height > first.height
+
+    ops = [op for op in doc.draw_ops(10, 20, layout) if isinstance(op, TextRun)]
+    assert [op.text for op in ops] == ["Total: ", "42", ", see", "below", " Big"]
+    assert ops[1].color == "red" and ops[1].font is bold_font
+
+
+def test_paragraph_splits_by_lines() -> None:
+    doc = paragraph((span(TEXT, text_font),))
+    whole = lines_of(
+        LayoutCtx().container_ctx().layout_node(doc, Size(200, INFINITY).to_constraints_max())
+    )
+
+    pages = []
+    node: Node | None = doc
+    while node is not None:
+        layout = LayoutCtx().page_ctx().layout_node(node, Size(200, 100).to_constraints_max())
+        pages.append(lines_of(layout))
+        node = layout.layout.leftover
+        if node is not None:
+            assert layout.layout.size.height == 100
+            assert isinstance(node, Paragraph)
+            # Words are measured once for all the leftovers
+            assert node.words() is doc.words()
+            assert doc.resume(node.split_position()) == node
+
+    assert [line for page in pages for line in page] == whole
+    assert all(len(page) == 5 for page in pages[:-1])
+
+
+def test_first_line_that_does_not_fit_moves_to_next_page() -> None:
+    doc = v_stack(box(100, 95), paragraph((span(TEXT, text_font),)))
+    layout = LayoutCtx().page_ctx().layout_node(doc, Size(100, 100).to_constraints_max())
+
+    assert not any(isinstance(l.node, Paragraph) for _, _, l in walk_layout(layout))
+    leftover = layout.layout.leftover
+    assert leftover is not None
+    next_page = LayoutCtx().page_ctx().layout_node(leftover, Size(100, 100).to_constraints_max())
+    ((y, first),) = [(y, l) for _, y, l in walk_layout(next_page) if isinstance(l.node, Paragraph)]
+    assert y == 0 and lines_of(first)[0] == TEXT[: len(lines_of(first)[0])]
+
+
+@pytest.mark.parametrize("optimal_fit", [False, True])
+def test_whitespace_before_line_break_is_dropped(optimal_fit: bool) -> None:
+    def layout_of(text: str, width: float) -> Layout:
+        doc = paragraph((span(text, text_font),), optimal_fit=optimal_fit)
+        return LayoutCtx().container_ctx().layout_node(doc, Size(width, 500).to_constraints_max())
+
+    plain = layout_of("abc\ndef", 500)
+    spaced = layout_of("abc      \ndef", 500)
+    assert lines_of(spaced) == lines_of(plain) == ["abc", "def"]
+    assert [line.width for line in spaced.layout.cached] == [
+        line.width for line in plain.layout.cached
+    ]
+
+    # Does not make an empty line when the line is as wide as the column
+    width = plain.layout.cached[0].width + 1
+    narrow = layout_of("abc \ndef", width)
+    assert lines_of(narrow) == ["abc", "def"]
+    assert narrow.layout.size.height == layout_of("abc\ndef", width).layout.size.height
+    # Empty lines are kept
+    assert lines_of(layout_of("abc \n\ndef", width)) == ["abc", "", "def"]
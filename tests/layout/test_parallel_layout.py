@@ -0,0 +1,65 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from dcmntr.core import *
+from dcmntr.basic_layout import *
+from dcmntr.lru import LRUCache
+from dcmntr.text import *
+
+text_font = Fonts().load("arial", 12)
+
+
+def dashboard() -> Node:
+    return v_divide([INFINITY] * 6)(
+        *(
+            h_divide([INFINITY] * 8)(
+                *(
+                    layers(
+                        outline()(box()),
+                        padding(2, 2, 2, 2)(
+                            v_stack(
+                                *(simple_text(f"{row}.{col}.{i}", font=text_font) for i in range(3))
+                            )
+                        ),
+                    )
+                    for col in range(8)
+                )
+            )
+            for row in range(6)
+        )
+    )
+
+
+def test_parallel_layout_matches_sequential() -> None:
+    constraints = Size(800, 600).to_constraints_max()
+    doc = dashboard()
+    expected = LayoutCtx().container_ctx().layout_node(doc, constraints)
+
+    with ThreadPoolExecutor(4) as executor:
+        layout = LayoutCtx(executor=executor).container_ctx().layout_node(doc, constraints)
+    assert layout == expected
+
+
+def test_nested_parallel_nodes_do_not_wait_for_busy_pool() -> None:
+    # A single worker lays out a cell with nested divisions, which must not submit to it again
+    with ThreadPoolExecutor(1) as executor:
+        ctx = LayoutCtx(executor=executor)
+        layout = ctx.container_ctx().layout_node(dashboard(), Size(800, 600).to_constraints_max())
+    assert layout.layout.size == Size(800, 600)
+
+
+def test_lru_cache_from_threads() -> None:
+    cache: LRUCache[int, int] = LRUCache(maxsize=50)
+
+    def work(offset: int) -> None:
+        for key in range(1000):
+            cache.put(key % 70, key + offset)
+            cache.get((key * 7) % 70)
+
+    threads = [threading.Thread(target=work, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(cache) == 50
+    assert cache.hits + cache.misses == 8000
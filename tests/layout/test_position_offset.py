@@ -0,0 +1,59 @@
+from dataclasses import dataclass
+
+import pytest
+
+from dcmntr.core import *
+from dcmntr.basic_layout import *
+from dcmntr.core import NodeLayoutCtx
+from dcmntr.basic_layout import Box
+
+
+@dataclass(frozen=True)
+class CountingBox(LeafNode):
+    width: float
+    height: float
+    calls: list[int]
+
+    def layout(self, ctx: NodeLayoutCtx, constraints: Constraints) -> NodeLayout:
+        self.calls.append(1)
+        return NodeLayout(Size(self.width, self.height), ())
+
+
+def nested_alignment(depth: int, leaf: Node) -> Node:
+    wrappers = [center, right, bottom, h_center, v_center]
+    node = leaf
+    for i in range(depth):
+        node = wrappers[i % len(wrappers)](node)
+    return node
+
+
+@pytest.mark.parametrize("depth", [1, 5, 10, 20])
+def test_nested_alignment_lays_out_child_once(depth: int) -> None:
+    calls: list[int] = []
+    doc = nested_alignment(depth, CountingBox(10, 20, calls))
+    LayoutCtx().container_ctx().layout_node(doc, Size(100, 100).to_constraints_max())
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize(
+    "wrapper, expected_x, expected_y",
+    [
+        (right, 90, 0),
+        (h_center, 45, 0),
+        (center, 45, 40),
+        (bottom, 0, 80),
+        (v_center, 0, 40),
+    ],
+)
+def test_alignment_position(wrapper: Node, expected_x: float, expected_y: float) -> None:
+    doc = padding(left=3, top=5)(box(100, 100)(wrapper(box(10, 20))))
+    layout = LayoutCtx().container_ctx().layout_node(doc, Size(200, 200).to_constraints_max())
+    positions = [(type(l.node), x, y) for x, y, l in walk_layout(layout)]
+    assert positions[-1] == (Box, 3 + expected_x, 5 + expected_y)
+
+
+def test_measure_matches_layout() -> None:
+    doc = center(padding(1, 2, 3, 4)(right(box(10, 20))))
+    constraints = Size(100, 100).to_constraints_max()
+    ctx = LayoutCtx().container_ctx()
+    assert ctx.measure_node(doc, constraints) == ctx.layout_node(doc, constraints).layout.size
@@ -0,0 +1,45 @@
+import itertools
+
+from dcmntr.core import *
+from dcmntr.basic_layout import *
+from dcmntr.basic_layout import Box, Stack
+
+
+def paginate(doc: Node | None, page_size: Size) -> list[Layout]:
+    pages = []
+    while doc is not None:
+        layout = LayoutCtx().page_ctx().layout_node(doc, page_size.to_constraints_max())
+        pages.append(layout)
+        doc = layout.layout.leftover
+    return pages
+
+
+def boxes_on_page(layout: Layout) -> list[float]:
+    return [l.layout.size.height for _, _, l in walk_layout(layout) if isinstance(l.node, Box)]
+
+
+def test_stack_leftover_is_view_into_children() -> None:
+    doc = v_stack(*itertools.repeat(box(10, 10), 100))
+    layout = LayoutCtx().page_ctx().layout_node(doc, Size(10, 95).to_constraints_max())
+
+    leftover = layout.layout.leftover
+    assert isinstance(leftover, Stack)
+    assert leftover.children is doc.children
+    assert leftover.start == 9
+    assert leftover.head is None
+
+
+def test_stack_pagination_nested() -> None:
+    doc = v_stack(
+        box(10, 30),
+        v_stack(*(box(10, h) for h in range(1, 21))),
+        padding(top=5)(outline()(v_stack(*itertools.repeat(box(10, 20), 10)))),
+        box(10, 40),
+    )
+    pages = paginate(doc, Size(10, 100))
+
+    heights = [h for page in pages for h in boxes_on_page(page)]
+    assert heights == [30, *range(1, 21), *[20] * 10, 40]
+    for page in pages:
+        assert page.layout.size.height <= 100
+    assert len(pages) == 6
@@ -0,0 +1,24 @@
+from dcmntr.core import *
+from dcmntr.basic_layout import *
+from dcmntr.text import *
+
+
+def test_same_texts_are_measured_once() -> None:
+    fonts = Fonts()
+    font = fonts.load("arial", 14)
+    doc = v_stack(*(simple_text(f"Label {i % 3}", font=font) for i in range(30)))
+    LayoutCtx().page_ctx().layout_node(doc, Size(300, 1000).to_constraints_max())
+
+    cache = fonts.measure_cache
+    assert len(cache) == 3
+    assert cache.misses == 3 and cache.hits >= 27
+
+
+def test_measured_size_matches_pil() -> None:
+    font = Fonts().load("arial", 14)
+    for text in ("Label", "", "two\nlines", "trailing\n"):
+        width, height = font.cache.measure_cache.measure(font, text, 2)
+        lines = text.splitlines() or [""]
+        ascent, descent = font.pil_font.getmetrics()
+        assert height == (ascent + descent) * len(lines) + 2 * (len(lines) - 1)
+        assert width == max(bbox[2] - bbox[0] for bbox in map(font.pil_font.getbbox, lines))
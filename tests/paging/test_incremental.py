@@ -0,0 +1,113 @@
+from dcmntr.core import *
+from dcmntr.basic_layout import *
+from dcmntr.layout_query import LayoutQuery
+from dcmntr.paging import PaginationCache, layout_multipage_document, page_break
+
+PAGE_SIZE = Size(100, 200)
+
+
+def page_structure(content: Node, page_content_lookup_cache: LayoutQuery | None = None) -> Node:
+    return padding(top=10, bottom=10)(content)
+
+
+def document(heights: list[int]) -> Node:
+    sections = []
+    for section, height in enumerate(heights):
+        sections.append(
+            padding(top=5)(
+                outline()(v_stack(*(box(80, height + row % 3) for row in range(10)))),
+            )
+        )
+        if section % 4 == 3:
+            sections.append(page_break)
+    return v_stack(*sections)
+
+
+def shapes(pages: list[tuple[Size, Layout]]) -> list[list[tuple[float, float, Size]]]:
+    return [[(x, y, l.layout.size) for x, y, l in walk_layout(page)] for _, page in pages]
+
+
+def paginate(content: Node, cache: PaginationCache | None = None) -> list[tuple[Size, Layout]]:
+    return list(
+        layout_multipage_document(
+            PAGE_SIZE, page_structure, content=content, pagination_cache=cache
+        )
+    )
+
+
+def test_split_position_roundtrip() -> None:
+    doc = document([7] * 10)
+    page_content: Node | None = doc
+    while page_content is not None:
+        layout = LayoutCtx().page_ctx().layout_node(page_content, PAGE_SIZE.to_constraints_max())
+        page_content = layout.layout.leftover
+        if page_content is not None:
+            assert doc.resume(page_content.split_position()) == page_content
+
+
+def test_split_before_first_child_roundtrip() -> None:
+    # Padding and outline are continued on the next page, their child consumed nothing yet
+    doc = v_stack(box(10, 95), padding(top=3)(outline()(v_stack(box(10, 20)))))
+    layout = LayoutCtx().page_ctx().layout_node(doc, Size(10, 100).to_constraints_max())
+    leftover = layout.layout.leftover
+    assert leftover is not None
+    assert leftover.split_position() == (1, ())
+    assert doc.resume(leftover.split_position()) == leftover
+
+
+def test_incremental_pagination_reuses_unchanged_pages() -> None:
+    heights = [7] * 40
+    cache = PaginationCache()
+    first = paginate(document(heights), cache)
+    assert cache.laid_out_pages == len(first)
+
+    # Same content is not laid out again
+    again = paginate(document(heights), cache)
+    assert cache.laid_out_pages == 0
+    assert [page for _, page in again] == [page for _, page in first]
+
+    # Edit in the middle re-lays out pages until page breaks converge
+    heights[20] = 12
+    edited = paginate(document(heights), cache)
+    assert shapes(edited) == shapes(paginate(document(heights)))
+    assert 0 < cache.laid_out_pages < len(edited) // 3
+    assert cache.reused_pages == len(edited) - cache.laid_out_pages
+
+
+def test_incremental_pagination_with_changed_page_count() -> None:
+    heights = [7] * 12
+    cache = PaginationCache()
+    paginate(document(heights), cache)
+
+    heights.append(9)
+    longer = paginate(document(heights), cache)
+    assert shapes(longer) == shapes(paginate(document(heights)))
+
+    shorter = paginate(document(heights[:5]), cache)
+    assert shapes(shorter) == shapes(paginate(document(heights[:5])))
+
+    # Different page size invalidates the cache
+    list(
+        layout_multipage_document(
+            Size(100, 300), page_structure, document(heights), pagination_cache=cache
+        )
+    )
+    assert cache.reused_pages == 0
+
+
+def test_pagination_cache_keeps_bounded_layouts() -> None:
+    heights = [7] * 40
+    cache = PaginationCache(max_layouts=3)
+    first = paginate(document(heights), cache)
+    assert len(first) > 3 and len(cache.pages) == len(first)
+    assert len(cache.layouts) == 3
+
+    # Pages with evicted layouts are laid out again
+    again = paginate(document(heights), cache)
+    assert shapes(again) == shapes(first)
+    assert cache.reused_pages + cache.laid_out_pages == len(first)
+    assert len(cache.layouts) == 3
+
+    heights[-1] = 12
+    edited = paginate(document(heights), cache)
+    assert shapes(edited) == shapes(paginate(document(heights)))
@@ -0,0 +1,89 @@
+import itertools
+
+from dcmntr.core import *
+from dcmntr.basic_layout import *
+from dcmntr.layout_query import LayoutQuery
+from dcmntr.paging import (
+    PageBreakIndex,
+    layout_document_page,
+    layout_multipage_document,
+    page_break,
+)
+
+PAGE_SIZE = Size(100, 200)
+
+
+def numbered_page(content: Node, page_content_lookup_cache: LayoutQuery | None = None) -> Node:
+    page_number = page_content_lookup_cache.page_idx if page_content_lookup_cache else 0
+    return v_stack(box(100, 10 + page_number), content)
+
+
+def document() -> Node:
+    return v_stack(
+        *itertools.chain.from_iterable(
+            (
+                layers(box(80, 5), v_stack(*(box(80, 33) for _ in range(section + 3)))),
+                page_break,
+                padding(top=3)(outline()(v_stack(*itertools.repeat(box(80, 21), 12)))),
+            )
+            for section in range(5)
+        )
+    )
+
+
+def shapes(layout: Layout) -> list[tuple[float, float, Size]]:
+    return [(x, y, l.layout.size) for x, y, l in walk_layout(layout)]
+
+
+def test_random_access_pages() -> None:
+    doc = document()
+    pages = [layout for _, layout in layout_multipage_document(PAGE_SIZE, numbered_page, doc)]
+
+    index = PageBreakIndex(PAGE_SIZE)
+    assert layout_document_page(PAGE_SIZE, numbered_page, doc, 7, page_breaks=index) is not None
+    assert len(index) == 8 and not index.complete
+
+    index = PageBreakIndex.from_json(index.to_json())
+    for page_index in (3, 12, 5, len(pages) - 1):
+        layout = layout_document_page(PAGE_SIZE, numbered_page, doc, page_index, page_breaks=index)
+        assert layout is not None
+        assert shapes(layout) == shapes(pages[page_index])
+
+    assert index.complete and len(index) == len(pages)
+    assert layout_document_page(PAGE_SIZE, numbered_page, doc, len(pages), index) is None
+
+
+def test_resume_interrupted_job() -> None:
+    doc = document()
+    pages = [layout for _, layout in layout_multipage_document(PAGE_SIZE, numbered_page, doc)]
+
+    index = PageBreakIndex(PAGE_SIZE)
+    job = layout_multipage_document(PAGE_SIZE, numbered_page, doc, page_breaks=index)
+    done = [layout for _, layout in itertools.islice(job, 6)]
+    saved = index.to_json()
+
+    index = PageBreakIndex.from_json(saved)
+    resumed = layout_multipage_document(
+        PAGE_SIZE, numbered_page, document(), page_breaks=index, first_page=len(done)
+    )
+    done.extend(layout for _, layout in resumed)
+    assert [shapes(l) for l in done] == [shapes(l) for l in pages]
+    assert index.complete
+
+
+def test_random_access_pages_split_before_first_child() -> None:
+    # Sections are split at page boundaries before their first row
+    doc = v_stack(
+        *(
+            v_stack(box(80, 190 - section), padding(top=3)(outline()(v_stack(box(80, 40)))))
+            for section in range(6)
+        )
+    )
+    pages = [layout for _, layout in layout_multipage_document(PAGE_SIZE, numbered_page, doc)]
+
+    index = PageBreakIndex(PAGE_SIZE)
+    list(layout_multipage_document(PAGE_SIZE, numbered_page, doc, page_breaks=index))
+    for page_index in reversed(range(len(pages))):
+        layout = layout_document_page(PAGE_SIZE, numbered_page, doc, page_index, page_breaks=index)
+        assert layout is not None
+        assert shapes(layout) == shapes(pages[page_index])
@@ -0,0 +1,57 @@
+import io
+
+from PIL import Image
+
+from dcmntr.core import *
+from dcmntr.basic_layout import *
+from dcmntr.layout_query import LayoutQuery
+from dcmntr.paging import layout_multipage_document, page_break, render_multipage_document
+from dcmntr.sharding import count_pages, render_sharded, split_at_page_breaks
+from dcmntr.text import *
+
+PAGE_SIZE = Size(200, 250)
+
+text_font = Fonts().load("arial", 12)
+
+
+def numbered_page(content: Node, page_content_lookup_cache: LayoutQuery | None = None) -> Node:
+    page_number = page_content_lookup_cache.page_idx + 1 if page_content_lookup_cache else 0
+    return v_divide([INFINITY, 20])(
+        content, h_center(simple_text(f"Page {page_number}", font=text_font))
+    )
+
+
+def png(img: Image.Image) -> bytes:
+    output = io.BytesIO()
+    img.save(output, format="PNG")
+    return output.getvalue()
+
+
+def document() -> Node:
+    chapters = []
+    for chapter in range(4):
+        chapters.append(
+            v_stack(
+                simple_text(f"Chapter {chapter}", font=text_font),
+                *(outline()(box(150, 40)) for _ in range(chapter * 3 + 1)),
+            )
+        )
+        chapters.append(page_break)
+    return v_stack(page_break, *chapters)
+
+
+def test_split_at_page_breaks() -> None:
+    shards = split_at_page_breaks(document())
+    assert len(shards) == 6
+    assert shards[0].children == shards[-1].children == ()
+    assert [count_pages(PAGE_SIZE, numbered_page, shard) for shard in shards] == [1, 1, 1, 2, 2, 1]
+    assert split_at_page_breaks(padding(top=1)(document()))[0] == padding(top=1)(document())
+
+
+def test_render_sharded() -> None:
+    pages = layout_multipage_document(PAGE_SIZE, numbered_page, document())
+    expected = [png(img) for img in render_multipage_document(pages)]
+
+    rendered = list(render_sharded(PAGE_SIZE, numbered_page, document(), png, workers=2))
+    assert len(rendered) == 8
+    assert rendered == expected
@@ -0,0 +1,60 @@
+import io
+
+import pytest
+from PIL import Image
+
+from dcmntr.core import *
+from dcmntr.basic_layout import *
+from dcmntr.banded import BandWriter, PngBandWriter, TiffBandWriter, render_banded
+from dcmntr.display_list import compile_display_list
+from dcmntr.render import rasterize_page
+from dcmntr.text import *
+
+text_font = Fonts().load("arial", 14)
+
+PAGE_SIZE = Size(150, 230)
+
+
+def page() -> Layout:
+    doc = padding(5, 5, 5, 5)(
+        v_stack(
+            *(
+                outline(fill="lightblue", border_color="red")(
+                    simple_text(f"Row {idx}\nsecond line", font=text_font)
+                )
+                for idx in range(6)
+            )
+        )
+    )
+    return LayoutCtx().container_ctx().layout_node(doc, PAGE_SIZE.to_constraints_max())
+
+
+@pytest.mark.parametrize("writer_type", [PngBandWriter, TiffBandWriter])
+@pytest.mark.parametrize("mode", ["RGB", "RGBA"])
+def test_banded_render_is_the_same_as_whole_page(writer_type: type[BandWriter], mode: str) -> None:
+    layout = page()
+    output = io.BytesIO()
+    render_banded(layout, PAGE_SIZE, writer_type(output, 150, 230, mode), band_height=64)
+
+    output.seek(0)
+    image = Image.open(output)
+    assert image.size == (150, 230) and image.mode == mode
+    expected = rasterize_page(PAGE_SIZE, compile_display_list(layout)).convert(mode)
+    assert image.tobytes() == expected.tobytes()
+
+
+def test_band_writer_checks_size() -> None:
+    writer = PngBandWriter(io.BytesIO(), 150, 100)
+    writer.write(Image.new("RGB", (150, 60)))
+    with pytest.raises(ValueError):
+        writer.write(Image.new("RGB", (150, 60)))
+    with pytest.raises(ValueError):
+        writer.close()
+
+
+@pytest.mark.parametrize("writer_type", [PngBandWriter, TiffBandWriter])
+def test_band_writer_rejects_empty_images(writer_type: type[BandWriter]) -> None:
+    with pytest.raises(ValueError):
+        writer_type(io.BytesIO(), 0, 100)
+    with pytest.raises(ValueError):
+        writer_type(io.BytesIO(), 150, 0)
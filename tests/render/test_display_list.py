@@ -0,0 +1,49 @@
+from dataclasses import dataclass
+
+from PIL import Image, ImageDraw
+
+from dcmntr.core import *
+from dcmntr.basic_layout import *
+from dcmntr.display_list import Line, NodeDraw, Rect, TextRun, compile_display_list
+from dcmntr.text import *
+
+text_font = Fonts().load("arial", 14)
+
+
+@dataclass(frozen=True, slots=True)
+class Cross(Node):
+    """Node that draws itself the old way."""
+
+    def draw_image(self, x: float, y: float, layout: Layout, draw_ctx: ImageDrawCtx) -> None:
+        size = layout.layout.size
+        draw_ctx.draw.line([(x, y), (x + size.width, y + size.height)], fill="red")
+
+
+def page() -> Layout:
+    doc = padding(5, 5, 5, 5)(
+        v_stack(
+            outline(fill="yellow", border_top=False)(box(50, 20)),
+            h_center(simple_text("text", font=text_font)),
+            Cross()(box(30, 30)),
+        )
+    )
+    return LayoutCtx().container_ctx().layout_node(doc, Size(100, 100).to_constraints_max())
+
+
+def test_display_list_has_only_drawing_nodes() -> None:
+    ops = compile_display_list(page()).ops
+    assert [type(op) for op in ops] == [Rect, Line, Line, Line, TextRun, NodeDraw]
+    assert ops[0] == Rect(5, 5, 54, 24, "yellow")
+    assert isinstance(ops[4], TextRun) and ops[4].text == "text"
+
+
+def test_display_list_draws_like_nodes() -> None:
+    layout = page()
+    expected = Image.new("RGBA", (100, 100), "white")
+    draw_ctx = ImageDrawCtx(image=expected, draw=ImageDraw.Draw(expected))
+    for x, y, node_layout in walk_layout(layout):
+        node_layout.get_node().draw_image(x, y, node_layout, draw_ctx)
+
+    image = Image.new("RGBA", (100, 100), "white")
+    compile_display_list(layout).draw_pil(image)
+    assert image.tobytes() == expected.tobytes()
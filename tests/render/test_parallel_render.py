@@ -0,0 +1,73 @@
+import io
+import pickle
+from typing import Iterable
+from pathlib import Path
+
+from PIL import Image
+
+from dcmntr.core import *
+from dcmntr.basic_layout import *
+from dcmntr.display_list import Blit, TextRun, compile_display_list
+from dcmntr.images import img_from_file
+from dcmntr.layout_query import LayoutQuery
+from dcmntr.paging import layout_multipage_document, render_multipage_document, render_pipelined
+from dcmntr.text import *
+
+STATUE = Path(__file__).parent.parent / "images" / "images_snapshots" / "statue.jpg"
+
+text_font = Fonts().load("arial", 14)
+
+
+def bare_page(content: Node, page_content_lookup_cache: LayoutQuery | None = None) -> Node:
+    return content
+
+
+def document() -> Node:
+    return v_stack(
+        *(
+            v_stack(
+                outline(fill="lightblue")(box(200, 30)(simple_text(f"Row {idx}", font=text_font))),
+                box(60, 60)(img_from_file(STATUE)),
+            )
+            for idx in range(12)
+        )
+    )
+
+
+def test_display_list_pickles_fonts_and_images_by_reference() -> None:
+    _, page = next(iter(layout_multipage_document(Size(200, 300), bare_page, document())))
+    display_list = compile_display_list(page)
+
+    blit = next(op for op in display_list.ops if isinstance(op, Blit))
+    assert len(pickle.dumps(blit)) < 500
+
+    restored = pickle.loads(pickle.dumps(display_list))
+    assert [type(op) for op in restored.ops] == [type(op) for op in display_list.ops]
+    assert next(op for op in restored.ops if isinstance(op, Blit)) == blit
+    text_runs = [op for op in restored.ops if isinstance(op, TextRun)]
+    assert text_runs and all(op.font is text_runs[0].font for op in text_runs)
+
+
+def test_render_in_process_pool() -> None:
+    def pages() -> Iterable[tuple[Size, Layout]]:
+        return layout_multipage_document(Size(200, 300), bare_page, document())
+
+    expected = [img.tobytes() for img in render_multipage_document(pages())]
+    rendered = [
+        img.tobytes() for img in render_multipage_document(pages(), workers=2, max_in_flight=3)
+    ]
+    assert len(expected) > 3
+    assert rendered == expected
+
+
+def test_render_pipelined() -> None:
+    def pages() -> Iterable[tuple[Size, Layout]]:
+        return layout_multipage_document(Size(200, 300), bare_page, document())
+
+    def encode(img: Image.Image) -> bytes:
+        output = io.BytesIO()
+        img.save(output, format="PNG")
+        return output.getvalue()
+
+    expected = [encode(img) for img in render_multipage_document(pages())]
+    assert list(render_pipelined(pages(), encode, threads=2, max_in_flight=2)) == expected
@@ -0,0 +1,135 @@
+import io
+import re
+import zlib
+from pathlib import Path
+
+import pytest
+from PIL import ImageFont
+
+from dcmntr.core import *
+from dcmntr.basic_layout import *
+from dcmntr.images import img_from_file
+from dcmntr.paging import layout_multipage_document, page_break
+from dcmntr.pdf import write_pdf
+from dcmntr.text import *
+from dcmntr.truetype import TrueTypeFont
+
+STATUE_PATH = Path(__file__).parent.parent / "images" / "images_snapshots" / "statue.jpg"
+
+text_font = Fonts().load("arial", 14)
+assert text_font.path is not None
+font_path: str = text_font.path
+
+
+def bare_page(content: Node, page_content_lookup_cache: object = None) -> Node:
+    return padding(10, 10, 10, 10)(content)
+
+
+def content_streams(pdf: bytes) -> list[bytes]:
+    return [
+        zlib.decompress(stream)
+        for stream in re.findall(rb"stream\n(.*?)\nendstream", pdf, re.DOTALL)
+    ]
+
+
+def text_lines(stream: bytes) -> list[tuple[float, list[tuple[int, float]]]]:
+    """Baseline and glyphs with their pen positions of every TJ text, in pixels."""
+    font = TrueTypeFont.from_file(font_path)
+    scale = 14 / font.units_per_em
+    lines = []
+    for y, array in re.findall(rb"1 0 0 -1 [-\d.]+ ([-\d.]+) Tm \[(.*?)\] TJ", stream):
+        pen = 0.0
+        glyphs = []
+        for item in re.findall(rb"<[0-9a-f]*>|[-\d.]+", array):
+            if item.startswith(b"<"):
+                for idx in range(1, len(item) - 1, 4):
+                    glyph = int(item[idx : idx + 4], 16)
+                    glyphs.append((glyph, pen))
+                    pen += font.advances[glyph] * scale
+            else:
+                pen -= float(item) * 14 / 1000
+        lines.append((float(y), glyphs))
+    return lines
+
+
+def test_subset_font_keeps_glyph_ids() -> None:
+    font = TrueTypeFont.from_file(font_path)
+    glyphs = set(font.glyph_ids("Hello"))
+    assert 0 not in glyphs
+
+    subset = font.subset(glyphs)
+    assert len(subset) < len(font.data)
+    subset_font = TrueTypeFont(subset)
+    assert subset_font.num_glyphs == font.num_glyphs
+    assert subset_font.glyph_ids("Hello") == font.glyph_ids("Hello")
+
+    # Subset is a valid font that draws the same text
+    pil_font = ImageFont.truetype(io.BytesIO(subset), 14)
+    assert pil_font.getbbox("Hello") == text_font.pil_font.getbbox("Hello")
+
+
+def test_vector_pdf() -> None:
+    pages_content: list[Node] = []
+    for idx in range(6):
+        if idx:
+            pages_content.append(page_break)
+        pages_content.append(outline(fill="lightblue")(simple_text(f"Page {idx}", font=text_font)))
+        pages_content.append(box(60, 40)(img_from_file(STATUE_PATH)))
+    doc = v_stack(*pages_content)
+    output = io.BytesIO()
+    pages = layout_multipage_document(Size(200, 150), bare_page, doc)
+    assert write_pdf(pages, output, dpi=144) == 6
+    pdf = output.getvalue()
+
+    assert pdf.startswith(b"%PDF-1.4") and pdf.endswith(b"%%EOF\n")
+    assert pdf.count(b"/Type /Page ") == 6
+    assert b"/MediaBox [0 0 100 75]" in pdf
+    # Font and image are written once and used by all the pages
+    assert pdf.count(b"/Subtype /Type0") == 1
+    assert pdf.count(b"/FontFile2") == 1
+    assert pdf.count(b"/Subtype /Image") == 1
+    assert len(set(re.findall(rb"/Font << (/F\d+ \d+ 0 R) >>", pdf))) == 1
+
+    # Text is written as glyphs of the font
+    font = TrueTypeFont.from_file(font_path)
+    texts = [
+        [glyph for glyph, _ in glyphs]
+        for stream in content_streams(pdf)
+        for _, glyphs in text_lines(stream)
+    ]
+    assert font.glyph_ids("Page 3") in texts
+
+    startxref = re.search(rb"startxref\n(\d+)", pdf)
+    assert startxref is not None
+    entries = re.findall(rb"(\d{10}) 00000 n", pdf[int(startxref.group(1)) :])
+    for number, offset in enumerate(entries, start=1):
+        assert pdf[int(offset) :].startswith(b"%d 0 obj" % number)
+
+
+def test_pdf_text_is_placed_as_measured() -> None:
+    doc = simple_text("AVATAR To\nWave", font=text_font, spacing=3)
+    layout = LayoutCtx().container_ctx().layout_node(doc, Size(200, 100).to_constraints_max())
+    output = io.BytesIO()
+    write_pdf([(Size(200, 100), layout)], output)
+
+    (stream,) = [s for s in content_streams(output.getvalue()) if b"TJ" in s]
+    (first_y, first), (second_y, second) = text_lines(stream)
+    font = TrueTypeFont.from_file(font_path)
+    for line, glyphs in (("AVATAR To", first), ("Wave", second)):
+        assert [glyph for glyph, _ in glyphs] == font.glyph_ids(line)
+        # Kerning is kept, glyphs are where layout measured them
+        offsets = text_font.advances.offsets(line)
+        assert offsets is not None
+        assert [pen for _, pen in glyphs] == pytest.approx(offsets, abs=0.01)
+    assert second_y - first_y == text_font.line_spacing() + 3
+
+
+def test_pdf_text_that_needs_shaping_is_rasterized() -> None:
+    doc = simple_text("שלום", font=text_font)
+    layout = LayoutCtx().container_ctx().layout_node(doc, Size(200, 100).to_constraints_max())
+    output = io.BytesIO()
+    write_pdf([(Size(200, 100), layout)], output)
+    pdf = output.getvalue()
+
+    assert b"/Subtype /Type0" not in pdf and pdf.count(b"/Subtype /Image") == 2
+    assert not any(b"TJ" in stream for stream in content_streams(pdf))
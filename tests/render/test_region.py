@@ -0,0 +1,48 @@
+from pathlib import Path
+
+from dcmntr.core import *
+from dcmntr.basic_layout import *
+from dcmntr.display_list import compile_display_list
+from dcmntr.images import img_from_file
+from dcmntr.render import rasterize_page, render_region
+from dcmntr.text import *
+
+STATUE_PATH = Path(__file__).parent.parent / "images" / "images_snapshots" / "statue.jpg"
+
+text_font = Fonts().load("arial", 14)
+
+PAGE_SIZE = Size(200, 300)
+
+
+def page() -> Layout:
+    doc = padding(5, 5, 5, 5)(
+        v_stack(
+            *(
+                h_stack(
+                    outline(fill="lightblue", border_color="red")(
+                        simple_text(f"Row {idx}", font=text_font)
+                    ),
+                    box(40, 30)(img_from_file(STATUE_PATH)),
+                )
+                for idx in range(8)
+            )
+        )
+    )
+    return LayoutCtx().container_ctx().layout_node(doc, PAGE_SIZE.to_constraints_max())
+
+
+def test_region_is_part_of_page() -> None:
+    layout = page()
+    full = rasterize_page(PAGE_SIZE, compile_display_list(layout))
+    for region in (Region(0, 0, 64, 64), Region(37, 50, 64, 64), Region(136, 236, 64, 64)):
+        tile = render_region(layout, region)
+        assert tile.size == (64, 64)
+        x, y = int(region.x), int(region.y)
+        assert tile.tobytes() == full.crop((x, y, x + 64, y + 64)).tobytes()
+
+
+def test_nodes_outside_region_are_skipped() -> None:
+    layout = page()
+    all_ops = compile_display_list(layout).ops
+    region_ops = compile_display_list(layout, clip=Region(0, 0, 50, 40)).ops
+    assert 0 < len(region_ops) <= len(all_ops) / 4
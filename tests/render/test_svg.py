@@ -0,0 +1,62 @@
+import io
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Callable
+
+from dcmntr.core import *
+from dcmntr.basic_layout import *
+from dcmntr.images import img_from_file
+from dcmntr.svg import write_svg
+from dcmntr.text import *
+
+STATUE_PATH = Path(__file__).parent.parent / "images" / "images_snapshots" / "statue.jpg"
+SVG = "{http://www.w3.org/2000/svg}"
+
+text_font = Fonts().load("arial", 14)
+
+
+def page() -> Layout:
+    doc = padding(5, 5, 5, 5)(
+        v_stack(
+            outline(fill="yellow", border_top=False, border_color="red")(
+                simple_text("a < b\nline", font=text_font)
+            ),
+            box(40, 30)(img_from_file(STATUE_PATH)),
+            box(40, 30)(img_from_file(STATUE_PATH)),
+        )
+    )
+    return LayoutCtx().container_ctx().layout_node(doc, Size(100, 200).to_constraints_max())
+
+
+def render(embed_images: bool = True, font_url: Callable[[Font], str] | None = None) -> ET.Element:
+    output = io.StringIO()
+    write_svg(Size(100, 200), page(), output, embed_images=embed_images, font_url=font_url)
+    return ET.fromstring(output.getvalue())
+
+
+def test_svg_elements() -> None:
+    svg = render()
+    assert svg.get("viewBox") == "0 0 100 200"
+
+    rect = svg.find(f"{SVG}rect")
+    assert rect is not None and rect.get("fill") == "#ffff00"
+    lines = svg.findall(f"{SVG}line")
+    assert len(lines) == 3 and {line.get("stroke") for line in lines} == {"#ff0000"}
+
+    texts = list(svg.iter(f"{SVG}text"))
+    assert [text.text for text in texts] == ["a < b", "line"]
+    # Lines are spaced like in all the other outputs, with the default spacing
+    first, second = (float(text.get("y", "")) for text in texts)
+    assert second - first == text_font.line_spacing() + 2
+
+    # Same image is embedded once and used twice
+    assert len(svg.findall(f"{SVG}defs/{SVG}image")) == 1
+    assert len(svg.findall(f"{SVG}use")) == 2
+
+
+def test_svg_linked_images() -> None:
+    svg = render(embed_images=False, font_url=lambda font: "fonts/text.ttf")
+    images = svg.findall(f"{SVG}image")
+    assert [image.get("href") for image in images] == [str(STATUE_PATH)] * 2
+    style = svg.find(f"{SVG}style")
+    assert style is not None and style.text is not None and "fonts/text.ttf" in style.text
@@ -0,0 +1,37 @@
+from PIL import Image, ImageDraw
+
+from dcmntr.core import *
+from dcmntr.text import *
+
+
+def draw_both(font: Font, x: float, y: float, text: str, antialiasing: bool) -> None:
+    expected = Image.new("RGBA", (120, 80), "white")
+    draw = ImageDraw.Draw(expected)
+    draw.fontmode = "L" if antialiasing else "1"
+    draw.text((x, y), text, fill="navy", font=font.pil_font, spacing=3)
+
+    image = Image.new("RGBA", (120, 80), "white")
+    draw_ctx = ImageDrawCtx(image=image, draw=ImageDraw.Draw(image))
+    font.cache.mask_cache.draw(draw_ctx, x, y, text, font, "navy", 3, antialiasing, None)
+    assert image.tobytes() == expected.tobytes()
+
+
+def test_masks_draw_like_pil() -> None:
+    font = Fonts().load("arial", 14)
+    for x, y, text in ((0, 0, "Header"), (10.5, 3.25, "two\nlines"), (-5, 70, "cut off")):
+        draw_both(font, x, y, text, antialiasing=True)
+        draw_both(font, x, y, text, antialiasing=False)
+        # Second time from the cache
+        draw_both(font, x, y, text, antialiasing=True)
+    assert font.cache.mask_cache.hits == 4
+
+
+def test_mask_cache_is_bounded_by_size() -> None:
+    font = Fonts().load("arial", 14)
+    cache = TextMaskCache(max_weight=2000)
+    image = Image.new("RGBA", (200, 50), "white")
+    draw_ctx = ImageDrawCtx(image=image, draw=ImageDraw.Draw(image))
+    for idx in range(20):
+        cache.draw(draw_ctx, 0, 0, f"Page {idx}", font, "black", 2, True, None)
+    assert 0 < cache.weight <= 2000
+    assert cache.evictions == 20 - len(cache)
@@ -0,0 +1,51 @@
+import io
+import re
+
+import pytest
+
+from PIL import Image, TiffImagePlugin
+
+from dcmntr.writers import PageWriter, RasterPdfWriter, TiffWriter, write_pages
+
+
+def pages() -> list[Image.Image]:
+    return [Image.new("RGBA", (60, 80), color) for color in ("red", "green", "blue")]
+
+
+def test_tiff_writer() -> None:
+    output = io.BytesIO()
+    assert write_pages(pages(), TiffWriter(output)) == 3
+
+    output.seek(0)
+    tiff = Image.open(output)
+    assert isinstance(tiff, TiffImagePlugin.TiffImageFile)
+    assert tiff.n_frames == 3
+    for idx, page in enumerate(pages()):
+        tiff.seek(idx)
+        assert tiff.convert("RGBA").tobytes() == page.tobytes()
+
+
+def test_raster_pdf_writer() -> None:
+    output = io.BytesIO()
+    write_pages(pages(), RasterPdfWriter(output, dpi=144, jpeg_quality=90))
+    pdf = output.getvalue()
+
+    assert pdf.startswith(b"%PDF-1.4") and pdf.endswith(b"%%EOF\n")
+    assert pdf.count(b"/Type /Page ") == 3
+    assert b"/MediaBox [0 0 30.0000 40.0000]" in pdf
+
+    # Cross-reference table points to the objects
+    startxref = re.search(rb"startxref\n(\d+)", pdf)
+    assert startxref is not None
+    entries = re.findall(rb"(\d{10}) 00000 n", pdf[int(startxref.group(1)) :])
+    assert len(entries) == 11
+    for number, offset in enumerate(entries, start=1):
+        assert pdf[int(offset) :].startswith(b"%d 0 obj" % number)
+
+
+def test_page_writer_must_implement_write() -> None:
+    class NoWrite(PageWriter):
+        pass
+
+    with pytest.raises(TypeError):
+        NoWrite()  # type: ignore[abstract]